@@ -1,5 +1,6 @@
 from .search import router as search_router
 from .favorites import router as favorites_router
 from .llm import router as llm_router
+from .suggest import router as suggest_router
 
-__all__ = ['search_router', 'favorites_router', 'llm_router']
+__all__ = ['search_router', 'favorites_router', 'llm_router', 'suggest_router']
@@ -1,38 +1,284 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models.favorite import Favorite, FavoriteCreate
-from services import FavoritesService
+import csv
+import hashlib
+import io
+import json
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Iterator, List, Optional
+from models.favorite import (
+    DEFAULT_USER, Favorite, FavoriteCreate, FavoriteChanges, FavoriteExpanded,
+    FavoriteBulkRequest, FavoriteBulkResponse,
+    FavoriteCheckRequest, FavoriteCheckItem, FavoriteCheckResponse,
+)
+from services import (
+    FavoritesService,
+    get_dictionary_service,
+    BackpressureError,
+    ExecutorTimeoutError,
+)
 
 router = APIRouter(prefix="/api/favorites", tags=["favorites"])
 
 # 初始化服务
 favorites_service = FavoritesService()
+dict_service = get_dictionary_service()
+
+# 分页大小（GET /api/favorites 只带 cursor、未指定 limit 时）
+PAGE_SIZE = int(os.getenv("FAVORITES_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = 1000
+
+
+def get_user_id(
+    x_user_id: Optional[str] = Header(None),
+    user_id: Optional[str] = Query(None, description="用户 / 设备 ID（也可用 X-User-Id 头）"),
+) -> str:
+    """当前用户：X-User-Id 头优先，其次 user_id 参数，都没有时为 default"""
+    value = (x_user_id or user_id or DEFAULT_USER).strip()
+    if not value or len(value) > 128:
+        raise HTTPException(status_code=400, detail="Invalid user id")
+    return value
+
+
+def make_etag(*parts) -> str:
+    return '"' + hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:16] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 是否包含 etag（忽略弱校验前缀 W/）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
 
 
 @router.post("", response_model=Favorite, status_code=201)
-async def add_favorite(favorite: FavoriteCreate):
+async def add_favorite(favorite: FavoriteCreate, user_id: str = Depends(get_user_id)):
     """添加收藏"""
     try:
-        result = favorites_service.add(favorite)
+        result = favorites_service.add(favorite, user_id)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add favorite: {str(e)}")
 
 
+@router.post("/bulk", response_model=FavoriteBulkResponse)
+async def add_favorites_bulk(request: FavoriteBulkRequest, user_id: str = Depends(get_user_id)):
+    """
+    批量添加收藏（最多 5000 个）
+
+    请求内按单词去重，已收藏的单词返回现有记录，其余一次写入存储。
+    """
+    try:
+        favorites, added = favorites_service.add_many(request.favorites, user_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to add favorites: {str(e)}")
+    return FavoriteBulkResponse(
+        favorites=favorites, added=added, existing=len(favorites) - added
+    )
+
+
+@router.post("/check", response_model=FavoriteCheckResponse)
+async def check_favorites(request: FavoriteCheckRequest, user_id: str = Depends(get_user_id)):
+    """批量检查单词是否已收藏（最多 1000 个，结果与请求顺序一致）"""
+    favorites = favorites_service.check_many(request.words, user_id)
+    results = [
+        FavoriteCheckItem(
+            word=word,
+            is_favorited=favorite is not None,
+            favorite_id=favorite.id if favorite else None,
+        )
+        for word, favorite in zip(request.words, favorites)
+    ]
+    return FavoriteCheckResponse(
+        results=results, favorited=sum(1 for item in results if item.is_favorited)
+    )
+
+
+EXPORT_FIELDS = ["id", "word", "phonetic", "chinese", "created_at", "version"]
+
+
+def export_ndjson(favorites: Iterator[Favorite], batch_size: int = 500) -> Iterator[str]:
+    """每行一个 JSON 对象，按批输出"""
+    lines = []
+    for favorite in favorites:
+        lines.append(json.dumps(
+            favorite.model_dump(mode="json", include=set(EXPORT_FIELDS)), ensure_ascii=False
+        ))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def export_csv(favorites: Iterator[Favorite], batch_size: int = 500) -> Iterator[str]:
+    """带表头的 CSV，按批输出"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for i, favorite in enumerate(favorites, 1):
+        row = favorite.model_dump(mode="json", include=set(EXPORT_FIELDS))
+        writer.writerow([row[field] for field in EXPORT_FIELDS])
+        if i % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def export_expanded_ndjson(user_id: str) -> AsyncIterator[str]:
+    """附带释义的 NDJSON，每批一次词典查询；查询失败时以一行 {"error": ...} 结束"""
+    try:
+        async for batch in favorites_service.export_expanded(dict_service, user_id):
+            yield "".join(
+                json.dumps(
+                    favorite.model_dump(mode="json", exclude={"user_id"}, exclude_none=True),
+                    ensure_ascii=False,
+                ) + "\n"
+                for favorite in batch
+            )
+    except (BackpressureError, ExecutorTimeoutError) as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+
+
+@router.get("/export")
+async def export_favorites(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    expand: bool = Query(False, description="附带词典释义（仅 ndjson）"),
+    user_id: str = Depends(get_user_id),
+):
+    """
+    流式导出全部收藏（按添加时间倒序）
+
+    - format=ndjson（默认）: 每行一个 JSON 对象
+    - format=csv: 带表头的 CSV
+    - expand=true: 每条附带词典释义 definition（复习列表一次拉取，无需逐个查询）
+    """
+    if expand:
+        if format != "ndjson":
+            raise HTTPException(status_code=400, detail="expand is only supported for ndjson")
+        return StreamingResponse(
+            export_expanded_ndjson(user_id),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": 'attachment; filename="favorites.ndjson"'},
+        )
+
+    favorites = favorites_service.export(user_id)
+    if format == "csv":
+        body, media_type = export_csv(favorites), "text/csv; charset=utf-8"
+    else:
+        body, media_type = export_ndjson(favorites), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="favorites.{format}"'},
+    )
+
+
 @router.get("", response_model=List[Favorite])
-async def get_favorites():
-    """获取所有收藏"""
+async def get_favorites(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="每页条数（指定时分页）"),
+    cursor: Optional[str] = Query(None, description="上一页响应的 X-Next-Cursor"),
+    user_id: str = Depends(get_user_id),
+):
+    """
+    获取收藏（按添加时间倒序）
+
+    不带 limit / cursor 时返回完整列表；带任一参数时分页返回。
+
+    响应头：
+    - X-Next-Cursor: 下一页游标（仅分页时，没有下一页时不返回）
+    - X-Favorites-Version: 当前版本号，之后可用 /api/favorites/changes?since= 增量同步
+    - ETag: 列表未变化时带 If-None-Match 请求返回 304
+    """
+    paginate = limit is not None or cursor is not None
+    version = favorites_service.version(user_id)
+    etag = make_etag(user_id, version, cursor, limit)
+    headers = {"ETag": etag, "X-Favorites-Version": str(version)}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
     try:
-        favorites = favorites_service.get_all()
-        return favorites
+        if paginate:
+            favorites, next_cursor = favorites_service.get_page(
+                user_id, limit or PAGE_SIZE, cursor
+            )
+        else:
+            favorites, next_cursor = favorites_service.get_all(user_id), None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get favorites: {str(e)}")
 
+    response.headers.update(headers)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return favorites
+
+
+@router.get("/expanded", response_model=List[FavoriteExpanded])
+async def get_favorites_expanded(
+    request: Request,
+    response: Response,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="上一页响应的 X-Next-Cursor"),
+    user_id: str = Depends(get_user_id),
+):
+    """
+    获取附带词典释义的收藏（分页、响应头与 GET /api/favorites 相同）
+
+    每页的释义用一次批量查询取回，词典中没有的单词 definition 为 null。
+    """
+    version = favorites_service.version(user_id)
+    etag = make_etag("expanded", user_id, version, cursor, limit)
+    headers = {"ETag": etag, "X-Favorites-Version": str(version)}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        favorites, next_cursor = favorites_service.get_page(user_id, limit, cursor)
+        expanded = await favorites_service.expand(favorites, dict_service)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (BackpressureError, ExecutorTimeoutError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    response.headers.update(headers)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return expanded
+
+
+@router.get("/changes", response_model=FavoriteChanges)
+async def get_favorite_changes(
+    request: Request,
+    response: Response,
+    since: int = Query(0, ge=0, description="上次同步得到的 version"),
+    limit: int = Query(500, ge=1, le=MAX_PAGE_SIZE),
+    user_id: str = Depends(get_user_id),
+):
+    """
+    增量同步：返回版本号大于 since 的添加和删除
+
+    - has_more 为 true 时，用返回的 version 作为 since 继续请求
+    - full_resync 为 true 时，since 太旧，需要重新分页拉取 GET /api/favorites
+    """
+    etag = make_etag(user_id, favorites_service.version(user_id), since, limit)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return favorites_service.changes(user_id, since, limit)
+
 
 @router.delete("/{favorite_id}")
-async def delete_favorite(favorite_id: str):
+async def delete_favorite(favorite_id: str, user_id: str = Depends(get_user_id)):
     """删除收藏"""
-    success = favorites_service.remove(favorite_id)
+    success = favorites_service.remove(favorite_id, user_id)
     if not success:
         raise HTTPException(status_code=404, detail="Favorite not found")
 
@@ -40,9 +286,9 @@ async def delete_favorite(favorite_id: str):
 
 
 @router.get("/check/{word}")
-async def check_favorite(word: str):
+async def check_favorite(word: str, user_id: str = Depends(get_user_id)):
     """检查单词是否已收藏"""
-    favorite = favorites_service.check(word)
+    favorite = favorites_service.check(word, user_id)
 
     if favorite:
         return {
@@ -1,9 +1,13 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 
 from services.llm_service import LLMService
-from services.dictionary import DictionaryService
+from services.llm_scheduler import LLMDeadlineError
+from services.dictionary import get_dictionary_service
+from services.concurrency import BackpressureError, ExecutorTimeoutError
 from models.llm_response import LLMExplanation
 
 
@@ -12,7 +16,7 @@ router = APIRouter(prefix="/api", tags=["LLM"])
 
 # 初始化服务（延迟初始化，避免启动时检查环境变量）
 llm_service: Optional[LLMService] = None
-dict_service = DictionaryService()
+dict_service = get_dictionary_service()
 
 
 def get_llm_service() -> LLMService:
@@ -23,6 +27,26 @@ def get_llm_service() -> LLMService:
     return llm_service
 
 
+async def get_basic_definition(word: str) -> Optional[str]:
+    """从本地词典取中文释义作为参考，查不到或词典繁忙时返回 None"""
+    try:
+        local_result = await dict_service.get_definition(word)
+        # 提取中文释义作为参考
+        return local_result.chinese or None
+    except ValueError:
+        # 本地词典没有该词，继续使用 LLM
+        return None
+    except (BackpressureError, ExecutorTimeoutError) as e:
+        # 本地词典繁忙，不带参考释义直接调用 LLM
+        print(f"Skip local definition for {word}: {e}")
+        return None
+
+
+def sse_event(event: str, data) -> str:
+    """格式化一条 Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 class LLMExplainRequest(BaseModel):
     """LLM 解释请求"""
     word: str
@@ -63,20 +87,20 @@ async def explain_word_with_llm(request: LLMExplainRequest):
         # 如果需要，先查询本地词典
         basic_definition = None
         if request.include_basic_definition:
-            try:
-                local_result = await dict_service.get_definition(word)
-                # 提取中文释义作为参考
-                if local_result.chinese:
-                    basic_definition = local_result.chinese
-            except ValueError:
-                # 本地词典没有该词，继续使用 LLM
-                pass
+            basic_definition = await get_basic_definition(word)
 
         # 调用 LLM 生成详细解释
         explanation = await llm.explain_word(word, basic_definition)
 
         return explanation
 
+    except LLMDeadlineError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+    except (BackpressureError, ExecutorTimeoutError) as e:
+        # 模型分级需要查询词频，词典繁忙
+        raise HTTPException(status_code=503, detail=str(e))
+
     except ValueError as e:
         # LLM 服务初始化失败或调用失败
         error_msg = str(e)
@@ -111,3 +135,59 @@ async def explain_word_with_llm_get(word: str):
     """
     request = LLMExplainRequest(word=word, include_basic_definition=True)
     return await explain_word_with_llm(request)
+
+
+@router.get("/llm-explain/{word}/stream")
+async def stream_word_explanation(word: str, include_basic_definition: bool = True):
+    """
+    流式生成单词解释（Server-Sent Events）
+
+    每个字段生成完毕立即推送，不必等待完整结果：
+    - event: field  data: {"field": "basic_translation", "value": "..."}
+    - event: done   data: 完整的 LLMExplanation
+    - event: error  data: {"detail": "..."}
+    """
+    word = word.strip()
+    if not word:
+        raise HTTPException(status_code=400, detail="Word cannot be empty")
+
+    try:
+        llm = get_llm_service()
+    except ValueError:
+        raise HTTPException(
+            status_code=503,
+            detail="LLM service not configured. Please set OPENAI_API_KEY."
+        )
+
+    basic_definition = None
+    if include_basic_definition:
+        basic_definition = await get_basic_definition(word)
+
+    async def events():
+        try:
+            async for kind, payload in llm.stream_explanation(word, basic_definition):
+                if kind == "field":
+                    name, value = payload
+                    yield sse_event("field", {"field": name, "value": value})
+                else:
+                    yield sse_event("done", payload.model_dump())
+        except (LLMDeadlineError, ValueError, BackpressureError, ExecutorTimeoutError) as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/llm/stats")
+async def get_llm_stats():
+    """LLM 解释缓存命中率与 API 调用统计"""
+    try:
+        return get_llm_service().get_stats()
+    except ValueError:
+        raise HTTPException(
+            status_code=503,
+            detail="LLM service not configured. Please set OPENAI_API_KEY."
+        )
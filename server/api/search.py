@@ -1,21 +1,54 @@
 from fastapi import APIRouter, HTTPException
-from models.search import SearchRequest, SearchResponse, SimpleMeaning, EnglishResult, ChineseResult
+from fastapi.responses import JSONResponse
+from models.search import (
+    SearchRequest,
+    SearchResponse,
+    ChineseResult,
+    WordNotFoundResponse,
+    BatchSearchRequest,
+    BatchSearchResponse,
+    BatchSearchItem,
+)
 from models.word import WordDefinition
-from services import DictionaryService, TranslationService
+from services import (
+    TranslationService,
+    get_dictionary_service,
+    BackpressureError,
+    ExecutorTimeoutError,
+)
 
 router = APIRouter(prefix="/api", tags=["search"])
 
 # 初始化服务
-dict_service = DictionaryService()
+dict_service = get_dictionary_service()
 trans_service = TranslationService()
 
 
-@router.post("/search", response_model=SearchResponse)
+async def word_not_found(word: str, message: str) -> JSONResponse:
+    """404 响应，附带拼写纠错候选，省去客户端的猜测重试"""
+    try:
+        suggestions = await dict_service.suggest_corrections(word)
+    except (BackpressureError, ExecutorTimeoutError):
+        suggestions = []
+
+    return JSONResponse(
+        status_code=404,
+        content=WordNotFoundResponse(
+            detail=message, suggestions=suggestions
+        ).model_dump(),
+    )
+
+
+@router.post(
+    "/search",
+    response_model=SearchResponse,
+    responses={404: {"model": WordNotFoundResponse}},
+)
 async def search_word(request: SearchRequest):
     """
     简化版搜索接口
     - 输入英文 → 本地库查询，返回简单的中文释义和词性
-    - 输入中文 → GoogleTranslate直接翻译，返回英文结果(可能多个)
+    - 输入中文 → 本地词典反查（按词频排序），无结果时 GoogleTranslate 翻译，返回英文结果(可能多个)
     """
     query = request.query.strip()
 
@@ -29,57 +62,75 @@ async def search_word(request: SearchRequest):
     print(f"Detected language: {detected_lang}")
 
     if is_chinese:
-        # 中文输入：直接翻译成英文
-        translation = await trans_service.translate(query, src='zh-CN', dest='en')
-        print(f"Chinese to English: {translation}")
+        # 中文输入：优先本地词典反查，无结果时再调用 Google 翻译
+        try:
+            translations = await dict_service.reverse_lookup(query)
+        except (BackpressureError, ExecutorTimeoutError):
+            translations = []
+        source = 'local'
 
-        # 如果翻译结果包含多个词(用逗号或顿号分隔),拆分成列表
-        translations = [t.strip() for t in translation.replace('、', ',').split(',')]
+        if not translations:
+            translation = await trans_service.translate(query, src='zh-CN', dest='en')
+            # 如果翻译结果包含多个词(用逗号或顿号分隔),拆分成列表
+            translations = [t.strip() for t in translation.replace('、', ',').split(',')]
+            source = 'google'
+
+        print(f"Chinese to English ({source}): {translations}")
 
         response = SearchResponse(
             query=query,
             is_chinese=True,
-            chinese_result=ChineseResult(translations=translations)
+            chinese_result=ChineseResult(translations=translations, source=source)
         )
     else:
         # 英文输入：从本地库查询
         try:
-            definition = await dict_service.get_definition(query)
-
-            # 提取简化的释义
-            meanings = []
-            for meaning in definition.meanings:
-                # 合并所有定义为一个字符串
-                definitions_list = []
-                for def_item in meaning.definitions:
-                    if def_item.definition_chinese:
-                        definitions_list.append(def_item.definition_chinese)
-
-                if definitions_list:
-                    combined_meaning = '; '.join(definitions_list)
-                    meanings.append(SimpleMeaning(
-                        pos=meaning.part_of_speech,
-                        meaning=combined_meaning
-                    ))
+            english_result = await dict_service.get_english_result(query)
 
             response = SearchResponse(
                 query=query,
                 is_chinese=False,
-                english_result=EnglishResult(
-                    word=definition.word,
-                    phonetic=definition.phonetic,
-                    meanings=meanings
-                )
+                english_result=english_result
             )
 
         except ValueError as e:
-            raise HTTPException(status_code=404, detail=str(e))
+            return await word_not_found(query, str(e))
+        except (BackpressureError, ExecutorTimeoutError) as e:
+            raise HTTPException(status_code=503, detail=str(e))
 
     print(f"=== Search Complete ===\n")
     return response
 
 
-@router.get("/definition/{word}", response_model=WordDefinition)
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def search_batch(request: BatchSearchRequest):
+    """
+    批量英文单词查询（最多 500 个）
+
+    输入去重、标准化后用一次 SQL 查询取回，结果与请求顺序一致，
+    未找到的单词 found=false。
+    """
+    try:
+        results = await dict_service.get_english_results(request.words)
+    except (BackpressureError, ExecutorTimeoutError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    items = [
+        BatchSearchItem(query=word, found=result is not None, result=result)
+        for word, result in zip(request.words, results)
+    ]
+    found = sum(1 for item in items if item.found)
+
+    return BatchSearchResponse(
+        results=items, found=found, missing=len(items) - found
+    )
+
+
+@router.get(
+    "/definition/{word}",
+    response_model=WordDefinition,
+    responses={404: {"model": WordNotFoundResponse}},
+)
 async def get_definition(word: str):
     """
     获取英文单词释义（带中文翻译）
@@ -91,26 +142,25 @@ async def get_definition(word: str):
         # 获取词典释义
         definition = await dict_service.get_definition(word)
 
-        # 翻译单词为中文
-        chinese_translation = await trans_service.translate(
-            word, src='en', dest='zh-CN'
-        )
-
-        # 翻译所有释义
-        translated_meanings = []
-        for meaning in definition.meanings:
-            translated_meaning = await trans_service.translate_meaning(meaning)
-            translated_meanings.append(translated_meaning)
-
-        result = WordDefinition(
-            word=definition.word,
-            phonetic=definition.phonetic,
-            chinese=chinese_translation,
-            meanings=translated_meanings,
-        )
+        # 词头、释义、例句去重后一次批量翻译
+        result = await trans_service.translate_definition(definition)
 
         print(f"=== Definition Complete ===\n")
         return result
 
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+        return await word_not_found(word, str(e))
+    except (BackpressureError, ExecutorTimeoutError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/dictionary/stats")
+async def get_dictionary_stats():
+    """词典服务统计（连接池、查询线程池、缓存等）"""
+    return dict_service.get_stats()
+
+
+@router.get("/translation/stats")
+async def get_translation_stats():
+    """翻译服务统计（两级缓存命中率等）"""
+    return trans_service.get_stats()
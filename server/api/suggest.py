@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Query
+from models.search import SuggestResponse, FuzzySuggestResponse
+from services import (
+    get_dictionary_service,
+    BackpressureError,
+    ExecutorTimeoutError,
+)
+from services.word_index import TOP_K
+
+router = APIRouter(prefix="/api", tags=["suggest"])
+
+# 初始化服务
+dict_service = get_dictionary_service()
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest_words(
+    prefix: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(10, ge=1, le=TOP_K),
+    ranked: bool = Query(True, description="按词频排序（false 为字母顺序）"),
+):
+    """
+    单词前缀自动补全
+
+    使用启动时构建的内存前缀索引，每次查询只需一次二分查找；
+    索引构建完成前回退到 SQL 前缀查询。
+    """
+    try:
+        suggestions = await dict_service.suggest(prefix, limit, ranked)
+    except (BackpressureError, ExecutorTimeoutError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return SuggestResponse(prefix=prefix, suggestions=suggestions)
+
+
+@router.get("/suggest/fuzzy", response_model=FuzzySuggestResponse)
+async def suggest_fuzzy(
+    word: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(5, ge=1, le=20),
+):
+    """
+    拼写纠错（"did you mean"）
+
+    在常用词表中查找编辑距离不超过 2 的候选，按（编辑距离, 词频）排序，
+    查询有固定的时间预算（DICT_FUZZY_BUDGET_MS）。
+    """
+    try:
+        suggestions = await dict_service.suggest_corrections(word, limit)
+    except (BackpressureError, ExecutorTimeoutError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return FuzzySuggestResponse(word=word, suggestions=suggestions)
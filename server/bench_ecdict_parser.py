@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+ECDICT 释义解析器微基准测试
+
+对比旧版解析逻辑（每次调用 import re、使用字符串正则、每次重建
+pos_map、逐个校验构建 pydantic 对象）与 services/ecdict_parser
+的性能，并校验两者输出一致。
+
+样本优先从 data/dict/stardict.db 中随机抽取真实词条，
+数据库不存在时使用内置样本。
+
+用法:
+    uv run python bench_ecdict_parser.py
+    uv run python bench_ecdict_parser.py --rows 5000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from models.word import WordDefinition, Meaning, Definition
+from services.ecdict_parser import transform_row
+
+
+Row = Tuple[str, Optional[str], Optional[str], Optional[str]]
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "data", "dict", "stardict.db")
+
+BUILTIN_ROWS: List[Row] = [
+    ("hello", "hә'lәu", "interj. 喂, 嘿\nn. 问候, 招呼",
+     "n. an expression of greeting\nv. call out to somebody"),
+    ("test", "test", "n. 测试, 考验, 试验\nvt. 测试, 检验\n[计] 测试",
+     "n. trying something to find out about it\nv. put to the test"),
+    ("result", "ri'zʌlt", "n. 结果, 成绩, 答案\nvi. 导致, 起因于",
+     "n. a phenomenon that follows and is caused by some previous phenomenon"),
+    ("run", "rʌn", "vi. 跑, 运转, 竞选\nvt. 经营, 运行\nn. 奔跑, 赛跑",
+     "v. move fast by using one's feet\nn. a race run on foot"),
+    ("algorithm", "'ælgәriðm", "n. 算法, 运算法则",
+     "n. a precise rule specifying how to solve some problem"),
+    ("iPhone", None, "苹果手机", None),
+    ("xyz", None, None, None),
+]
+
+
+# ---------------------------------------------------------------------------
+# 旧版实现（保持原样，作为对照组）
+# ---------------------------------------------------------------------------
+
+def legacy_transform(word, phonetic, translation, definition) -> WordDefinition:
+    formatted_phonetic = None
+    if phonetic:
+        if not phonetic.startswith('/'):
+            formatted_phonetic = f"/{phonetic}/"
+        else:
+            formatted_phonetic = phonetic
+
+    meanings = []
+    if translation or definition:
+        combined_text = ""
+        if translation:
+            combined_text = translation
+        if definition:
+            if combined_text:
+                combined_text += "\n" + definition
+            else:
+                combined_text = definition
+        meanings = legacy_parse_definitions(combined_text)
+
+    if not meanings:
+        meanings = [
+            Meaning(
+                part_of_speech="general",
+                definitions=[
+                    Definition(
+                        definition=definition or "No definition available",
+                        definition_chinese=translation,
+                        example=None,
+                        example_chinese=None
+                    )
+                ]
+            )
+        ]
+
+    return WordDefinition(
+        word=word,
+        phonetic=formatted_phonetic,
+        chinese=legacy_extract_chinese_only(translation),
+        meanings=meanings
+    )
+
+
+def legacy_extract_chinese_only(translation):
+    if not translation:
+        return None
+
+    import re
+    chinese = re.sub(r'^[a-z]+\.\s*', '', translation, flags=re.IGNORECASE)
+    chinese = chinese.split('\n')[0].strip()
+    return chinese if chinese else None
+
+
+def legacy_parse_definitions(text):
+    meanings = []
+    current_pos = None
+    current_defs = []
+
+    import re
+
+    lines = text.split('\n')
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        pos_match = re.match(r'^([a-z]+)\.\s+(.+)', line, re.IGNORECASE)
+
+        if pos_match:
+            if current_pos and current_defs:
+                meanings.append(
+                    Meaning(part_of_speech=current_pos, definitions=current_defs)
+                )
+
+            current_pos = legacy_normalize_pos(pos_match.group(1))
+            definition_text = pos_match.group(2)
+
+            parts = re.split(r'[;；,，]', definition_text)
+            current_defs = [
+                Definition(
+                    definition=part.strip(),
+                    definition_chinese=part.strip(),
+                    example=None,
+                    example_chinese=None
+                )
+                for part in parts if part.strip()
+            ]
+        else:
+            if not current_pos:
+                current_pos = "general"
+                current_defs = []
+
+            current_defs.append(
+                Definition(
+                    definition=line,
+                    definition_chinese=line,
+                    example=None,
+                    example_chinese=None
+                )
+            )
+
+    if current_pos and current_defs:
+        meanings.append(
+            Meaning(part_of_speech=current_pos, definitions=current_defs)
+        )
+
+    return meanings
+
+
+def legacy_normalize_pos(pos):
+    pos_map = {
+        'n': 'noun',
+        'v': 'verb',
+        'adj': 'adjective',
+        'adv': 'adverb',
+        'prep': 'preposition',
+        'conj': 'conjunction',
+        'interj': 'interjection',
+        'pron': 'pronoun',
+        'art': 'article',
+        'det': 'determiner',
+        'num': 'numeral',
+    }
+    return pos_map.get(pos.lower(), pos)
+
+
+# ---------------------------------------------------------------------------
+
+def load_rows(count: int) -> List[Row]:
+    """从 ECDICT 数据库随机抽样，数据库不存在时使用内置样本"""
+    if not os.path.exists(DB_PATH):
+        print("⚠️  未找到 ECDICT 数据库，使用内置样本")
+        return BUILTIN_ROWS
+
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    try:
+        max_id = conn.execute("SELECT MAX(id) FROM stardict").fetchone()[0] or 0
+        ids = random.sample(range(1, max_id + 1), min(count, max_id))
+        rows: List[Row] = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows.extend(conn.execute(
+                "SELECT word, phonetic, translation, definition FROM stardict "
+                f"WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall())
+        return rows or BUILTIN_ROWS
+    finally:
+        conn.close()
+
+
+def bench(func, rows: List[Row], repeat: int) -> float:
+    """返回每行平均耗时（微秒），取多轮中的最小值"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            func(*row)
+        best = min(best, time.perf_counter() - start)
+    return best / len(rows) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2000, help="样本行数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复轮数")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    rows = load_rows(args.rows)
+
+    print("=" * 60)
+    print(f"ECDICT 解析器基准测试（样本 {len(rows)} 行，{args.repeat} 轮）")
+    print("=" * 60)
+
+    # 输出一致性校验
+    mismatches = 0
+    for row in rows:
+        if legacy_transform(*row).model_dump() != transform_row(*row).model_dump():
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"❌ 输出不一致: {row[0]!r}")
+    if mismatches:
+        print(f"❌ {mismatches} 行输出不一致")
+        return 1
+    print("✅ 新旧解析器输出一致")
+
+    legacy_us = bench(legacy_transform, rows, args.repeat)
+    new_us = bench(transform_row, rows, args.repeat)
+
+    print(f"\n旧版解析器: {legacy_us:8.2f} µs/行")
+    print(f"新版解析器: {new_us:8.2f} µs/行")
+    print(f"加速比:     {legacy_us / new_us:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+收藏存储基准测试
+
+分别用 JSON 文件、SQLite 后端和 SQLite + 内存索引写回日志预置 N 条收藏，
+测量 add / check（命中与未命中）/ get_all / remove 的平均耗时。
+数据写在临时目录，不影响 data/。
+
+用法:
+    uv run python bench_favorites.py
+    uv run python bench_favorites.py --sizes 10000 100000 --ops 20
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from models.favorite import Favorite, FavoriteCreate
+from services.favorites import FavoritesService
+from services.favorites_store import (
+    JsonFavoritesStore, SQLiteFavoritesStore, WriteBehindFavoritesStore,
+)
+
+
+def make_favorites(count: int) -> List[Favorite]:
+    """生成 count 条收藏（word0 最新）"""
+    now = datetime.now()
+    return [
+        Favorite(
+            id=f"id-{i}",
+            word=f"word{i}",
+            phonetic=f"/wɜːd{i}/",
+            chinese=f"单词{i}",
+            created_at=now - timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def prefill_json(path: str, favorites: List[Favorite]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"favorites": [
+                {**fav.model_dump(), "created_at": fav.created_at.isoformat()}
+                for fav in favorites
+            ]},
+            f, ensure_ascii=False, indent=2,
+        )
+
+
+def timed(func: Callable, args: List) -> float:
+    """对每个参数调用 func，返回平均毫秒数"""
+    started = time.perf_counter()
+    for arg in args:
+        func(arg)
+    return (time.perf_counter() - started) * 1000 / max(len(args), 1)
+
+
+def bench(service: FavoritesService, size: int, ops: int) -> dict:
+    new_words = [f"new{i}" for i in range(ops)]
+    hits = [f"WORD{i * (size // ops)}" for i in range(ops)]
+
+    results = {
+        "add": timed(lambda w: service.add(FavoriteCreate(word=w)), new_words),
+        "check_hit": timed(service.check, hits),
+        "check_miss": timed(service.check, [f"missing{i}" for i in range(ops)]),
+        "get_all": timed(lambda _: service.get_all(), range(3)),
+    }
+    ids = [service.check(w).id for w in new_words]
+    results["remove"] = timed(service.remove, ids)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark favorites storage backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--ops", type=int, default=20, help="每种操作的次数")
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'size':>7} {'add':>10} {'check_hit':>10} "
+          f"{'check_miss':>10} {'get_all':>10} {'remove':>10}   (ms/op)")
+    for size in args.sizes:
+        favorites = make_favorites(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "favorites.json")
+            prefill_json(json_path, favorites)
+            json_service = FavoritesService(JsonFavoritesStore(json_path))
+
+            sqlite_store = SQLiteFavoritesStore(os.path.join(tmp, "favorites.db"))
+            sqlite_store.insert_many(favorites)
+            sqlite_service = FavoritesService(sqlite_store)
+
+            backing = SQLiteFavoritesStore(os.path.join(tmp, "write_behind.db"))
+            backing.insert_many(favorites)
+            write_behind_store = WriteBehindFavoritesStore(
+                backing, os.path.join(tmp, "favorites.journal")
+            )
+            write_behind_service = FavoritesService(write_behind_store)
+
+            for name, service in (
+                ("json", json_service),
+                ("sqlite", sqlite_service),
+                ("memory", write_behind_service),
+            ):
+                r = bench(service, size, args.ops)
+                print(f"{name:<8} {size:>7} {r['add']:>10.3f} {r['check_hit']:>10.3f} "
+                      f"{r['check_miss']:>10.3f} {r['get_all']:>10.3f} {r['remove']:>10.3f}")
+            sqlite_store.close()
+            write_behind_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+翻译提供方基准测试
+
+对同一批样本分别调用各翻译提供方，比较耗时、请求数和覆盖率
+（能回答的样本比例）。样本为词典中随机抽取的单词，加上几条句子。
+
+默认只测试离线提供方和 FakeProvider；Google 需要网络，用 --google 开启。
+
+用法:
+    uv run python bench_translation_providers.py
+    uv run python bench_translation_providers.py --words 500 --google
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import time
+from typing import List
+
+from services.dictionary import get_dictionary_service
+from services.translation import TranslationService, chunk_texts, DEFAULT_PHRASE_TABLE
+from services.translation_providers import (
+    TranslationProvider, GoogleProvider, OfflineProvider, FakeProvider,
+)
+
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "data", "dict", "stardict.db")
+
+SENTENCES = [
+    "an expression of greeting",
+    "move fast by using one's feet",
+    "a phenomenon that follows and is caused by some previous phenomenon",
+    "He runs every morning before work.",
+]
+
+
+def load_words(count: int) -> List[str]:
+    """从 ECDICT 随机抽取有词频排名的单词"""
+    if not os.path.exists(DB_PATH):
+        return ["hello", "world", "run", "test", "result", "give up"]
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT word FROM stardict WHERE frq > 0 OR bnc > 0"
+        ).fetchall()
+    finally:
+        conn.close()
+    words = [row[0] for row in rows]
+    return random.sample(words, min(count, len(words)))
+
+
+def run_provider(provider: TranslationProvider, texts: List[str]):
+    """按提供方的批量参数翻译全部样本，返回 (秒, 请求数, 回答数)"""
+    started = time.perf_counter()
+    results = []
+    if provider.batch_delimiter is None:
+        chunks = [texts[i:i + 500] for i in range(0, len(texts), 500)]
+        for chunk in chunks:
+            if asyncio.iscoroutinefunction(provider.translate_batch):
+                results.extend(asyncio.run(provider.translate_batch(chunk, 'en', 'zh-CN')))
+            else:
+                results.extend(provider.translate_batch(chunk, 'en', 'zh-CN'))
+    else:
+        chunks = chunk_texts(texts, provider.max_chars, provider.batch_delimiter)
+        for chunk in chunks:
+            answers = TranslationService._translate_joined(
+                provider, chunk, 'en', 'zh-CN'
+            )
+            results.extend(answers or [None] * len(chunk))
+    elapsed = time.perf_counter() - started
+    return elapsed, len(chunks), sum(1 for result in results if result)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--words", type=int, default=200, help="样本单词数")
+    parser.add_argument("--google", action="store_true", help="同时测试 Google（需要网络）")
+    parser.add_argument("--fake-latency", type=float, default=0.2, help="FakeProvider 每次请求的延迟")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    texts = load_words(args.words) + SENTENCES
+
+    providers: List[TranslationProvider] = [
+        OfflineProvider(get_dictionary_service(), DEFAULT_PHRASE_TABLE),
+        FakeProvider(latency=args.fake_latency),
+    ]
+    if args.google:
+        providers.append(GoogleProvider())
+
+    print("=" * 60)
+    print(f"翻译提供方基准测试（样本 {len(texts)} 条）")
+    print("=" * 60)
+    print(f"{'提供方':<10}{'耗时(ms)':>10}{'请求数':>8}{'覆盖率':>10}{'成本':>8}")
+
+    for provider in providers:
+        try:
+            elapsed, requests, answered = run_provider(provider, texts)
+        except Exception as e:
+            print(f"{provider.name:<10} ❌ {e}")
+            continue
+        print(
+            f"{provider.name:<10}{elapsed * 1000:>10.1f}{requests:>8}"
+            f"{answered / len(texts):>10.1%}{requests * provider.cost:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
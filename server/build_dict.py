@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+构建预编译词典 data/dict/compiled.db
+
+用法:
+    uv run python build_dict.py
+    uv run python build_dict.py --source data/dict/stardict.db --target data/dict/compiled.db
+"""
+
+import sys
+
+from dotenv import load_dotenv
+
+# 与 main.py 一致：在导入 services 之前加载 .env，否则其中的配置不会生效
+load_dotenv()
+
+from services.compiled_dict import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
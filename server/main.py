@@ -1,18 +1,62 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+import asyncio
 import os
 
-from api import search_router, favorites_router, llm_router
-
-# 加载环境变量
+# 加载环境变量（必须在导入 api / services 之前：它们在导入时创建服务并读取配置）
 load_dotenv()
 
+from api import search_router, favorites_router, llm_router, suggest_router
+from api.search import trans_service
+from api.favorites import favorites_service
+from services import get_dictionary_service
+
+
+def run_in_background(loop: asyncio.AbstractEventLoop, name: str, func, *args):
+    """在默认线程池中执行启动任务，不等待结果；任务出错时打印错误"""
+    def report(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Background task {name} failed: {future.exception()!r}")
+
+    loop.run_in_executor(None, func, *args).add_done_callback(report)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用启动/关闭钩子"""
+    loop = asyncio.get_running_loop()
+
+    # 后台预热词典缓存（不阻塞启动）
+    warm_list = os.getenv("DICT_WARM_LIST")
+    if warm_list and os.path.exists(warm_list):
+        run_in_background(
+            loop, "dictionary warmup", get_dictionary_service().warm_cache_from_file, warm_list
+        )
+
+    # 后台从导出文件预热翻译缓存
+    translation_seed = os.getenv("TRANSLATION_CACHE_SEED")
+    if translation_seed and os.path.exists(translation_seed):
+        run_in_background(
+            loop, "translation cache seeding", trans_service.seed_cache, translation_seed
+        )
+
+    # 后台构建内存索引（自动补全等），构建完成前查询回退到 SQL
+    if os.getenv("DICT_BUILD_INDEXES", "true").lower() == "true":
+        run_in_background(loop, "index build", get_dictionary_service().build_indexes)
+
+    yield
+
+    # 写入收藏日志中尚未持久化的操作
+    favorites_service.close()
+
 # 创建 FastAPI 应用
 app = FastAPI(
     title="Air Dict API",
     description="轻量级英文词典 API - 双向翻译 + 收藏功能 + LLM 增强",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS 配置
@@ -28,6 +72,7 @@ app.add_middleware(
 app.include_router(search_router)
 app.include_router(favorites_router)
 app.include_router(llm_router)
+app.include_router(suggest_router)
 
 
 @app.get("/health")
@@ -49,16 +94,28 @@ async def root():
             "health": "/health",
             "docs": "/docs",
             "search": "POST /api/search",
+            "search_batch": "POST /api/search/batch",
             "definition": "GET /api/definition/{word}",
+            "suggest": "GET /api/suggest?prefix=&limit=",
+            "suggest_fuzzy": "GET /api/suggest/fuzzy?word=&limit=",
+            "dictionary_stats": "GET /api/dictionary/stats",
+            "translation_stats": "GET /api/translation/stats",
+            "llm_stats": "GET /api/llm/stats",
             "llm": {
                 "explain": "POST /api/llm-explain",
                 "explain_get": "GET /api/llm-explain/{word}",
+                "explain_stream": "GET /api/llm-explain/{word}/stream",
             },
             "favorites": {
-                "list": "GET /api/favorites",
+                "list": "GET /api/favorites?limit=&cursor=",
+                "expanded": "GET /api/favorites/expanded?limit=&cursor=",
+                "changes": "GET /api/favorites/changes?since=",
                 "add": "POST /api/favorites",
                 "delete": "DELETE /api/favorites/{id}",
                 "check": "GET /api/favorites/check/{word}",
+                "bulk": "POST /api/favorites/bulk",
+                "check_batch": "POST /api/favorites/check",
+                "export": "GET /api/favorites/export?format=ndjson|csv",
             },
         },
     }
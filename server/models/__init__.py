@@ -1,5 +1,9 @@
 from .word import WordDefinition, Meaning, Definition
-from .favorite import Favorite, FavoriteCreate
+from .favorite import (
+    Favorite, FavoriteCreate, FavoriteExpanded, FavoriteTombstone, FavoriteChanges,
+    FavoriteBulkRequest, FavoriteBulkResponse,
+    FavoriteCheckRequest, FavoriteCheckItem, FavoriteCheckResponse,
+)
 from .search import SearchRequest, SearchResponse
 
 __all__ = [
@@ -8,6 +12,14 @@ __all__ = [
     'Definition',
     'Favorite',
     'FavoriteCreate',
+    'FavoriteExpanded',
+    'FavoriteTombstone',
+    'FavoriteChanges',
+    'FavoriteBulkRequest',
+    'FavoriteBulkResponse',
+    'FavoriteCheckRequest',
+    'FavoriteCheckItem',
+    'FavoriteCheckResponse',
     'SearchRequest',
     'SearchResponse',
 ]
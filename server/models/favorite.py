@@ -1,6 +1,10 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
+from .word import WordDefinition
+
+
+DEFAULT_USER = "default"
 
 
 class FavoriteCreate(BaseModel):
@@ -17,8 +21,62 @@ class Favorite(BaseModel):
     phonetic: Optional[str] = None
     chinese: Optional[str] = None
     created_at: datetime
+    user_id: str = DEFAULT_USER
+    version: int = 0  # 添加时的变更版本号（用于增量同步）
 
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
+
+
+class FavoriteExpanded(Favorite):
+    """附带词典释义的收藏记录（复习 / 卡片列表用，词典中没有的单词为 None）"""
+    definition: Optional[WordDefinition] = None
+
+
+class FavoriteTombstone(BaseModel):
+    """已删除收藏的记录（增量同步时告知客户端删除）"""
+    id: str
+    word: str
+    user_id: str = DEFAULT_USER
+    version: int  # 删除时的变更版本号
+
+
+class FavoriteChanges(BaseModel):
+    """增量同步结果"""
+    version: int  # 下次同步时作为 since 传入
+    added: List[Favorite] = []
+    removed: List[FavoriteTombstone] = []
+    has_more: bool = False  # 变更超过 limit，需要用新的 version 继续拉取
+    full_resync: bool = False  # since 太旧（删除记录已清理），需要重新拉取完整列表
+
+
+class FavoriteBulkRequest(BaseModel):
+    """批量添加收藏请求"""
+    favorites: List[FavoriteCreate] = Field(..., max_length=5000)
+
+
+class FavoriteBulkResponse(BaseModel):
+    """批量添加结果（favorites 与去重后的请求顺序一致，已收藏的返回现有记录）"""
+    favorites: List[Favorite]
+    added: int
+    existing: int
+
+
+class FavoriteCheckRequest(BaseModel):
+    """批量检查收藏请求"""
+    words: List[str] = Field(..., max_length=1000)
+
+
+class FavoriteCheckItem(BaseModel):
+    """单个单词的收藏状态"""
+    word: str
+    is_favorited: bool
+    favorite_id: Optional[str] = None
+
+
+class FavoriteCheckResponse(BaseModel):
+    """批量检查结果（与请求顺序一致）"""
+    results: List[FavoriteCheckItem]
+    favorited: int
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 
 
@@ -18,11 +18,33 @@ class EnglishResult(BaseModel):
     word: str
     phonetic: Optional[str] = None
     meanings: List[SimpleMeaning]
+    lemma: Optional[str] = None  # 原形（查询词是变形词时）
+    lemma_meanings: Optional[List[SimpleMeaning]] = None  # 原形的释义
+
+
+class BatchSearchRequest(BaseModel):
+    """批量查询请求"""
+    words: List[str] = Field(..., max_length=500)
+
+
+class BatchSearchItem(BaseModel):
+    """批量查询中单个单词的结果"""
+    query: str
+    found: bool
+    result: Optional[EnglishResult] = None
+
+
+class BatchSearchResponse(BaseModel):
+    """批量查询响应（与请求顺序一致）"""
+    results: List[BatchSearchItem]
+    found: int
+    missing: int
 
 
 class ChineseResult(BaseModel):
     """中文翻译结果"""
     translations: List[str]  # 翻译结果列表
+    source: Optional[str] = None  # local: 本地词典反查, google: 在线翻译
 
 
 class SearchResponse(BaseModel):
@@ -31,3 +53,21 @@ class SearchResponse(BaseModel):
     is_chinese: bool
     english_result: Optional[EnglishResult] = None
     chinese_result: Optional[ChineseResult] = None
+
+
+class SuggestResponse(BaseModel):
+    """自动补全响应"""
+    prefix: str
+    suggestions: List[str]
+
+
+class FuzzySuggestResponse(BaseModel):
+    """拼写纠错响应"""
+    word: str
+    suggestions: List[str]
+
+
+class WordNotFoundResponse(BaseModel):
+    """单词未找到（404）响应，附带拼写纠错候选"""
+    detail: str
+    suggestions: List[str] = []
@@ -22,3 +22,11 @@ class WordDefinition(BaseModel):
     phonetic: Optional[str] = None
     chinese: Optional[str] = None
     meanings: List[Meaning]
+
+    # 查询词是变形词时（如 running / mice / better）附带原形及其释义
+    lemma: Optional[str] = None
+    lemma_entry: Optional["WordDefinition"] = None
+
+    # 在线翻译状态（仅 /api/definition 设置）:
+    # translated 全部翻译, degraded 部分使用 ECDICT 中文, missing 没有在线翻译
+    translation_status: Optional[str] = None
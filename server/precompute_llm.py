@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+为高频词预先生成 LLM 解释（写入解释缓存，可断点续跑）
+
+用法:
+    uv run python precompute_llm.py --top 5000
+    uv run python precompute_llm.py --top 20000 --max-calls 5000 --concurrency 8 --rate 4
+    uv run python precompute_llm.py --words data/dict/warm_words.txt
+"""
+
+import sys
+
+from dotenv import load_dotenv
+
+# 与 main.py 一致：在导入 services 之前加载 .env，否则其中的配置不会生效
+load_dotenv()
+
+from services.llm_precompute import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,13 @@
-from .dictionary import DictionaryService
+from .dictionary import DictionaryService, get_dictionary_service
 from .translation import TranslationService
 from .favorites import FavoritesService
+from .concurrency import BackpressureError, ExecutorTimeoutError
 
-__all__ = ['DictionaryService', 'TranslationService', 'FavoritesService']
+__all__ = [
+    'DictionaryService',
+    'get_dictionary_service',
+    'TranslationService',
+    'FavoritesService',
+    'BackpressureError',
+    'ExecutorTimeoutError',
+]
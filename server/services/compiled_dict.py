@@ -0,0 +1,301 @@
+"""
+预编译词典（compiled ECDICT artifact）
+
+离线遍历一次 stardict.db，把每个词条的解析结果写入旁路文件
+data/dict/compiled.db：
+
+- key: 小写单词
+- data: zlib 压缩的紧凑 JSON，包含格式化后的音标、提取好的中文释义、
+  按词性拆分好的释义列表
+- lemma: 词条自身 exchange 字段中的原形（变形词才有）
+
+同时生成中译英反查表 zh_gloss：(中文释义词, 词频排名, 义项序号, 单词)，
+以 (gloss, rank, sense, word) 为主键的聚簇表，反查只需一次范围扫描；
+以及释义词的字符二元组索引 zh_gloss_gram：(二元组, 释义词)，用于查找
+包含查询词的释义（"苹果" -> "苹果树"、"青苹果"）。
+
+DictionaryService 检测到该文件且版本、来源匹配时直接从中读取，
+请求路径上只需一次主键查询 + 解压 + 校验。
+
+用法（见 build_dict.py）:
+    uv run python build_dict.py
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from .ecdict_parser import transform_row_data, extract_glosses
+from .word_index import frequency_rank
+from .lemma_index import lemma_of
+
+
+# 编码格式或解析逻辑变化时递增，旧文件会被忽略
+FORMAT_VERSION = "4"
+
+DEFAULT_SOURCE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "dict", "stardict.db"
+)
+DEFAULT_TARGET = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "dict", "compiled.db"
+)
+
+
+def source_fingerprint(source: str) -> str:
+    """来源数据库指纹（大小 + 修改时间），用于检测词典是否已更新"""
+    stat = os.stat(source)
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def gloss_grams(text: str) -> List[str]:
+    """
+    字符二元组（去重，保持顺序），少于两个字符时为空
+
+    例如: "苹果树" -> ["苹果", "果树"]
+    """
+    text = ''.join(text.split())
+    grams: List[str] = []
+    for i in range(len(text) - 1):
+        gram = text[i:i + 2]
+        if gram not in grams:
+            grams.append(gram)
+    return grams
+
+
+def encode_entry(data: Dict[str, Any]) -> bytes:
+    """
+    将 transform_row_data 的结果编码为紧凑 blob
+
+    常规词条的 definition 与 definition_chinese 相同，且没有例句，
+    只存 [词性, [释义...]]；无法解析的词条存原始文本作为回退。
+    """
+    meanings = data["meanings"]
+    payload: Dict[str, Any] = {"w": data["word"]}
+    if data["phonetic"]:
+        payload["p"] = data["phonetic"]
+    if data["chinese"]:
+        payload["c"] = data["chinese"]
+
+    if len(meanings) == 1 and meanings[0]["part_of_speech"] == "general" and (
+        meanings[0]["definitions"][0]["definition"]
+        != meanings[0]["definitions"][0]["definition_chinese"]
+    ):
+        item = meanings[0]["definitions"][0]
+        payload["f"] = [item["definition"], item["definition_chinese"]]
+    else:
+        payload["m"] = [
+            [m["part_of_speech"], [d["definition"] for d in m["definitions"]]]
+            for m in meanings
+        ]
+
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"))
+
+
+def decode_entry(blob: bytes) -> Dict[str, Any]:
+    """将 blob 解码为 WordDefinition 结构的 dict"""
+    payload = json.loads(zlib.decompress(blob))
+
+    if "f" in payload:
+        definition, chinese = payload["f"]
+        meanings = [{
+            "part_of_speech": "general",
+            "definitions": [{
+                "definition": definition,
+                "definition_chinese": chinese,
+                "example": None,
+                "example_chinese": None,
+            }],
+        }]
+    else:
+        meanings = [
+            {
+                "part_of_speech": pos,
+                "definitions": [
+                    {
+                        "definition": text,
+                        "definition_chinese": text,
+                        "example": None,
+                        "example_chinese": None,
+                    }
+                    for text in texts
+                ],
+            }
+            for pos, texts in payload["m"]
+        ]
+
+    return {
+        "word": payload["w"],
+        "phonetic": payload.get("p"),
+        "chinese": payload.get("c"),
+        "meanings": meanings,
+    }
+
+
+def read_meta(conn: sqlite3.Connection) -> Dict[str, str]:
+    """读取预编译文件的元数据"""
+    try:
+        return dict(conn.execute("SELECT name, value FROM meta").fetchall())
+    except sqlite3.Error:
+        return {}
+
+
+def is_compatible(target: str, source: str) -> bool:
+    """预编译文件是否存在，且与当前格式版本和来源数据库匹配"""
+    if not os.path.exists(target):
+        return False
+
+    conn = sqlite3.connect(f"file:{target}?mode=ro", uri=True)
+    try:
+        meta = read_meta(conn)
+    finally:
+        conn.close()
+
+    if meta.get("format_version") != FORMAT_VERSION:
+        print(f"Ignoring compiled dictionary {target}: format version mismatch")
+        return False
+    if os.path.exists(source) and meta.get("source_fingerprint") != source_fingerprint(source):
+        print(f"Ignoring compiled dictionary {target}: source database changed")
+        return False
+    return True
+
+
+def build(
+    source: str = DEFAULT_SOURCE,
+    target: str = DEFAULT_TARGET,
+    batch_size: int = 5000,
+    progress: bool = True,
+) -> Dict[str, Any]:
+    """
+    构建预编译词典
+
+    先写入临时文件，完成后原子替换，构建过程中不影响正在运行的服务。
+
+    Returns:
+        dict: 构建统计（词条数、耗时、文件大小）
+    """
+    started = time.perf_counter()
+    tmp_path = target + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        dst.execute("PRAGMA journal_mode = OFF")
+        dst.execute("PRAGMA synchronous = OFF")
+        dst.execute(
+            "CREATE TABLE entries (key TEXT PRIMARY KEY, data BLOB NOT NULL, "
+            "lemma TEXT) WITHOUT ROWID"
+        )
+        dst.execute(
+            "CREATE TABLE zh_gloss (gloss TEXT NOT NULL, rank INTEGER NOT NULL, "
+            "sense INTEGER NOT NULL, word TEXT NOT NULL, "
+            "PRIMARY KEY (gloss, rank, sense, word)) WITHOUT ROWID"
+        )
+        dst.execute(
+            "CREATE TABLE zh_gloss_gram (gram TEXT NOT NULL, gloss TEXT NOT NULL, "
+            "PRIMARY KEY (gram, gloss)) WITHOUT ROWID"
+        )
+        dst.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)")
+
+        total = src.execute("SELECT COUNT(*) FROM stardict").fetchone()[0]
+        cursor = src.execute(
+            "SELECT word, phonetic, translation, definition, exchange, frq, bnc "
+            "FROM stardict ORDER BY id"
+        )
+
+        count = 0
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            dst.executemany(
+                "INSERT OR IGNORE INTO entries (key, data, lemma) VALUES (?, ?, ?)",
+                [
+                    (
+                        word.lower(),
+                        encode_entry(
+                            transform_row_data(word, phonetic, translation, definition)
+                        ),
+                        lemma_of(word, exchange),
+                    )
+                    for word, phonetic, translation, definition, exchange, _, _ in rows
+                ],
+            )
+            dst.executemany(
+                "INSERT INTO zh_gloss (gloss, rank, sense, word) VALUES (?, ?, ?, ?)",
+                [
+                    (gloss, frequency_rank(frq, bnc), sense, word)
+                    for word, _, translation, _, exchange, frq, bnc in rows
+                    # 变形词（mice、ran）与原形释义重复，不参与反查
+                    if lemma_of(word, exchange) is None
+                    for sense, gloss in enumerate(extract_glosses(translation))
+                ],
+            )
+            count += len(rows)
+            if progress:
+                print(f"\r  {count}/{total} entries", end="", flush=True)
+        if progress:
+            print()
+
+        # 二元组索引建在去重后的释义词上，同一释义词对应的多个单词共用
+        glosses = dst.execute("SELECT DISTINCT gloss FROM zh_gloss")
+        while True:
+            rows = glosses.fetchmany(batch_size)
+            if not rows:
+                break
+            dst.executemany(
+                "INSERT INTO zh_gloss_gram (gram, gloss) VALUES (?, ?)",
+                [(gram, gloss) for (gloss,) in rows for gram in gloss_grams(gloss)],
+            )
+
+        dst.executemany(
+            "INSERT INTO meta (name, value) VALUES (?, ?)",
+            [
+                ("format_version", FORMAT_VERSION),
+                ("source_fingerprint", source_fingerprint(source)),
+                ("built_at", str(int(time.time()))),
+            ],
+        )
+        dst.commit()
+        dst.execute("VACUUM")
+    finally:
+        src.close()
+        dst.close()
+
+    os.replace(tmp_path, target)
+
+    return {
+        "entries": count,
+        "seconds": round(time.perf_counter() - started, 2),
+        "bytes": os.path.getsize(target),
+    }
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the compiled ECDICT artifact")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="stardict.db 路径")
+    parser.add_argument("--target", default=DEFAULT_TARGET, help="输出文件路径")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        print(f"❌ ECDICT database not found at {args.source}")
+        return 1
+
+    print(f"📚 Building compiled dictionary from {args.source}")
+    stats = build(args.source, args.target)
+    print(
+        f"✅ {stats['entries']} entries -> {args.target} "
+        f"({stats['bytes'] / 1024 / 1024:.1f} MB, {stats['seconds']}s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
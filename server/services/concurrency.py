@@ -0,0 +1,453 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class BackpressureError(RuntimeError):
+    """等待队列已满，拒绝新的任务"""
+
+
+class ExecutorTimeoutError(TimeoutError):
+    """任务在规定时间内没有完成"""
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断器处于打开状态，拒绝调用"""
+
+
+class BoundedExecutor:
+    """
+    有界线程池执行器
+
+    在专用线程池中执行阻塞调用，避免阻塞 asyncio 事件循环，并且：
+    - 限制排队 + 执行中的任务数量，超出时立即抛出 BackpressureError
+    - 每个任务有超时时间，超时抛出 ExecutorTimeoutError
+      （尚未开始执行的任务会被取消）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_pending: int,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            name: 线程名前缀
+            max_workers: 工作线程数
+            max_pending: 最大排队 + 执行中的任务数
+            timeout: 默认超时时间，秒（None 表示不限制）
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        # 统计信息
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._busy_time = 0.0
+
+    def _on_done(self, started: float):
+        def callback(_future):
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._busy_time += time.perf_counter() - started
+        return callback
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        在线程池中执行 func(*args)
+
+        Raises:
+            BackpressureError: 队列已满
+            ExecutorTimeoutError: 超时
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise BackpressureError(
+                    f"{self.name}: too many pending tasks ({self.max_pending})"
+                )
+            self._pending += 1
+            self._submitted += 1
+
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        # 计数在线程真正结束时才释放，超时的任务仍然占用队列名额
+        future.add_done_callback(self._on_done(time.perf_counter()))
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self._timeouts += 1
+            raise ExecutorTimeoutError(
+                f"{self.name}: task did not finish within {timeout}s"
+            )
+
+    def shutdown(self, wait: bool = False):
+        """关闭线程池"""
+        self._executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, float]:
+        """执行器统计"""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "avg_task_ms": (
+                    round(self._busy_time / self._completed * 1000, 3)
+                    if self._completed else 0.0
+                ),
+            }
+
+
+class TokenBucket:
+    """
+    令牌桶限流（asyncio）
+
+    以 rate 个/秒的速度补充令牌，最多积累 capacity 个。令牌不足时
+    预留后等待补足，并发调用按到达顺序依次获得令牌。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: 每秒补充的令牌数（<= 0 表示不限流）
+            capacity: 桶容量，即允许的突发请求数（默认等于 rate，至少为 1）
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self._acquired = 0
+        self._throttled = 0
+        self._waited = 0.0
+
+    def _reserve(self, tokens: float) -> float:
+        """扣除令牌（可以透支），返回需要等待的秒数"""
+        with self._lock:
+            self._acquired += 1
+            if self.rate <= 0:
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            wait = -self._tokens / self.rate
+            self._throttled += 1
+            self._waited += wait
+            return wait
+
+    async def acquire(self, tokens: float = 1.0):
+        """获取令牌，不足时等待"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def stats(self) -> Dict[str, float]:
+        """限流统计"""
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "capacity": self.capacity,
+                "acquired": self._acquired,
+                "throttled": self._throttled,
+                "waited_seconds": round(self._waited, 3),
+            }
+
+
+class SingleFlight:
+    """
+    进行中请求合并（asyncio）
+
+    同一个 key 同时只有一个请求真正执行，其余调用方等待同一个 Future。
+    两种用法：
+    - claim / resolve / wait: 调用方声明自己负责的 key，完成后通知等待者
+      （适合一个请求覆盖多个 key 的批量场景）
+    - do: 传入协程工厂，由共享任务执行；单个调用方被取消不影响其他等待者，
+      所有等待者都取消后才取消共享任务
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        # do() 的每个共享任务的等待者数量
+        self._waiters: Dict[Any, int] = {}
+
+        # 统计信息
+        self._started = 0
+        self._coalesced = 0
+        self._abandoned = 0
+
+    def claim(self, keys) -> Tuple[List[Any], Dict[Any, asyncio.Future]]:
+        """
+        声明一组 key
+
+        Returns:
+            (owned, waiting): owned 为需要调用方自己执行的 key，
+            waiting 为已有请求在执行的 key -> Future
+        """
+        loop = asyncio.get_event_loop()
+        owned: List[Any] = []
+        waiting: Dict[Any, asyncio.Future] = {}
+        for key in keys:
+            future = self._inflight.get(key)
+            if future is not None:
+                waiting[key] = future
+                self._coalesced += 1
+            else:
+                self._inflight[key] = loop.create_future()
+                owned.append(key)
+                self._started += 1
+        return owned, waiting
+
+    def resolve(self, key: Any, value: Any):
+        """完成 key 的请求，唤醒等待者"""
+        future = self._inflight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(value)
+
+    @staticmethod
+    async def wait(waiting: Dict[Any, asyncio.Future]) -> Dict[Any, Any]:
+        """等待其他调用方的结果（取消等待不影响正在执行的请求）"""
+        if not waiting:
+            return {}
+        values = await asyncio.gather(
+            *[asyncio.shield(future) for future in waiting.values()]
+        )
+        return dict(zip(waiting.keys(), values))
+
+    async def do(self, key: Any, factory: Callable[[], Any]) -> Any:
+        """
+        执行 factory() 返回的协程，相同 key 的并发调用共享同一个任务
+
+        Raises:
+            共享任务抛出的异常
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self._started += 1
+        else:
+            self._coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # 最后一个等待者离开时取消共享任务，新的调用方重新开始
+            if (
+                not task.done()
+                and self._inflight.get(key) is task
+                and self._waiters[key] == 1
+            ):
+                self._forget(key, task)
+                task.cancel()
+                self._abandoned += 1
+            raise
+        finally:
+            if self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: Any, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._waiters.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, int]:
+        """合并统计"""
+        return {
+            "inflight": len(self._inflight),
+            "started": self._started,
+            "coalesced": self._coalesced,
+            "abandoned": self._abandoned,
+        }
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    统计最近 window 次调用，失败率或慢调用率超过阈值时打开熔断，
+    reset_timeout 秒内直接拒绝；之后进入半开状态放行一次探测调用，
+    成功则关闭，失败则重新打开。
+
+    allow() 放行的每次调用都必须以 record() 或 release() 结束，否则半开
+    状态下的探测名额不会归还。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: float = 0.5,
+        slow_threshold: float = 0.8,
+        slow_call_seconds: float = 2.0,
+        window: int = 20,
+        min_calls: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        """
+        Args:
+            name: 名称（用于日志）
+            failure_threshold: 打开熔断的失败率
+            slow_threshold: 打开熔断的慢调用率
+            slow_call_seconds: 超过该耗时的调用记为慢调用
+            window: 统计最近多少次调用
+            min_calls: 窗口内至少有多少次调用才计算比例
+            reset_timeout: 打开后多少秒进入半开状态
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_threshold = slow_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        # (成功, 是否慢调用)
+        self._calls: deque = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+
+        # 统计信息
+        self._rejected = 0
+        self._opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self):
+        """打开超时后转为半开（需持有锁）"""
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._probing = False
+
+    def allow(self) -> bool:
+        """是否允许本次调用（半开状态只放行一次探测）"""
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self._rejected += 1
+            return False
+
+    def check(self):
+        """不允许调用时抛出 CircuitOpenError"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name}: circuit open")
+
+    def release(self):
+        """放弃一次已放行但没有实际执行的调用（半开状态下归还探测名额）"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probing = False
+
+    def record(self, success: bool, seconds: float):
+        """记录一次调用结果"""
+        slow = seconds >= self.slow_call_seconds
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                if success and not slow:
+                    self._state = self.CLOSED
+                    self._calls.clear()
+                else:
+                    self._open()
+                return
+
+            self._calls.append((success, slow))
+            if self._state != self.CLOSED or len(self._calls) < self.min_calls:
+                return
+            total = len(self._calls)
+            failures = sum(1 for ok, _ in self._calls if not ok)
+            slow_calls = sum(1 for _, is_slow in self._calls if is_slow)
+            if (
+                failures / total >= self.failure_threshold
+                or slow_calls / total >= self.slow_threshold
+            ):
+                self._open()
+
+    def _open(self):
+        """打开熔断（需持有锁）"""
+        print(f"⚠️  {self.name}: circuit opened")
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self._opened += 1
+        self._calls.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """熔断器统计"""
+        with self._lock:
+            self._refresh()
+            total = len(self._calls)
+            return {
+                "state": self._state,
+                "window_calls": total,
+                "failure_rate": (
+                    round(sum(1 for ok, _ in self._calls if not ok) / total, 3)
+                    if total else 0.0
+                ),
+                "slow_rate": (
+                    round(sum(1 for _, slow in self._calls if slow) / total, 3)
+                    if total else 0.0
+                ),
+                "opened": self._opened,
+                "rejected": self._rejected,
+            }
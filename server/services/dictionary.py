@@ -1,7 +1,15 @@
-import sqlite3
 import os
-from typing import Optional, List
-from models.word import WordDefinition, Meaning, Definition
+from typing import Dict, Iterable, Optional, List, Tuple
+from models.word import WordDefinition
+from models.search import EnglishResult, SimpleMeaning
+from .sqlite_pool import SQLitePool
+from .concurrency import BackpressureError, BoundedExecutor
+from .cache import LRUCache
+from .ecdict_parser import transform_row
+from .word_index import PrefixIndex, UNRANKED, frequency_rank
+from .spelling import SpellingIndex
+from .lemma_index import LemmaIndex, lemma_of
+from . import compiled_dict
 
 
 class DictionaryService:
@@ -24,14 +32,107 @@ class DictionaryService:
                 "Please download it first."
             )
 
+        # 只读连接池，在进程生命周期内复用
+        self.pool = SQLitePool(db_path)
+
+        # 预编译词典（可选）：存在且与当前词典匹配时优先使用
+        compiled_path = os.getenv("DICT_COMPILED_PATH", compiled_dict.DEFAULT_TARGET)
+        self.compiled_pool: Optional[SQLitePool] = None
+        if compiled_dict.is_compatible(compiled_path, db_path):
+            self.compiled_pool = SQLitePool(compiled_path)
+            print(f"Using compiled dictionary: {compiled_path}")
+
+        # 专用查询线程池：阻塞的 SQLite 读取不占用事件循环，
+        # 工作线程数与连接数一致，保证每个线程都能拿到连接
+        self.executor = BoundedExecutor(
+            name="dict-lookup",
+            max_workers=self.pool.size,
+            max_pending=int(os.getenv("DICT_MAX_PENDING", "64")),
+            timeout=float(os.getenv("DICT_TIMEOUT", "2.0")),
+        )
+
+        # 解析结果缓存：key 为标准化后的单词
+        cache_size = int(os.getenv("DICT_RESULT_CACHE_SIZE", "20000"))
+        cache_ttl = float(os.getenv("DICT_RESULT_CACHE_TTL", "86400"))
+        self.definition_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self.english_result_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        # 批量查询中未找到的单词（收藏里的短语等），避免每次都查库
+        self.missing_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        # 词频排名（直接读 frq/bnc 列，不依赖后台构建的索引）
+        self.rank_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+
+        # 内存索引（build_indexes() 构建完成前为 None）
+        self.prefix_index: Optional[PrefixIndex] = None
+        self.spelling_index: Optional[SpellingIndex] = None
+        self.lemma_index: Optional[LemmaIndex] = None
+
+    @staticmethod
+    def _normalize_word(word: str) -> str:
+        """标准化查询词（缓存 key）"""
+        return word.lower().strip()
+
     def _get_connection(self):
-        """获取数据库连接"""
-        return sqlite3.connect(self.db_path)
+        """从连接池借出数据库连接（with 语句结束后自动归还）"""
+        return self.pool.connection()
+
+    def get_stats(self) -> dict:
+        """获取词典服务统计信息"""
+        return {
+            "pool": self.pool.stats(),
+            "compiled": (
+                self.compiled_pool.stats() if self.compiled_pool else None
+            ),
+            "executor": self.executor.stats(),
+            "definition_cache": self.definition_cache.stats(),
+            "english_result_cache": self.english_result_cache.stats(),
+            "missing_cache": self.missing_cache.stats(),
+            "rank_cache": self.rank_cache.stats(),
+            "prefix_index": (
+                self.prefix_index.stats() if self.prefix_index else None
+            ),
+            "spelling_index": (
+                self.spelling_index.stats() if self.spelling_index else None
+            ),
+            "lemma_index": (
+                self.lemma_index.stats() if self.lemma_index else None
+            ),
+        }
+
+    def build_indexes(self):
+        """
+        从 ECDICT 载入词头并构建内存索引（同步执行，耗时数秒，
+        应在后台线程调用；构建完成前相关查询回退到 SQL）
+        """
+        print("Building dictionary indexes...")
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                "SELECT word, frq, bnc, exchange FROM stardict"
+            ).fetchall()
+
+        self.lemma_index = LemmaIndex((word, exchange) for word, _, _, exchange in rows)
+        print(f"Lemma index ready: {self.lemma_index.stats()}")
+
+        self.prefix_index = PrefixIndex((word, frq, bnc) for word, frq, bnc, _ in rows)
+        print(f"Prefix index ready: {self.prefix_index.stats()}")
+
+        # 拼写纠错只收录有词频排名的纯字母常用词
+        max_words = int(os.getenv("DICT_FUZZY_MAX_WORDS", "50000"))
+        index = self.prefix_index
+        ranked = sorted(
+            (index.ranks[i], key)
+            for i, key in enumerate(index.keys)
+            if index.ranks[i] != UNRANKED and key.isascii() and key.isalpha()
+        )[:max_words]
+        self.spelling_index = SpellingIndex((key, rank) for rank, key in ranked)
+        print(f"Spelling index ready: {self.spelling_index.stats()}")
 
     async def get_definition(self, word: str) -> WordDefinition:
         """
         从本地数据库获取单词释义
 
+        查询词是变形词（running / mice / better）时，同时返回原形
+        （lemma）及其释义（lemma_entry）。
+
         Args:
             word: 英文单词
 
@@ -40,50 +141,340 @@ class DictionaryService:
 
         Raises:
             ValueError: 单词未找到
+            BackpressureError: 查询队列已满
+            ExecutorTimeoutError: 查询超时
         """
-        try:
-            print(f"start find word {word} in local database")
+        # 缓存命中时直接返回，不进入查询线程池
+        cached = self.definition_cache.get(self._normalize_word(word))
+        if cached is not None:
+            return cached
 
-            # 转换为小写查询
-            word_lower = word.lower().strip()
+        return await self.executor.run(self._lookup, word)
 
-            conn = self._get_connection()
-            cursor = conn.cursor()
+    async def get_definitions(
+        self, words: List[str]
+    ) -> List[Optional[WordDefinition]]:
+        """
+        批量获取单词释义
 
-            # 查询单词
-            cursor.execute(
-                """
-                SELECT word, phonetic, pos, translation, definition, detail
-                FROM stardict
-                WHERE word = ? COLLATE NOCASE
-                LIMIT 1
-                """,
-                (word_lower,)
-            )
+        输入先标准化、去重，缓存未命中的单词用一条 WHERE word IN (...)
+        查询取回（超过 500 个时分块）。未找到的单词同样缓存。
 
-            row = cursor.fetchone()
-            conn.close()
+        Args:
+            words: 英文单词列表
 
-            if not row:
+        Returns:
+            List[Optional[WordDefinition]]: 与输入顺序一致，未找到为 None
+        """
+        keys = [self._normalize_word(word) for word in words]
+
+        found: Dict[str, WordDefinition] = {}
+        misses: List[str] = []
+        for key in dict.fromkeys(keys):
+            if not key:
+                continue
+            cached = self.definition_cache.get(key)
+            if cached is not None:
+                found[key] = cached
+            elif self.missing_cache.get(key) is None:
+                misses.append(key)
+
+        if misses:
+            found.update(await self.executor.run(self._lookup_many, misses))
+            for key in misses:
+                if key not in found:
+                    self.missing_cache.set(key, True)
+
+        return [found.get(key) for key in keys]
+
+    async def get_rank(self, word: str) -> int:
+        """
+        单词的词频排名（ECDICT frq/bnc 中较小者，不存在时为 UNRANKED）
+
+        直接查询词条，结果与内存索引是否构建完成无关。
+
+        Raises:
+            BackpressureError: 查询队列已满
+            ExecutorTimeoutError: 查询超时
+        """
+        key = self._normalize_word(word)
+        cached = self.rank_cache.get(key)
+        if cached is not None:
+            return cached
+        return await self.executor.run(self._lookup_rank, key)
+
+    def _lookup_rank(self, key: str) -> int:
+        """同步查询词频排名（在查询线程池中执行），结果写入缓存"""
+        with self._get_connection() as conn:
+            # word 列为 COLLATE NOCASE：所有大小写变体中取最常用的排名
+            rows = conn.execute(
+                "SELECT frq, bnc FROM stardict WHERE word = ?", (key,)
+            ).fetchall()
+        rank = min((frequency_rank(frq, bnc) for frq, bnc in rows), default=UNRANKED)
+        self.rank_cache.set(key, rank)
+        return rank
+
+    async def get_english_results(
+        self, words: List[str]
+    ) -> List[Optional[EnglishResult]]:
+        """批量获取简化的英文查询结果，与输入顺序一致，未找到为 None"""
+        keys = [self._normalize_word(word) for word in words]
+
+        results: Dict[str, Optional[EnglishResult]] = {}
+        misses: List[str] = []
+        for key in dict.fromkeys(keys):
+            cached = self.english_result_cache.get(key) if key else None
+            if cached is not None:
+                results[key] = cached
+            else:
+                misses.append(key)
+
+        if misses:
+            definitions = await self.get_definitions(misses)
+            for key, definition in zip(misses, definitions):
+                if definition is None:
+                    continue
+                results[key] = self._simplify(definition)
+                self.english_result_cache.set(key, results[key])
+
+        return [results.get(key) for key in keys]
+
+    async def get_english_result(self, word: str) -> EnglishResult:
+        """
+        获取简化的英文查询结果（/api/search 使用）
+
+        Raises:
+            同 get_definition
+        """
+        key = self._normalize_word(word)
+        cached = self.english_result_cache.get(key)
+        if cached is not None:
+            return cached
+
+        definition = await self.get_definition(word)
+        result = self._simplify(definition)
+        self.english_result_cache.set(key, result)
+        return result
+
+    def _simplify(self, definition: WordDefinition) -> EnglishResult:
+        """将完整释义转换为简化结果（每个词性合并为一条中文释义）"""
+        return EnglishResult(
+            word=definition.word,
+            phonetic=definition.phonetic,
+            meanings=self._simplify_meanings(definition),
+            lemma=definition.lemma,
+            lemma_meanings=(
+                self._simplify_meanings(definition.lemma_entry)
+                if definition.lemma_entry else None
+            ),
+        )
+
+    def _simplify_meanings(self, definition: WordDefinition) -> List[SimpleMeaning]:
+        """每个词性的中文释义合并为一条"""
+        meanings = []
+        for meaning in definition.meanings:
+            # 合并所有定义为一个字符串
+            definitions_list = []
+            for def_item in meaning.definitions:
+                if def_item.definition_chinese:
+                    definitions_list.append(def_item.definition_chinese)
+
+            if definitions_list:
+                combined_meaning = '; '.join(definitions_list)
+                meanings.append(SimpleMeaning(
+                    pos=meaning.part_of_speech,
+                    meaning=combined_meaning
+                ))
+
+        return meanings
+
+    def warm_cache(self, words: Iterable[str]) -> int:
+        """
+        预热缓存（同步执行，建议在后台线程调用）
+
+        Args:
+            words: 单词列表，通常按词频从高到低排列
+
+        Returns:
+            int: 成功加载的单词数
+        """
+        loaded = 0
+        for word in words:
+            key = self._normalize_word(word)
+            if not key or key in self.definition_cache:
+                continue
+            try:
+                definition = self._lookup(word)
+            except ValueError:
+                continue
+            self.english_result_cache.set(key, self._simplify(definition))
+            loaded += 1
+        return loaded
+
+    def warm_cache_from_file(self, path: str, limit: Optional[int] = None) -> int:
+        """
+        从词频列表文件预热缓存
+
+        文件格式：每行一个单词，可以带制表符分隔的附加列
+        （例如 "the\t53097401"），只取第一列；# 开头的行忽略。
+        """
+        limit = limit or self.definition_cache.maxsize
+
+        def read_words():
+            count = 0
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    yield line.split('\t')[0].split(',')[0].strip()
+                    count += 1
+                    if count >= limit:
+                        break
+
+        loaded = self.warm_cache(read_words())
+        print(f"Dictionary cache warmed with {loaded} words from {path}")
+        return loaded
+
+    def _lookup(self, word: str) -> WordDefinition:
+        """同步查询单词（在查询线程池中执行），结果写入缓存"""
+        try:
+            print(f"start find word {word} in local database")
+
+            # 转换为小写查询
+            word_lower = self._normalize_word(word)
+
+            result = self._lookup_many([word_lower]).get(word_lower)
+            if result is None:
                 print(f"Failed to get word {word} from local database")
                 raise ValueError(f"Word not found: {word}")
 
             print(f"get word {word} from local database: SUCCESS")
+            return result
 
-            # 解析数据
-            db_word, phonetic, pos, translation, definition, detail = row
-
-            # 构建返回结构
-            return self._transform_response(
-                db_word, phonetic, pos, translation, definition, detail
-            )
-
-        except ValueError:
+        except (ValueError, TimeoutError, BackpressureError):
+            # 过载（连接池 / 线程池超时、队列已满）交给 API 层返回 503，
+            # 不能当作"单词不存在"
             raise
         except Exception as e:
             print(f"Error querying database: {e}")
             raise ValueError(f"Failed to fetch definition: {str(e)}")
 
+    def _lookup_many(self, keys: List[str]) -> Dict[str, WordDefinition]:
+        """
+        批量查询标准化后的单词，返回找到的释义并写入缓存
+
+        变形词 -> 原形通过哈希索引解析，原形与查询词在同一条 SQL 中取回。
+        """
+        lemmas: Dict[str, Optional[str]] = {}
+        if self.lemma_index is not None:
+            lemmas = {key: self.lemma_index.get(key) for key in keys}
+        entries = self._fetch_entries(
+            keys + [lemma for lemma in lemmas.values() if lemma]
+        )
+
+        # 索引未就绪时，使用词条自身 exchange 中的原形
+        missing = []
+        for key in keys:
+            if lemmas.get(key) is None and key in entries and entries[key][1]:
+                lemmas[key] = entries[key][1]
+                if lemmas[key] not in entries:
+                    missing.append(lemmas[key])
+        if missing:
+            entries.update(self._fetch_entries(missing))
+
+        results: Dict[str, WordDefinition] = {}
+        for key in keys:
+            surface = entries[key][0] if key in entries else None
+            lemma = lemmas.get(key)
+            lemma_entry = entries[lemma][0] if lemma in entries else None
+            if surface is None and lemma_entry is None:
+                continue
+
+            result = self._with_lemma(key, surface, lemma_entry)
+            self.definition_cache.set(key, result)
+            results[key] = result
+
+        return results
+
+    def _with_lemma(
+        self,
+        word_lower: str,
+        surface: Optional[WordDefinition],
+        lemma_entry: Optional[WordDefinition],
+    ) -> WordDefinition:
+        """
+        组合查询词与原形的释义
+
+        查询词本身没有词条时（例如只作为变形出现），顶层字段使用原形的
+        释义，word 仍为查询词。
+        """
+        if lemma_entry is None:
+            return surface
+
+        if surface is None:
+            return WordDefinition(
+                word=word_lower,
+                phonetic=lemma_entry.phonetic,
+                chinese=lemma_entry.chinese,
+                meanings=lemma_entry.meanings,
+                lemma=lemma_entry.word,
+                lemma_entry=lemma_entry,
+            )
+
+        return surface.model_copy(
+            update={"lemma": lemma_entry.word, "lemma_entry": lemma_entry}
+        )
+
+    def _fetch_entries(
+        self, keys: List[str]
+    ) -> Dict[str, Tuple[WordDefinition, Optional[str]]]:
+        """
+        批量读取词条（一条 SQL），返回 {小写单词: (释义, exchange 中的原形)}
+
+        优先读取预编译词典，否则读取原始表并实时解析。
+        """
+        results: Dict[str, Tuple[WordDefinition, Optional[str]]] = {}
+        keys = list(dict.fromkeys(keys))
+
+        # SQLite 默认最多 999 个绑定参数
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+
+            if self.compiled_pool is not None:
+                with self.compiled_pool.connection() as conn:
+                    rows = conn.execute(
+                        f"SELECT key, data, lemma FROM entries WHERE key IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                for key, data, lemma in rows:
+                    results[key] = (
+                        WordDefinition.model_validate(compiled_dict.decode_entry(data)),
+                        lemma,
+                    )
+                continue
+
+            with self._get_connection() as conn:
+                # word 列为 COLLATE NOCASE，IN 查询大小写不敏感且可以使用索引
+                rows = conn.execute(
+                    f"""
+                    SELECT word, phonetic, pos, translation, definition, detail, exchange
+                    FROM stardict
+                    WHERE word IN ({placeholders})
+                    """,
+                    chunk,
+                ).fetchall()
+            for db_word, phonetic, pos, translation, definition, detail, exchange in rows:
+                results[db_word.lower()] = (
+                    self._transform_response(
+                        db_word, phonetic, pos, translation, definition, detail
+                    ),
+                    lemma_of(db_word, exchange),
+                )
+
+        return results
+
     def _transform_response(
         self,
         word: str,
@@ -94,7 +485,7 @@ class DictionaryService:
         detail: Optional[str]
     ) -> WordDefinition:
         """
-        转换 ECDICT 数据为内部数据格式
+        转换 ECDICT 数据为内部数据格式（解析逻辑见 ecdict_parser）
 
         ECDICT 字段说明:
         - word: 单词
@@ -104,201 +495,144 @@ class DictionaryService:
         - definition: 英文释义 (例如: "n. an expression of greeting")
         - detail: 详细释义 (JSON 格式，可选)
         """
+        return transform_row(word, phonetic, translation, definition)
 
-        # 格式化音标
-        formatted_phonetic = None
-        if phonetic:
-            # 如果没有斜杠，添加斜杠
-            if not phonetic.startswith('/'):
-                formatted_phonetic = f"/{phonetic}/"
-            else:
-                formatted_phonetic = phonetic
-
-        meanings = []
-
-        # 解析 translation (中文) 和 definition (英文)
-        # 格式: "n. 释义1; 释义2 \n v. 释义3"
-        if translation or definition:
-            # 合并中英文释义
-            combined_text = ""
-            if translation:
-                combined_text = translation
-            if definition:
-                if combined_text:
-                    combined_text += "\n" + definition
-                else:
-                    combined_text = definition
-
-            # 按词性分组
-            meanings = self._parse_definitions(combined_text)
-
-        # 如果没有解析出任何释义，使用原始文本
-        if not meanings:
-            meanings = [
-                Meaning(
-                    part_of_speech="general",
-                    definitions=[
-                        Definition(
-                            definition=definition or "No definition available",
-                            definition_chinese=translation,
-                            example=None,
-                            example_chinese=None
-                        )
-                    ]
-                )
-            ]
-
-        return WordDefinition(
-            word=word,
-            phonetic=formatted_phonetic,
-            chinese=self._extract_chinese_only(translation),
-            meanings=meanings
-        )
-
-    def _extract_chinese_only(self, translation: Optional[str]) -> Optional[str]:
-        """
-        提取纯中文翻译（去掉词性标记）
-
-        例如: "interj. 喂, 嘿" -> "喂, 嘿"
+    def search_words(self, prefix: str, limit: int = 10) -> List[str]:
         """
-        if not translation:
-            return None
-
-        import re
-        # 移除词性标记 (n. v. adj. 等)
-        chinese = re.sub(r'^[a-z]+\.\s*', '', translation, flags=re.IGNORECASE)
-        # 如果有多个词性，取第一个
-        chinese = chinese.split('\n')[0].strip()
-        return chinese if chinese else None
+        搜索以指定前缀开头的单词（用于自动补全）
 
-    def _parse_definitions(self, text: str) -> List[Meaning]:
-        """
-        解析释义文本，按词性分组
+        Args:
+            prefix: 单词前缀
+            limit: 返回数量限制
 
-        输入格式示例:
-        "n. 测试; 考验\nv. 测试; 检验"
-        或
-        "interj. 喂, 嘿"
+        Returns:
+            List[str]: 单词列表
         """
-        meanings = []
-        current_pos = None
-        current_defs = []
-
-        import re
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT word
+                FROM stardict
+                WHERE word LIKE ? COLLATE NOCASE
+                ORDER BY word
+                LIMIT ?
+                """,
+                (f"{prefix}%", limit)
+            ).fetchall()
 
-        # 分割成行
-        lines = text.split('\n')
+        return [row[0] for row in rows]
 
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+    async def reverse_lookup(
+        self, chinese: str, limit: int = 5, partial: bool = True
+    ) -> List[str]:
+        """
+        中译英本地反查（基于预编译词典的 zh_gloss / zh_gloss_gram 表）
 
-            # 匹配词性标记 (n. v. adj. adv. prep. conj. interj. 等)
-            pos_match = re.match(r'^([a-z]+)\.\s+(.+)', line, re.IGNORECASE)
-
-            if pos_match:
-                # 保存之前的词性
-                if current_pos and current_defs:
-                    meanings.append(
-                        Meaning(
-                            part_of_speech=current_pos,
-                            definitions=current_defs
-                        )
-                    )
+        先按中文释义词精确匹配；不足 limit 个且 partial=True 时，再补充
+        包含查询词的释义（"苹果" -> "苹果树"），释义越短越靠前。同一组内
+        按词频排名、义项顺序排序。只覆盖查询词一部分的释义（"电脑游戏" ->
+        "游戏"）不返回。预编译词典不存在时返回空列表（由调用方回退到在线翻译）。
 
-                # 开始新的词性
-                current_pos = self._normalize_pos(pos_match.group(1))
-                definition_text = pos_match.group(2)
-
-                # 分割多个释义 (用分号或逗号)
-                parts = re.split(r'[;；,，]', definition_text)
-                current_defs = [
-                    Definition(
-                        definition=part.strip(),
-                        definition_chinese=part.strip(),  # ECDICT 已经是中文
-                        example=None,
-                        example_chinese=None
-                    )
-                    for part in parts if part.strip()
-                ]
-            else:
-                # 没有词性标记，作为通用释义
-                if not current_pos:
-                    current_pos = "general"
-                    current_defs = []
-
-                current_defs.append(
-                    Definition(
-                        definition=line,
-                        definition_chinese=line,
-                        example=None,
-                        example_chinese=None
-                    )
-                )
+        Args:
+            chinese: 中文查询词
+            limit: 返回数量
+            partial: 是否补充包含查询词的释义（翻译时只用精确匹配）
 
-        # 保存最后一个词性
-        if current_pos and current_defs:
-            meanings.append(
-                Meaning(
-                    part_of_speech=current_pos,
-                    definitions=current_defs
+        Returns:
+            List[str]: 英文单词列表
+        """
+        chinese = chinese.strip()
+        if self.compiled_pool is None or not chinese:
+            return []
+        return await self.executor.run(self._reverse_lookup, chinese, limit, partial)
+
+    def _reverse_lookup(self, chinese: str, limit: int, partial: bool) -> List[str]:
+        with self.compiled_pool.connection() as conn:
+            words = [
+                row[0] for row in conn.execute(
+                    """
+                    SELECT word FROM zh_gloss
+                    WHERE gloss = ?
+                    ORDER BY rank, sense
+                    LIMIT ?
+                    """,
+                    (chinese, limit),
                 )
-            )
-
-        return meanings
+            ]
+            grams = compiled_dict.gloss_grams(chinese)
+            if not partial or len(words) >= limit or not grams:
+                return words
+
+            # 二元组索引筛出含有全部二元组的释义词，再用 instr 确认是连续子串
+            placeholders = ", ".join("?" * len(grams))
+            rows = conn.execute(
+                f"""
+                SELECT z.word FROM (
+                    SELECT gloss FROM zh_gloss_gram
+                    WHERE gram IN ({placeholders})
+                    GROUP BY gloss
+                    HAVING COUNT(*) = ?
+                ) AS m
+                JOIN zh_gloss AS z ON z.gloss = m.gloss
+                WHERE m.gloss != ? AND instr(m.gloss, ?) > 0
+                ORDER BY length(m.gloss), z.rank, z.sense
+                LIMIT ?
+                """,
+                (*grams, len(grams), chinese, chinese, limit * 4),
+            ).fetchall()
+
+        seen = set(words)
+        for (word,) in rows:
+            if len(words) >= limit:
+                break
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+        return words
 
-    def _normalize_pos(self, pos: str) -> str:
+    async def suggest_corrections(self, word: str, limit: int = 5) -> List[str]:
         """
-        标准化词性标记
+        拼写纠错候选（"did you mean"），在固定时间预算内返回
 
-        n -> noun
-        v -> verb
-        adj -> adjective
-        等
+        索引尚未构建时返回空列表。
         """
-        pos_map = {
-            'n': 'noun',
-            'v': 'verb',
-            'adj': 'adjective',
-            'adv': 'adverb',
-            'prep': 'preposition',
-            'conj': 'conjunction',
-            'interj': 'interjection',
-            'pron': 'pronoun',
-            'art': 'article',
-            'det': 'determiner',
-            'num': 'numeral',
-        }
+        if self.spelling_index is None or not word.strip():
+            return []
 
-        return pos_map.get(pos.lower(), pos)
+        budget_ms = float(os.getenv("DICT_FUZZY_BUDGET_MS", "20"))
+        return await self.executor.run(
+            self.spelling_index.lookup, word, limit, None, budget_ms
+        )
 
-    def search_words(self, prefix: str, limit: int = 10) -> List[str]:
+    async def suggest(
+        self, prefix: str, limit: int = 10, ranked: bool = True
+    ) -> List[str]:
         """
-        搜索以指定前缀开头的单词（用于自动补全）
+        前缀自动补全
+
+        优先使用内存前缀索引；索引尚未构建时回退到 search_words（SQL）。
 
         Args:
             prefix: 单词前缀
             limit: 返回数量限制
-
-        Returns:
-            List[str]: 单词列表
+            ranked: 是否按词频排序（仅内存索引支持）
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT word
-            FROM stardict
-            WHERE word LIKE ? COLLATE NOCASE
-            ORDER BY word
-            LIMIT ?
-            """,
-            (f"{prefix}%", limit)
-        )
+        prefix = prefix.strip()
+        if not prefix:
+            return []
 
-        words = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        if self.prefix_index is not None:
+            return self.prefix_index.suggest(prefix, limit, ranked)
 
-        return words
+        return await self.executor.run(self.search_words, prefix, limit)
+
+
+_dictionary_service: Optional[DictionaryService] = None
+
+
+def get_dictionary_service() -> DictionaryService:
+    """获取进程内共享的词典服务实例（连接池只创建一次）"""
+    global _dictionary_service
+    if _dictionary_service is None:
+        _dictionary_service = DictionaryService()
+    return _dictionary_service
@@ -0,0 +1,225 @@
+"""
+ECDICT 释义解析器
+
+将 ECDICT 的 phonetic / translation / definition 原始文本解析为
+WordDefinition。正则在模块加载时编译，每段文本只扫描一遍；解析过程
+只产生普通的 dict/list，最后用一次 model_validate 构建整个
+WordDefinition（比逐个构造 Meaning/Definition 更快）。
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.word import WordDefinition
+
+
+# 词性标记行，例如 "n. 测试; 考验"
+_POS_LINE_RE = re.compile(r'([a-z]+)\.\s+(.+)', re.IGNORECASE)
+# 行首词性标记，例如 "interj. "
+_POS_PREFIX_RE = re.compile(r'[a-z]+\.\s*', re.IGNORECASE)
+# 释义分隔符（中英文分号、逗号）
+_DEF_SPLIT_RE = re.compile(r'[;；,，]')
+# 反查索引的释义分隔符（额外包含顿号）
+_GLOSS_SPLIT_RE = re.compile(r'[;；,，、]')
+# 方括号/圆括号中的注释，例如 "[计]"、"(复数)"、"（口语）"
+_GLOSS_NOTE_RE = re.compile(r'\[[^\]]*\]|\([^)]*\)|（[^）]*）|<[^>]*>')
+# 中文字符
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
+POS_MAP = {
+    'n': 'noun',
+    'v': 'verb',
+    'adj': 'adjective',
+    'adv': 'adverb',
+    'prep': 'preposition',
+    'conj': 'conjunction',
+    'interj': 'interjection',
+    'pron': 'pronoun',
+    'art': 'article',
+    'det': 'determiner',
+    'num': 'numeral',
+}
+
+# (词性, [释义文本, ...])
+ParsedMeaning = Tuple[str, List[str]]
+
+
+def normalize_pos(pos: str) -> str:
+    """
+    标准化词性标记
+
+    n -> noun, v -> verb, adj -> adjective 等，未知标记原样返回
+    """
+    return POS_MAP.get(pos.lower(), pos)
+
+
+def format_phonetic(phonetic: Optional[str]) -> Optional[str]:
+    """格式化音标：没有斜杠时两侧加上斜杠"""
+    if not phonetic:
+        return None
+    if phonetic.startswith('/'):
+        return phonetic
+    return f"/{phonetic}/"
+
+
+def extract_chinese_only(translation: Optional[str]) -> Optional[str]:
+    """
+    提取纯中文翻译（去掉词性标记，只取第一行）
+
+    例如: "interj. 喂, 嘿" -> "喂, 嘿"
+    """
+    if not translation:
+        return None
+
+    match = _POS_PREFIX_RE.match(translation)
+    if match:
+        translation = translation[match.end():]
+    chinese = translation.split('\n', 1)[0].strip()
+    return chinese if chinese else None
+
+
+def extract_glosses(translation: Optional[str]) -> List[str]:
+    """
+    提取中文释义词条（用于中译英反查），按出现顺序去重
+
+    例如: "n. 测试, 考验\nvt. 测试, 检验\n[计] 测试" -> ["测试", "考验", "检验"]
+    """
+    if not translation:
+        return []
+
+    glosses: List[str] = []
+    seen = set()
+    for line in translation.split('\n'):
+        line = _GLOSS_NOTE_RE.sub('', line)
+        for part in _GLOSS_SPLIT_RE.split(line):
+            part = part.strip()
+            # 词性标记可能出现在行首，也可能出现在分号之后
+            match = _POS_PREFIX_RE.match(part)
+            if match:
+                part = part[match.end():].strip()
+            if part and part not in seen and _CJK_RE.search(part):
+                seen.add(part)
+                glosses.append(part)
+    return glosses
+
+
+def parse_meanings(text: str) -> List[ParsedMeaning]:
+    """
+    单次扫描解析释义文本，按词性分组（不构建 pydantic 对象）
+
+    输入格式示例:
+    "n. 测试; 考验\\nv. 测试; 检验"
+    """
+    groups: List[ParsedMeaning] = []
+    current_pos: Optional[str] = None
+    current_defs: List[str] = []
+
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+
+        pos_match = _POS_LINE_RE.match(line)
+        if pos_match:
+            if current_pos and current_defs:
+                groups.append((current_pos, current_defs))
+
+            current_pos = normalize_pos(pos_match.group(1))
+            current_defs = []
+            for part in _DEF_SPLIT_RE.split(pos_match.group(2)):
+                part = part.strip()
+                if part:
+                    current_defs.append(part)
+        else:
+            # 没有词性标记，作为通用释义
+            if not current_pos:
+                current_pos = "general"
+                current_defs = []
+            current_defs.append(line)
+
+    if current_pos and current_defs:
+        groups.append((current_pos, current_defs))
+
+    return groups
+
+
+def build_meanings(groups: List[ParsedMeaning]) -> List[Dict[str, Any]]:
+    """将解析结果转换为 Meaning 结构（ECDICT 释义同时作为中文释义）"""
+    return [
+        {
+            "part_of_speech": pos,
+            "definitions": [
+                {
+                    "definition": text,
+                    "definition_chinese": text,
+                    "example": None,
+                    "example_chinese": None,
+                }
+                for text in texts
+            ],
+        }
+        for pos, texts in groups
+    ]
+
+
+def combine_text(translation: Optional[str], definition: Optional[str]) -> str:
+    """合并中文翻译和英文释义（中文在前）"""
+    if translation and definition:
+        return translation + "\n" + definition
+    return translation or definition or ""
+
+
+def fallback_meanings(
+    translation: Optional[str], definition: Optional[str]
+) -> List[Dict[str, Any]]:
+    """没有解析出任何释义时，使用原始文本作为通用释义"""
+    return [
+        {
+            "part_of_speech": "general",
+            "definitions": [
+                {
+                    "definition": definition or "No definition available",
+                    "definition_chinese": translation,
+                    "example": None,
+                    "example_chinese": None,
+                }
+            ],
+        }
+    ]
+
+
+def transform_row_data(
+    word: str,
+    phonetic: Optional[str],
+    translation: Optional[str],
+    definition: Optional[str],
+) -> Dict[str, Any]:
+    """
+    将一行 ECDICT 数据转换为 WordDefinition 结构的 dict
+
+    - phonetic: 音标 (例如: "hә'lәu")
+    - translation: 中文翻译 (例如: "interj. 喂, 嘿")
+    - definition: 英文释义 (例如: "n. an expression of greeting")
+    """
+    meanings = build_meanings(parse_meanings(combine_text(translation, definition)))
+    if not meanings:
+        meanings = fallback_meanings(translation, definition)
+
+    return {
+        "word": word,
+        "phonetic": format_phonetic(phonetic),
+        "chinese": extract_chinese_only(translation),
+        "meanings": meanings,
+    }
+
+
+def transform_row(
+    word: str,
+    phonetic: Optional[str],
+    translation: Optional[str],
+    definition: Optional[str],
+) -> WordDefinition:
+    """将一行 ECDICT 数据转换为 WordDefinition"""
+    return WordDefinition.model_validate(
+        transform_row_data(word, phonetic, translation, definition)
+    )
@@ -1,99 +1,292 @@
+import base64
 import json
 import os
-from typing import List, Optional
-from datetime import datetime
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
 from uuid import uuid4
-from models.favorite import Favorite, FavoriteCreate
+from models.favorite import (
+    DEFAULT_USER, Favorite, FavoriteCreate, FavoriteChanges, FavoriteExpanded,
+)
+from .favorites_store import (
+    Cursor, FavoritesStore, JsonFavoritesStore, SQLiteFavoritesStore,
+    WriteBehindFavoritesStore, migrate_json, sort_key, word_key,
+)
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+DEFAULT_JSON_PATH = os.path.join(DATA_DIR, "favorites.json")
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, "favorites.db")
+DEFAULT_JOURNAL_PATH = os.path.join(DATA_DIR, "favorites.journal")
+
+
+def encode_cursor(key: Cursor) -> str:
+    """分页游标（不透明字符串）"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    解析分页游标
+
+    Raises:
+        ValueError: 游标格式不正确
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(created_at, str) or not isinstance(id, str):
+            raise TypeError
+        return created_at, id
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class VersionClock:
+    """变更版本号：微秒时间戳，同一微秒内的多次变更依次加一，保证严格递增"""
+
+    def __init__(self):
+        self._last = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def now() -> int:
+        return time.time_ns() // 1000
+
+    def next(self) -> int:
+        with self._lock:
+            self._last = max(self.now(), self._last + 1)
+            return self._last
 
 
 class FavoritesService:
-    """收藏服务 - 使用 JSON 文件存储"""
-
-    def __init__(self, data_file: str = "data/favorites.json"):
-        self.data_file = data_file
-        self._ensure_data_file()
-
-    def _ensure_data_file(self):
-        """确保数据文件存在"""
-        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-        if not os.path.exists(self.data_file):
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump({"favorites": []}, f, ensure_ascii=False, indent=2)
-
-    def _load_favorites(self) -> List[Favorite]:
-        """从文件加载收藏列表"""
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return [Favorite(**item) for item in data.get("favorites", [])]
-        except Exception as e:
-            print(f"Error loading favorites: {e}")
-            return []
-
-    def _save_favorites(self, favorites: List[Favorite]):
-        """保存收藏列表到文件"""
-        try:
-            data = {
-                "favorites": [
-                    {
-                        "id": fav.id,
-                        "word": fav.word,
-                        "phonetic": fav.phonetic,
-                        "chinese": fav.chinese,
-                        "created_at": fav.created_at.isoformat(),
-                    }
-                    for fav in favorites
-                ]
-            }
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving favorites: {e}")
-            raise
-
-    def get_all(self) -> List[Favorite]:
+    """收藏服务（按用户分区）"""
+
+    def __init__(self, store: Optional[FavoritesStore] = None):
+        """
+        初始化收藏服务
+
+        未指定 store 时按环境变量选择存储后端：
+        - FAVORITES_BACKEND: sqlite（默认）或 json
+        - FAVORITES_DB_PATH: SQLite 文件路径，默认 data/favorites.db
+        - FAVORITES_JSON_PATH: JSON 文件路径，默认 data/favorites.json
+          （sqlite 后端首次启动时自动导入该文件中的收藏）
+        - FAVORITES_WRITE_BEHIND: 是否启用内存索引 + 写回日志（默认 false，
+          仅支持单个 worker）
+        - FAVORITES_JOURNAL_PATH: 写回日志路径，默认 data/favorites.journal
+        - FAVORITES_FLUSH_INTERVAL: 日志批量 fsync 间隔（秒，默认 0.05）
+        - FAVORITES_COMPACT_EVERY: 日志累计多少条后合并进存储（默认 1000）
+        - FAVORITES_TOMBSTONE_TTL_DAYS: 删除记录保留天数（默认 30），
+          更早的 since 需要客户端重新拉取完整列表
+        """
+        self.store = store if store is not None else self._default_store()
+        self.clock = VersionClock()
+        self.tombstone_ttl = float(os.getenv("FAVORITES_TOMBSTONE_TTL_DAYS", "30")) * 86400
+        self.store.prune_tombstones(self._horizon())
+
+    @staticmethod
+    def _default_store() -> FavoritesStore:
+        backend = os.getenv("FAVORITES_BACKEND", "sqlite").lower()
+        json_path = os.getenv("FAVORITES_JSON_PATH", DEFAULT_JSON_PATH)
+        if backend == "json":
+            store = JsonFavoritesStore(json_path)
+        elif backend == "sqlite":
+            store = SQLiteFavoritesStore(os.getenv("FAVORITES_DB_PATH", DEFAULT_DB_PATH))
+            migrate_json(json_path, store)
+        else:
+            raise ValueError(f"Unknown favorites backend: {backend}")
+
+        if os.getenv("FAVORITES_WRITE_BEHIND", "false").lower() != "true":
+            return store
+        return WriteBehindFavoritesStore(
+            store,
+            os.getenv("FAVORITES_JOURNAL_PATH", DEFAULT_JOURNAL_PATH),
+            flush_interval=float(os.getenv("FAVORITES_FLUSH_INTERVAL", "0.05")),
+            compact_every=int(os.getenv("FAVORITES_COMPACT_EVERY", "1000")),
+        )
+
+    def _horizon(self) -> int:
+        """早于此版本号的删除记录可能已被清理"""
+        return self.clock.now() - int(self.tombstone_ttl * 1_000_000)
+
+    def close(self):
+        """关闭存储（写回模式下写入并合并全部待写操作）"""
+        self.store.close()
+
+    def get_all(self, user_id: str = DEFAULT_USER) -> List[Favorite]:
         """获取所有收藏"""
-        return self._load_favorites()
+        return self.store.list(user_id)
+
+    def get_page(
+        self, user_id: str = DEFAULT_USER, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[Favorite], Optional[str]]:
+        """
+        按添加时间倒序分页（keyset：(created_at, id) 早于游标的记录）
+
+        Returns:
+            (本页收藏, 下一页游标；没有下一页时为 None)
+
+        Raises:
+            ValueError: 游标格式不正确
+        """
+        before = decode_cursor(cursor) if cursor else None
+        favorites = self.store.page(user_id, limit + 1, before)
+        if len(favorites) <= limit:
+            return favorites, None
+        favorites = favorites[:limit]
+        return favorites, encode_cursor(sort_key(favorites[-1]))
+
+    def version(self, user_id: str = DEFAULT_USER) -> int:
+        """用户收藏的当前版本号（每次添加 / 删除后变化）"""
+        return self.store.version(user_id)
+
+    def changes(
+        self, user_id: str = DEFAULT_USER, since: int = 0, limit: int = 500
+    ) -> FavoriteChanges:
+        """
+        增量同步：版本号大于 since 的添加和删除（按版本号升序，最多 limit 条）
 
-    def add(self, favorite_create: FavoriteCreate) -> Favorite:
-        """添加收藏"""
-        favorites = self._load_favorites()
+        has_more 为 true 时用返回的 version 作为 since 继续拉取；
+        full_resync 为 true 时 since 早于删除记录的保留期，需重新拉取完整列表。
+        """
+        current = self.store.version(user_id)
+        if since >= current:
+            return FavoriteChanges(version=current)
+        if since < self._horizon():
+            return FavoriteChanges(version=current, full_resync=True)
 
-        # 检查是否已收藏
-        for fav in favorites:
-            if fav.word.lower() == favorite_create.word.lower():
-                return fav  # 已存在，返回现有记录
+        added, removed = self.store.changes(user_id, since, limit)
+        # 某一侧取满 limit 条时，它最后一条之后的变更还没取到，两侧都只能返回到这个版本
+        cutoff = current
+        for items in (added, removed):
+            if len(items) == limit:
+                cutoff = min(cutoff, items[-1].version)
+        merged = sorted(
+            [fav for fav in added if fav.version <= cutoff]
+            + [t for t in removed if t.version <= cutoff],
+            key=lambda item: item.version,
+        )[:limit]
+        has_more = bool(merged) and merged[-1].version < current
+        return FavoriteChanges(
+            version=merged[-1].version if has_more else current,
+            added=[item for item in merged if isinstance(item, Favorite)],
+            removed=[item for item in merged if not isinstance(item, Favorite)],
+            has_more=has_more,
+        )
+
+    def add(self, favorite_create: FavoriteCreate, user_id: str = DEFAULT_USER) -> Favorite:
+        """添加收藏（已收藏时返回现有记录）"""
+        existing = self.store.get_by_word(user_id, favorite_create.word)
+        if existing is not None:
+            return existing
 
-        # 创建新收藏
         new_favorite = Favorite(
             id=str(uuid4()),
             word=favorite_create.word,
             phonetic=favorite_create.phonetic,
             chinese=favorite_create.chinese,
             created_at=datetime.now(),
+            user_id=user_id,
+            version=self.clock.next(),
         )
+        return self.store.insert(new_favorite)
+
+    def add_many(
+        self, favorite_creates: Iterable[FavoriteCreate], user_id: str = DEFAULT_USER
+    ) -> Tuple[List[Favorite], int]:
+        """
+        批量添加收藏：请求内按单词去重，已收藏的单词返回现有记录，
+        其余一次写入存储
+
+        Returns:
+            (与去重后的请求顺序一致的收藏记录, 新添加的条数)
+        """
+        unique: Dict[str, FavoriteCreate] = {}
+        for item in favorite_creates:
+            unique.setdefault(word_key(item.word), item)
+
+        existing = self.store.get_many_by_words(user_id, unique)
+        now = datetime.now()
+        new_favorites = [
+            Favorite(
+                id=str(uuid4()),
+                word=item.word,
+                phonetic=item.phonetic,
+                chinese=item.chinese,
+                # 与逐个添加一致：请求中靠后的单词更新
+                created_at=now + timedelta(microseconds=i),
+                user_id=user_id,
+                version=self.clock.next(),
+            )
+            for i, (key, item) in enumerate(unique.items())
+            if key not in existing
+        ]
+        inserted = self.store.insert_many(new_favorites)
+
+        by_word = dict(existing)
+        by_word.update((word_key(fav.word), fav) for fav in new_favorites)
+        if inserted < len(new_favorites):
+            # 并发添加了相同的单词，以存储中的记录为准
+            by_word.update(self.store.get_many_by_words(
+                user_id, [fav.word for fav in new_favorites]
+            ))
+        return [by_word[key] for key in unique], inserted
+
+    def check_many(
+        self, words: List[str], user_id: str = DEFAULT_USER
+    ) -> List[Optional[Favorite]]:
+        """批量检查收藏（结果与 words 顺序一致，未收藏为 None）"""
+        found = self.store.get_many_by_words(user_id, words)
+        return [found.get(word_key(word)) for word in words]
+
+    def export(self, user_id: str = DEFAULT_USER, batch_size: int = 1000) -> Iterator[Favorite]:
+        """按添加时间倒序逐批读出全部收藏（keyset 扫描，不一次性载入整个列表）"""
+        before = None
+        while True:
+            favorites = self.store.page(user_id, batch_size, before)
+            yield from favorites
+            if len(favorites) < batch_size:
+                return
+            before = sort_key(favorites[-1])
 
-        favorites.insert(0, new_favorite)  # 插入到最前面
-        self._save_favorites(favorites)
+    @staticmethod
+    async def expand(favorites: List[Favorite], dictionary) -> List[FavoriteExpanded]:
+        """
+        为收藏附带词典释义：整批单词一次 get_definitions 查询
+        （命中词典缓存的单词不访问数据库）
 
-        return new_favorite
+        Args:
+            favorites: 收藏记录
+            dictionary: DictionaryService
 
-    def remove(self, favorite_id: str) -> bool:
-        """删除收藏"""
-        favorites = self._load_favorites()
-        original_count = len(favorites)
+        Raises:
+            BackpressureError: 查询队列已满
+            ExecutorTimeoutError: 查询超时
+        """
+        definitions = await dictionary.get_definitions([fav.word for fav in favorites])
+        return [
+            FavoriteExpanded(**dict(fav), definition=definition)
+            for fav, definition in zip(favorites, definitions)
+        ]
 
-        favorites = [fav for fav in favorites if fav.id != favorite_id]
+    async def export_expanded(
+        self, dictionary, user_id: str = DEFAULT_USER, batch_size: int = 500
+    ) -> AsyncIterator[List[FavoriteExpanded]]:
+        """按添加时间倒序逐批读出附带释义的收藏（每批一次词典查询）"""
+        batch: List[Favorite] = []
+        for favorite in self.export(user_id, batch_size):
+            batch.append(favorite)
+            if len(batch) >= batch_size:
+                yield await self.expand(batch, dictionary)
+                batch = []
+        if batch:
+            yield await self.expand(batch, dictionary)
 
-        if len(favorites) < original_count:
-            self._save_favorites(favorites)
-            return True
-        return False
+    def remove(self, favorite_id: str, user_id: str = DEFAULT_USER) -> bool:
+        """删除收藏（保留删除记录供增量同步）"""
+        return self.store.delete(user_id, favorite_id, self.clock.next())
 
-    def check(self, word: str) -> Optional[Favorite]:
+    def check(self, word: str, user_id: str = DEFAULT_USER) -> Optional[Favorite]:
         """检查单词是否已收藏"""
-        favorites = self._load_favorites()
-        for fav in favorites:
-            if fav.word.lower() == word.lower():
-                return fav
-        return None
+        return self.store.get_by_word(user_id, word)
@@ -0,0 +1,975 @@
+"""
+收藏存储后端
+
+- FavoritesStore: 存储接口（FavoritesService 只依赖这些方法）
+- JsonFavoritesStore: 原有的 JSON 文件存储（每次操作整体读写文件）
+- SQLiteFavoritesStore: SQLite（WAL 模式）存储，(user_id, word_key) 唯一
+  索引保证同一用户的同一单词只收藏一次，(user_id, created_at, id) 索引支持
+  游标分页，(user_id, version) 索引支持增量同步
+- WriteBehindFavoritesStore: 包在任一后端外面的内存索引，读全部走内存；
+  写操作先追加到日志文件（批量 fsync），后台再合并进后端存储。
+  仅支持单进程（单个 worker）
+
+收藏按用户分区（Favorite.user_id）。每次添加 / 删除带一个由调用方分配的
+单调递增版本号（Favorite.version / FavoriteTombstone.version）；删除时保留
+墓碑记录，客户端据此增量同步。
+"""
+
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows 上没有 fcntl，不做进程锁
+    fcntl = None
+
+from models.favorite import DEFAULT_USER, Favorite, FavoriteTombstone
+
+
+# 游标：(created_at 存储格式, id)，分页返回早于游标的记录
+Cursor = Tuple[str, str]
+# 删除操作：(user_id, id, version)
+Deletion = Tuple[str, str, int]
+
+
+def _timestamp(value: datetime) -> str:
+    """created_at 的存储格式（固定到微秒，保证按字符串排序即按时间排序）"""
+    return value.isoformat(timespec="microseconds")
+
+
+def word_key(word: str) -> str:
+    """
+    单词去重 / 查找用的标准化形式（不区分大小写）
+
+    所有后端都在 Python 中计算：SQLite 的 lower() 只转换 ASCII，
+    "Éclair" 与 "éclair" 会被当成不同的单词。
+    """
+    return word.lower()
+
+
+def sort_key(favorite: Favorite) -> Cursor:
+    """列表排序键（按此键降序即最新的在前）"""
+    return (_timestamp(favorite.created_at), favorite.id)
+
+
+class FavoritesStore:
+    """
+    收藏存储接口
+
+    page / changes / version / count 的默认实现基于 list 和 _tombstones，
+    适用于整体读写的小型后端；SQLite 和内存索引各自覆盖为索引查询。
+    """
+
+    name = "base"
+
+    def list(self, user_id: str) -> List[Favorite]:
+        """某个用户的全部收藏（最新的在前）"""
+        raise NotImplementedError
+
+    def _tombstones(self, user_id: str) -> List[FavoriteTombstone]:
+        raise NotImplementedError
+
+    def dump(self) -> Tuple[List[Favorite], List[FavoriteTombstone]]:
+        """全部用户的收藏和墓碑（用于加载内存索引、迁移）"""
+        raise NotImplementedError
+
+    def page(
+        self, user_id: str, limit: int, before: Optional[Cursor] = None
+    ) -> List[Favorite]:
+        """按 (created_at, id) 降序的一页，只包含早于 before 的记录"""
+        favorites = self.list(user_id)
+        if before is not None:
+            favorites = [fav for fav in favorites if sort_key(fav) < before]
+        return favorites[:limit]
+
+    def changes(
+        self, user_id: str, since: int, limit: int
+    ) -> Tuple[List[Favorite], List[FavoriteTombstone]]:
+        """版本号大于 since 的添加和删除（各自按版本号升序，各最多 limit 条）"""
+        added = sorted(
+            (fav for fav in self.list(user_id) if fav.version > since),
+            key=lambda fav: fav.version,
+        )
+        removed = sorted(
+            (t for t in self._tombstones(user_id) if t.version > since),
+            key=lambda t: t.version,
+        )
+        return added[:limit], removed[:limit]
+
+    def version(self, user_id: str) -> int:
+        """用户的当前版本号（最近一次添加或删除的版本号）"""
+        versions = [fav.version for fav in self.list(user_id)]
+        versions += [t.version for t in self._tombstones(user_id)]
+        return max(versions, default=0)
+
+    def get_by_word(self, user_id: str, word: str) -> Optional[Favorite]:
+        """按单词查找（不区分大小写）"""
+        raise NotImplementedError
+
+    def get_many_by_words(self, user_id: str, words: Iterable[str]) -> Dict[str, Favorite]:
+        """批量按单词查找，返回 {小写单词: Favorite}（只包含已收藏的）"""
+        wanted = {word_key(word) for word in words}
+        return {
+            word_key(fav.word): fav
+            for fav in self.list(user_id)
+            if word_key(fav.word) in wanted
+        }
+
+    def insert(self, favorite: Favorite) -> Favorite:
+        """
+        插入收藏；同一用户的同一单词（不区分大小写）已存在时不插入
+
+        Returns:
+            Favorite: 新插入的记录，或已存在的记录
+        """
+        raise NotImplementedError
+
+    def insert_many(self, favorites: Iterable[Favorite]) -> int:
+        """批量插入（已存在的单词跳过），返回插入条数"""
+        inserted = 0
+        for favorite in favorites:
+            if self.insert(favorite).id == favorite.id:
+                inserted += 1
+        return inserted
+
+    def delete(self, user_id: str, favorite_id: str, version: int) -> bool:
+        """按 ID 删除并留下墓碑，返回是否删除了记录"""
+        return self.delete_many([(user_id, favorite_id, version)]) > 0
+
+    def delete_many(self, deletions: Iterable[Deletion]) -> int:
+        """批量删除，返回删除条数"""
+        raise NotImplementedError
+
+    def prune_tombstones(self, before_version: int) -> int:
+        """清理版本号小于 before_version 的墓碑，返回清理条数"""
+        raise NotImplementedError
+
+    def count(self, user_id: str) -> int:
+        return len(self.list(user_id))
+
+    def close(self):
+        pass
+
+
+class JsonFavoritesStore(FavoritesStore):
+    """JSON 文件存储"""
+
+    name = "json"
+
+    def __init__(self, data_file: str, create: bool = True):
+        """
+        Args:
+            data_file: JSON 文件路径
+            create: 文件不存在时是否新建空文件（导入旧数据时为 False）
+        """
+        self.data_file = data_file
+        if create:
+            self._ensure_data_file()
+
+    def _ensure_data_file(self):
+        """确保数据文件存在"""
+        directory = os.path.dirname(self.data_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self.data_file):
+            with open(self.data_file, 'w', encoding='utf-8') as f:
+                json.dump({"favorites": [], "tombstones": []}, f, ensure_ascii=False, indent=2)
+
+    def _load(self) -> Tuple[List[Favorite], List[FavoriteTombstone]]:
+        """从文件加载收藏列表和墓碑"""
+        try:
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return (
+                    [Favorite(**item) for item in data.get("favorites", [])],
+                    [FavoriteTombstone(**item) for item in data.get("tombstones", [])],
+                )
+        except Exception as e:
+            print(f"Error loading favorites: {e}")
+            return [], []
+
+    def _save(self, favorites: List[Favorite], tombstones: List[FavoriteTombstone]):
+        """保存收藏列表和墓碑到文件"""
+        try:
+            data = {
+                "favorites": [fav.model_dump(mode="json") for fav in favorites],
+                "tombstones": [t.model_dump() for t in tombstones],
+            }
+            with open(self.data_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Error saving favorites: {e}")
+            raise
+
+    def dump(self) -> Tuple[List[Favorite], List[FavoriteTombstone]]:
+        return self._load()
+
+    def list(self, user_id: str) -> List[Favorite]:
+        favorites, _ = self._load()
+        return sorted(
+            (fav for fav in favorites if fav.user_id == user_id),
+            key=sort_key, reverse=True,
+        )
+
+    def _tombstones(self, user_id: str) -> List[FavoriteTombstone]:
+        _, tombstones = self._load()
+        return [t for t in tombstones if t.user_id == user_id]
+
+    def get_by_word(self, user_id: str, word: str) -> Optional[Favorite]:
+        for fav in self.list(user_id):
+            if word_key(fav.word) == word_key(word):
+                return fav
+        return None
+
+    def insert(self, favorite: Favorite) -> Favorite:
+        existing = self.get_by_word(favorite.user_id, favorite.word)
+        if existing is not None:
+            return existing  # 已存在，返回现有记录
+        self.insert_many([favorite])
+        return favorite
+
+    def insert_many(self, favorites: Iterable[Favorite]) -> int:
+        """批量插入（读写文件各一次）"""
+        existing, tombstones = self._load()
+        words = {(fav.user_id, word_key(fav.word)) for fav in existing}
+        added = []
+        for favorite in favorites:
+            key = (favorite.user_id, word_key(favorite.word))
+            if key not in words:
+                words.add(key)
+                added.append(favorite)
+        if added:
+            # 新记录在前，保持最新的在最前面
+            self._save(added[::-1] + existing, tombstones)
+        return len(added)
+
+    def delete_many(self, deletions: Iterable[Deletion]) -> int:
+        favorites, tombstones = self._load()
+        by_key = {(fav.user_id, fav.id): fav for fav in favorites}
+        removed = set()
+        for user_id, favorite_id, version in deletions:
+            favorite = by_key.pop((user_id, favorite_id), None)
+            if favorite is not None:
+                removed.add(favorite.id)
+                tombstones.append(FavoriteTombstone(
+                    id=favorite.id, word=favorite.word, user_id=user_id, version=version,
+                ))
+        if removed:
+            self._save([fav for fav in favorites if fav.id not in removed], tombstones)
+        return len(removed)
+
+    def prune_tombstones(self, before_version: int) -> int:
+        favorites, tombstones = self._load()
+        kept = [t for t in tombstones if t.version >= before_version]
+        if len(kept) < len(tombstones):
+            self._save(favorites, kept)
+        return len(tombstones) - len(kept)
+
+
+class SQLiteFavoritesStore(FavoritesStore):
+    """SQLite 存储（单连接 + 锁，WAL 模式下读写互不阻塞）"""
+
+    name = "sqlite"
+
+    COLUMNS = "id, word, phonetic, chinese, created_at, user_id, version"
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite 文件路径
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS favorites (
+                id TEXT PRIMARY KEY,
+                word TEXT NOT NULL,
+                phonetic TEXT,
+                chinese TEXT,
+                created_at TEXT NOT NULL,
+                user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER}',
+                version INTEGER NOT NULL DEFAULT 0,
+                word_key TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+        self._migrate_schema()
+        self._migrate_word_key()
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS favorites_user_word_key "
+            "ON favorites (user_id, word_key)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS favorites_user_created_at "
+            "ON favorites (user_id, created_at, id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS favorites_user_version "
+            "ON favorites (user_id, version)"
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS favorite_tombstones (
+                user_id TEXT NOT NULL,
+                id TEXT NOT NULL,
+                word TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                PRIMARY KEY (user_id, id)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS favorite_tombstones_user_version "
+            "ON favorite_tombstones (user_id, version)"
+        )
+        self._conn.commit()
+
+    def _migrate_schema(self):
+        """单用户版本的表补上 user_id / version 列，换成按用户分区的索引"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(favorites)")}
+        if "user_id" in columns:
+            return
+        self._conn.execute(
+            f"ALTER TABLE favorites ADD COLUMN user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER}'"
+        )
+        self._conn.execute(
+            "ALTER TABLE favorites ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+        )
+        self._conn.execute("DROP INDEX IF EXISTS favorites_word")
+        self._conn.execute("DROP INDEX IF EXISTS favorites_created_at")
+
+    def _migrate_word_key(self):
+        """
+        旧表补上 word_key 列（Python 计算的标准化单词），替换 lower(word) 索引
+
+        旧索引只按 ASCII 去重，可能留下 "Éclair" / "éclair" 这样的重复，
+        每组保留最早添加的一条。
+        """
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(favorites)")}
+        if "word_key" in columns:
+            return
+        self._conn.execute(
+            "ALTER TABLE favorites ADD COLUMN word_key TEXT NOT NULL DEFAULT ''"
+        )
+        self._conn.execute("DROP INDEX IF EXISTS favorites_user_word")
+
+        rows = self._conn.execute(
+            "SELECT id, word, user_id FROM favorites ORDER BY created_at, id"
+        ).fetchall()
+        seen = set()
+        duplicates = []
+        updates = []
+        for id, word, user_id in rows:
+            key = word_key(word)
+            if (user_id, key) in seen:
+                duplicates.append((id,))
+            else:
+                seen.add((user_id, key))
+                updates.append((key, id))
+        self._conn.executemany("UPDATE favorites SET word_key = ? WHERE id = ?", updates)
+        self._conn.executemany("DELETE FROM favorites WHERE id = ?", duplicates)
+        if duplicates:
+            print(f"Removed {len(duplicates)} duplicate favorites while adding word_key")
+
+    @staticmethod
+    def _row_to_favorite(row) -> Favorite:
+        id, word, phonetic, chinese, created_at, user_id, version = row
+        return Favorite(
+            id=id,
+            word=word,
+            phonetic=phonetic,
+            chinese=chinese,
+            created_at=datetime.fromisoformat(created_at),
+            user_id=user_id,
+            version=version,
+        )
+
+    @staticmethod
+    def _favorite_to_row(favorite: Favorite):
+        return (
+            favorite.id,
+            favorite.word,
+            favorite.phonetic,
+            favorite.chinese,
+            _timestamp(favorite.created_at),
+            favorite.user_id,
+            favorite.version,
+            word_key(favorite.word),
+        )
+
+    def _select(self, where: str, params: tuple) -> List[Favorite]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM favorites {where}", params
+            ).fetchall()
+        return [self._row_to_favorite(row) for row in rows]
+
+    def dump(self) -> Tuple[List[Favorite], List[FavoriteTombstone]]:
+        favorites = self._select("", ())
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, id, word, version FROM favorite_tombstones"
+            ).fetchall()
+        tombstones = [
+            FavoriteTombstone(user_id=user_id, id=id, word=word, version=version)
+            for user_id, id, word, version in rows
+        ]
+        return favorites, tombstones
+
+    def list(self, user_id: str) -> List[Favorite]:
+        return self._select(
+            "WHERE user_id = ? ORDER BY created_at DESC, id DESC", (user_id,)
+        )
+
+    def page(
+        self, user_id: str, limit: int, before: Optional[Cursor] = None
+    ) -> List[Favorite]:
+        if before is None:
+            return self._select(
+                "WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT ?",
+                (user_id, limit),
+            )
+        return self._select(
+            "WHERE user_id = ? AND (created_at, id) < (?, ?) "
+            "ORDER BY created_at DESC, id DESC LIMIT ?",
+            (user_id, *before, limit),
+        )
+
+    def changes(
+        self, user_id: str, since: int, limit: int
+    ) -> Tuple[List[Favorite], List[FavoriteTombstone]]:
+        added = self._select(
+            "WHERE user_id = ? AND version > ? ORDER BY version LIMIT ?",
+            (user_id, since, limit),
+        )
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, word, version FROM favorite_tombstones "
+                "WHERE user_id = ? AND version > ? ORDER BY version LIMIT ?",
+                (user_id, since, limit),
+            ).fetchall()
+        removed = [
+            FavoriteTombstone(id=id, word=word, user_id=user_id, version=version)
+            for id, word, version in rows
+        ]
+        return added, removed
+
+    def version(self, user_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT max("
+                "COALESCE((SELECT max(version) FROM favorites WHERE user_id = ?), 0), "
+                "COALESCE((SELECT max(version) FROM favorite_tombstones WHERE user_id = ?), 0))",
+                (user_id, user_id),
+            ).fetchone()
+        return row[0]
+
+    def get_by_word(self, user_id: str, word: str) -> Optional[Favorite]:
+        favorites = self._select(
+            "WHERE user_id = ? AND word_key = ?", (user_id, word_key(word))
+        )
+        return favorites[0] if favorites else None
+
+    def get_many_by_words(self, user_id: str, words: Iterable[str]) -> Dict[str, Favorite]:
+        keys = list({word_key(word) for word in words})
+        found: Dict[str, Favorite] = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            for fav in self._select(
+                f"WHERE user_id = ? AND word_key IN ({','.join('?' * len(chunk))})",
+                (user_id, *chunk),
+            ):
+                found[word_key(fav.word)] = fav
+        return found
+
+    def insert(self, favorite: Favorite) -> Favorite:
+        if self.insert_many([favorite]):
+            return favorite
+        return self.get_by_word(favorite.user_id, favorite.word)
+
+    def insert_many(self, favorites: Iterable[Favorite]) -> int:
+        """批量插入（一个事务）"""
+        rows = [self._favorite_to_row(favorite) for favorite in favorites]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO favorites ({self.COLUMNS}, word_key) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def delete_many(self, deletions: Iterable[Deletion]) -> int:
+        """批量删除并写入墓碑（一个事务）"""
+        deleted = 0
+        with self._lock:
+            for user_id, favorite_id, version in deletions:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO favorite_tombstones (user_id, id, word, version) "
+                    "SELECT user_id, id, word, ? FROM favorites WHERE user_id = ? AND id = ?",
+                    (version, user_id, favorite_id),
+                )
+                cursor = self._conn.execute(
+                    "DELETE FROM favorites WHERE user_id = ? AND id = ?",
+                    (user_id, favorite_id),
+                )
+                deleted += cursor.rowcount
+            self._conn.commit()
+        return deleted
+
+    def prune_tombstones(self, before_version: int) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM favorite_tombstones WHERE version < ?", (before_version,)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def count(self, user_id: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM favorites WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Partition:
+    """一个用户的内存索引"""
+
+    def __init__(self):
+        self.by_word: Dict[str, Favorite] = {}
+        self.by_id: Dict[str, Favorite] = {}
+        self.order: List[Cursor] = []  # (created_at, id) 升序
+        self.by_version: List[Tuple[int, str]] = []  # (version, id) 升序
+        self.tombstones: List[FavoriteTombstone] = []  # 按 version 升序
+        self.tombstone_versions: List[int] = []  # 与 tombstones 一一对应
+        self.version = 0
+
+    def add(self, favorite: Favorite):
+        self.by_word[word_key(favorite.word)] = favorite
+        self.by_id[favorite.id] = favorite
+        bisect.insort(self.order, sort_key(favorite))
+        bisect.insort(self.by_version, (favorite.version, favorite.id))
+        self.version = max(self.version, favorite.version)
+
+    def remove(self, favorite: Favorite):
+        del self.by_word[word_key(favorite.word)]
+        del self.by_id[favorite.id]
+        for items, key in (
+            (self.order, sort_key(favorite)),
+            (self.by_version, (favorite.version, favorite.id)),
+        ):
+            i = bisect.bisect_left(items, key)
+            if i < len(items) and items[i] == key:
+                del items[i]
+
+    def add_tombstone(self, tombstone: FavoriteTombstone):
+        i = bisect.bisect_right(self.tombstone_versions, tombstone.version)
+        self.tombstone_versions.insert(i, tombstone.version)
+        self.tombstones.insert(i, tombstone)
+        self.version = max(self.version, tombstone.version)
+
+    def prune_tombstones(self, before_version: int):
+        i = bisect.bisect_left(self.tombstone_versions, before_version)
+        del self.tombstone_versions[:i]
+        del self.tombstones[:i]
+
+
+class WriteBehindFavoritesStore(FavoritesStore):
+    """
+    内存索引 + 追加日志的写回（write-behind）存储
+
+    - 每个用户一个内存分区：小写单词 -> Favorite、ID -> Favorite、按
+      (created_at, id) 和按版本号排序的列表、墓碑列表；所有读操作不访问磁盘
+    - insert / delete 更新内存后把操作追加到待写队列，后台线程每隔
+      flush_interval 秒批量写入日志并 fsync 一次
+    - 日志累计 compact_every 条后，后台把这些操作合并进后端存储并清空日志
+    - 启动时先把残留日志重放到后端存储（崩溃恢复；重放是幂等的），
+      再从后端加载内存索引
+
+    进程崩溃最多丢失最近 flush_interval 秒内的写操作。
+
+    内存索引属于单个进程，多个进程（多个 uvicorn worker）共用同一日志和后端
+    时会读到过期数据、丢失写操作。启动时对日志加排他文件锁，另一个进程已在
+    使用同一日志时抛出 RuntimeError。
+    """
+
+    def __init__(
+        self,
+        backing: FavoritesStore,
+        journal_path: str,
+        flush_interval: float = 0.05,
+        compact_every: int = 1000,
+    ):
+        """
+        Args:
+            backing: 持久化后端（SQLite / JSON）
+            journal_path: 日志文件路径（JSONL，每行一个操作）
+            flush_interval: 批量 fsync 的间隔，秒
+            compact_every: 日志累计多少条后合并进后端
+        """
+        self.backing = backing
+        self.name = f"{backing.name}+journal"
+        self.journal_path = journal_path
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+
+        directory = os.path.dirname(journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock_file = self._acquire_process_lock(journal_path + ".lock")
+
+        self._lock = threading.Lock()  # 内存索引与待写队列
+        self._io_lock = threading.Lock()  # 日志文件与后端存储
+        self._partitions: Dict[str, _Partition] = {}
+
+        self._pending: List[dict] = []  # 尚未写入日志的操作
+        self._journaled: List[dict] = []  # 已写入日志、尚未合并进后端的操作
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        # 统计信息
+        self.recovered = 0
+        self.flushes = 0
+        self.compactions = 0
+
+        self.recovered = self._recover()
+        self._load()
+
+        self._journal = open(journal_path, "a", encoding="utf-8")
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="favorites-journal", daemon=True
+        )
+        self._flusher.start()
+
+    @staticmethod
+    def _acquire_process_lock(path: str):
+        """
+        对日志加排他锁（进程退出时自动释放）
+
+        Raises:
+            RuntimeError: 另一个进程正在使用同一日志
+        """
+        lock_file = open(path, "a")
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise RuntimeError(
+                f"Favorites journal {path} is locked by another process. "
+                "Write-behind mode supports a single worker; set "
+                "FAVORITES_WRITE_BEHIND=false when running multiple workers."
+            )
+        return lock_file
+
+    def _load(self):
+        """从后端存储加载全部用户的内存索引"""
+        favorites, tombstones = self.backing.dump()
+        for favorite in favorites:
+            self._partition(favorite.user_id).add(favorite)
+        for tombstone in tombstones:
+            self._partition(tombstone.user_id).add_tombstone(tombstone)
+
+    def _partition(self, user_id: str) -> _Partition:
+        partition = self._partitions.get(user_id)
+        if partition is None:
+            partition = self._partitions[user_id] = _Partition()
+        return partition
+
+    # ---- 日志 ----
+
+    def _recover(self) -> int:
+        """把残留日志重放到后端存储并清空日志，返回重放的操作数"""
+        if not os.path.exists(self.journal_path):
+            return 0
+        ops = []
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    ops.append(json.loads(line))
+                except ValueError:
+                    # 崩溃时可能留下半行
+                    continue
+        if ops:
+            self._apply(ops)
+            print(f"Recovered {len(ops)} favorites operations from {self.journal_path}")
+        self._truncate_journal()
+        return len(ops)
+
+    def _apply(self, ops: List[dict]):
+        """按顺序把操作应用到后端存储（连续的同类操作合并成一批）"""
+        inserts: List[Favorite] = []
+        deletes: List[Deletion] = []
+        for op in ops:
+            if op["op"] == "add":
+                if deletes:
+                    self.backing.delete_many(deletes)
+                    deletes = []
+                inserts.append(Favorite(**op["favorite"]))
+            elif op["op"] == "remove":
+                if inserts:
+                    self.backing.insert_many(inserts)
+                    inserts = []
+                deletes.append(
+                    (op.get("user_id", DEFAULT_USER), op["id"], op.get("version", 0))
+                )
+        if inserts:
+            self.backing.insert_many(inserts)
+        if deletes:
+            self.backing.delete_many(deletes)
+
+    def _truncate_journal(self):
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait()
+            time.sleep(self.flush_interval)  # 攒一批再写
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing favorites journal: {e}")
+
+    def flush(self):
+        """把待写操作写入日志并 fsync；日志足够长时合并进后端存储"""
+        with self._io_lock:
+            with self._lock:
+                ops, self._pending = self._pending, []
+            if ops:
+                self._journal.write(
+                    "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops)
+                )
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+                self._journaled.extend(ops)
+                self.flushes += 1
+            if len(self._journaled) >= self.compact_every:
+                self._compact()
+
+    def compact(self):
+        """把已写入日志的操作合并进后端存储，然后清空日志"""
+        with self._io_lock:
+            self._compact()
+
+    def _compact(self):
+        if not self._journaled:
+            return
+        self._apply(self._journaled)
+        self._journaled = []
+        self._journal.truncate(0)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self.compactions += 1
+
+    def _enqueue(self, op: dict):
+        self._pending.append(op)
+        self._wakeup.set()
+
+    # ---- 读 ----
+
+    def dump(self) -> Tuple[List[Favorite], List[FavoriteTombstone]]:
+        with self._lock:
+            favorites = [
+                fav for p in self._partitions.values() for fav in p.by_id.values()
+            ]
+            tombstones = [t for p in self._partitions.values() for t in p.tombstones]
+        return favorites, tombstones
+
+    def list(self, user_id: str) -> List[Favorite]:
+        with self._lock:
+            partition = self._partitions.get(user_id)
+            if partition is None:
+                return []
+            return [partition.by_id[id] for _, id in reversed(partition.order)]
+
+    def page(
+        self, user_id: str, limit: int, before: Optional[Cursor] = None
+    ) -> List[Favorite]:
+        with self._lock:
+            partition = self._partitions.get(user_id)
+            if partition is None:
+                return []
+            end = len(partition.order)
+            if before is not None:
+                end = bisect.bisect_left(partition.order, before)
+            keys = partition.order[max(0, end - limit):end]
+            return [partition.by_id[id] for _, id in reversed(keys)]
+
+    def changes(
+        self, user_id: str, since: int, limit: int
+    ) -> Tuple[List[Favorite], List[FavoriteTombstone]]:
+        with self._lock:
+            partition = self._partitions.get(user_id)
+            if partition is None:
+                return [], []
+            start = bisect.bisect_left(partition.by_version, (since + 1,))
+            added = [
+                partition.by_id[id]
+                for _, id in partition.by_version[start:start + limit]
+            ]
+            start = bisect.bisect_right(partition.tombstone_versions, since)
+            removed = partition.tombstones[start:start + limit]
+        return added, removed
+
+    def version(self, user_id: str) -> int:
+        partition = self._partitions.get(user_id)
+        return partition.version if partition is not None else 0
+
+    def get_by_word(self, user_id: str, word: str) -> Optional[Favorite]:
+        partition = self._partitions.get(user_id)
+        return partition.by_word.get(word_key(word)) if partition is not None else None
+
+    def get_many_by_words(self, user_id: str, words: Iterable[str]) -> Dict[str, Favorite]:
+        partition = self._partitions.get(user_id)
+        if partition is None:
+            return {}
+        found: Dict[str, Favorite] = {}
+        for word in words:
+            favorite = partition.by_word.get(word_key(word))
+            if favorite is not None:
+                found[word_key(word)] = favorite
+        return found
+
+    def count(self, user_id: str) -> int:
+        partition = self._partitions.get(user_id)
+        return len(partition.by_id) if partition is not None else 0
+
+    # ---- 写 ----
+
+    def insert(self, favorite: Favorite) -> Favorite:
+        with self._lock:
+            partition = self._partition(favorite.user_id)
+            existing = partition.by_word.get(word_key(favorite.word))
+            if existing is not None:
+                return existing
+            partition.add(favorite)
+            self._enqueue({"op": "add", "favorite": favorite.model_dump(mode="json")})
+        return favorite
+
+    def insert_many(self, favorites: Iterable[Favorite]) -> int:
+        inserted = 0
+        with self._lock:
+            for favorite in favorites:
+                partition = self._partition(favorite.user_id)
+                if word_key(favorite.word) in partition.by_word:
+                    continue
+                partition.add(favorite)
+                self._enqueue({"op": "add", "favorite": favorite.model_dump(mode="json")})
+                inserted += 1
+        return inserted
+
+    def delete_many(self, deletions: Iterable[Deletion]) -> int:
+        deleted = 0
+        with self._lock:
+            for user_id, favorite_id, version in deletions:
+                partition = self._partitions.get(user_id)
+                favorite = partition.by_id.get(favorite_id) if partition else None
+                if favorite is None:
+                    continue
+                partition.remove(favorite)
+                partition.add_tombstone(FavoriteTombstone(
+                    id=favorite.id, word=favorite.word, user_id=user_id, version=version,
+                ))
+                self._enqueue({
+                    "op": "remove", "user_id": user_id, "id": favorite_id, "version": version,
+                })
+                deleted += 1
+        return deleted
+
+    def prune_tombstones(self, before_version: int) -> int:
+        with self._lock:
+            for partition in self._partitions.values():
+                partition.prune_tombstones(before_version)
+        # 墓碑清理不需要崩溃恢复，直接作用到后端存储
+        with self._io_lock:
+            return self.backing.prune_tombstones(before_version)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "users": len(self._partitions),
+            "favorites": sum(len(p.by_id) for p in self._partitions.values()),
+            "pending": len(self._pending),
+            "journaled": len(self._journaled),
+            "recovered": self.recovered,
+            "flushes": self.flushes,
+            "compactions": self.compactions,
+        }
+
+    def close(self):
+        """写入全部待写操作、合并进后端存储并关闭"""
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+        self.compact()
+        self._journal.close()
+        self.backing.close()
+        self._lock_file.close()
+
+
+def _migrated_path(json_path: str) -> str:
+    """导入后的备份文件名，已有备份时依次加序号，不覆盖旧备份"""
+    target = json_path + ".migrated"
+    n = 1
+    while os.path.exists(target):
+        target = f"{json_path}.migrated.{n}"
+        n += 1
+    return target
+
+
+def migrate_json(json_path: str, store: FavoritesStore) -> int:
+    """
+    将 JSON 文件中的收藏一次性导入 store，导入后把 JSON 文件重命名为
+    *.migrated（保留原数据，且不会重复导入；已有的备份不会被覆盖）
+
+    多个 worker 同时启动时，导入在 json_path + ".lock" 的文件锁内进行，
+    只有拿到锁时 JSON 文件仍然存在的进程执行导入，其余进程直接返回 0。
+
+    Returns:
+        int: 导入的条数（JSON 文件不存在时为 0）
+    """
+    if not os.path.exists(json_path):
+        return 0
+
+    with open(json_path + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # 等锁期间其他 worker 可能已经导入并改名
+        if not os.path.exists(json_path):
+            return 0
+        favorites, _ = JsonFavoritesStore(json_path, create=False).dump()
+        inserted = store.insert_many(favorites)
+        os.replace(json_path, _migrated_path(json_path))
+    print(
+        f"Migrated {inserted}/{len(favorites)} favorites "
+        f"from {json_path} to {store.name}"
+    )
+    return inserted
@@ -0,0 +1,106 @@
+"""
+增量 JSON 字段解析
+
+LLM 以流式返回一个 JSON 对象时，逐块喂入文本，每当顶层对象的某个字段
+的值完整出现，就立即解析并返回 (字段名, 值)，不必等待整个对象结束。
+
+只处理顶层为对象的 JSON；字段值可以是任意 JSON（字符串、数组、嵌套对象等）。
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class IncrementalJSONParser:
+    """流式 JSON 顶层字段解析器"""
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0  # 下一个待扫描字符
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+        self._key: Optional[str] = None  # 当前字段名
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+        self._expect_value = False  # 已读到冒号，等待值开始
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        喂入一段文本
+
+        Returns:
+            List[Tuple[str, Any]]: 本次新完成的 (字段名, 值)
+        """
+        self.buffer += chunk
+        fields: List[Tuple[str, Any]] = []
+        buffer = self.buffer
+
+        while self._pos < len(buffer):
+            i = self._pos
+            ch = buffer[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._value_start is None:
+                            # 顶层字段名结束
+                            self._key = json.loads(buffer[self._key_start:i + 1])
+                        else:
+                            # 顶层字符串值结束
+                            self._emit(fields, i + 1)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect_value:
+                        self._start_value(i)
+                    elif self._value_start is None:
+                        self._key_start = i
+            elif ch in '{[':
+                if self._depth == 1 and self._expect_value:
+                    self._start_value(i)
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    # 顶层的数组/对象值结束
+                    self._emit(fields, i + 1)
+                elif self._depth == 0 and self._value_start is not None:
+                    # 顶层对象结束，最后一个字段是数字/布尔/null
+                    self._emit(fields, i)
+            elif ch == ',':
+                if self._depth == 1 and self._value_start is not None:
+                    self._emit(fields, i)
+            elif ch == ':':
+                if self._depth == 1 and self._value_start is None and self._key is not None:
+                    self._expect_value = True
+            elif not ch.isspace():
+                if self._depth == 1 and self._expect_value:
+                    self._start_value(i)
+
+        return fields
+
+    def _start_value(self, index: int):
+        self._value_start = index
+        self._expect_value = False
+
+    def _emit(self, fields: List[Tuple[str, Any]], end: int):
+        """解析 [value_start, end) 的值并重置字段状态"""
+        raw = self.buffer[self._value_start:end].strip()
+        try:
+            fields.append((self._key, json.loads(raw)))
+        except ValueError:
+            # 值不合法时跳过该字段，由最终的完整解析兜底
+            pass
+        self._key = None
+        self._key_start = None
+        self._value_start = None
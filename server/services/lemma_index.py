@@ -0,0 +1,90 @@
+"""
+词形还原索引（inflection -> lemma）
+
+ECDICT 的 exchange 字段记录词形变化，例如 "perceive" 的:
+    "d:perceived/p:perceived/3:perceives/i:perceiving"
+变形词自身的 exchange 则用 "0:" 指向原形，例如 "mice" 的 "0:mouse/1:s"。
+
+类型说明:
+    p 过去式, d 过去分词, i 现在分词, 3 第三人称单数,
+    r 比较级, t 最高级, s 名词复数, 0 原形, 1 变形类型
+"""
+
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# 表示"变形"的类型（原形 -> 变形）
+INFLECTION_TYPES = ("p", "d", "i", "3", "r", "t", "s")
+
+
+def parse_exchange(exchange: Optional[str]) -> Dict[str, str]:
+    """解析 exchange 字段为 {类型: 词形}"""
+    result: Dict[str, str] = {}
+    if not exchange:
+        return result
+    for item in exchange.split('/'):
+        kind, sep, form = item.partition(':')
+        if sep and form:
+            result[kind.strip()] = form.strip()
+    return result
+
+
+def lemma_of(word: str, exchange: Optional[str]) -> Optional[str]:
+    """从单词自身的 exchange 取原形（小写），自身就是原形时返回 None"""
+    lemma = parse_exchange(exchange).get("0")
+    if lemma and lemma.lower() != word.lower():
+        return lemma.lower()
+    return None
+
+
+class LemmaIndex:
+    """变形词 -> 原形 的哈希索引"""
+
+    def __init__(self, rows: Iterable[Tuple[str, Optional[str]]]):
+        """
+        Args:
+            rows: (word, exchange) 序列
+        """
+        started = time.perf_counter()
+        self._lemmas: Dict[str, str] = {}
+        explicit = []
+
+        for word, exchange in rows:
+            if not word or not exchange:
+                continue
+            forms = parse_exchange(exchange)
+            lemma = word.lower()
+
+            if "0" in forms:
+                # 变形词自身的 "0:" 优先级较低，最后补充
+                explicit.append((lemma, forms["0"].lower()))
+                continue
+
+            for kind in INFLECTION_TYPES:
+                form = forms.get(kind)
+                if not form:
+                    continue
+                form = form.lower()
+                if form != lemma:
+                    self._lemmas.setdefault(form, lemma)
+
+        for form, lemma in explicit:
+            if form != lemma:
+                self._lemmas.setdefault(form, lemma)
+
+        self.build_seconds = time.perf_counter() - started
+
+    def get(self, word: str) -> Optional[str]:
+        """返回小写原形，不是已知变形时返回 None"""
+        return self._lemmas.get(word)
+
+    def __len__(self) -> int:
+        return len(self._lemmas)
+
+    def stats(self) -> Dict[str, float]:
+        """索引统计"""
+        return {
+            "forms": len(self._lemmas),
+            "build_ms": round(self.build_seconds * 1000, 1),
+        }
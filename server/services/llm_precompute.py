@@ -0,0 +1,315 @@
+"""
+LLM 解释预计算
+
+离线为高频词批量生成 LLM 解释并写入解释缓存（与 /api/llm-explain 使用
+同一个缓存 key），常用词的请求不再需要等待 API。
+
+- 选词：ECDICT 中有词频排名（frq/bnc）或带 Collins 星级、Oxford 3000 标记
+  的原形词，按词频排名排序，取前 N 个
+- 并发受限、令牌桶限速的 worker；429 / 超时 / 5xx 由 LLMScheduler 重试，
+  仍然失败的单词记为 failed，下次运行时再次尝试
+- 断点续跑：每完成一个单词追加一行到检查点文件（JSONL），重新运行时跳过；
+  已在缓存中的单词也直接跳过，不消耗调用
+- 预算：最大 HTTP 请求次数（含 scheduler 的重试，硬上限）/ 最大 token 数，
+  达到后停止派发新任务
+
+用法（见 precompute_llm.py）:
+    uv run python precompute_llm.py --top 5000 --max-calls 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Set
+
+from .concurrency import BackpressureError, ExecutorTimeoutError, TokenBucket
+from .llm_scheduler import LLMBudgetError, LLMDeadlineError
+from .word_index import frequency_rank
+
+
+DEFAULT_CHECKPOINT = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "llm_precompute.jsonl"
+)
+
+
+def select_words(dictionary, top: int) -> List[str]:
+    """
+    选出最常用的 top 个原形词
+
+    排序：词频排名 -> Collins 星级（高在前）-> Oxford 3000
+    """
+    with dictionary._get_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT word, frq, bnc, collins, oxford, exchange
+            FROM stardict
+            WHERE frq > 0 OR bnc > 0 OR collins > 0 OR oxford > 0
+            """
+        ).fetchall()
+
+    candidates = []
+    seen: Set[str] = set()
+    for word, frq, bnc, collins, oxford, exchange in rows:
+        key = word.lower()
+        # 变形词（exchange 中有 "0:"）与原形共用解释，不单独生成
+        if key in seen or (exchange and "0:" in exchange):
+            continue
+        seen.add(key)
+        candidates.append(
+            (frequency_rank(frq, bnc), -(collins or 0), -(oxford or 0), key)
+        )
+
+    candidates.sort()
+    return [key for _, _, _, key in candidates[:top]]
+
+
+def load_checkpoint(path: str) -> Dict[str, str]:
+    """读取检查点 {单词: 状态}，后写入的记录覆盖先写入的"""
+    done: Dict[str, str] = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                # 中断时可能留下半行
+                continue
+            done[item["word"]] = item["status"]
+    return done
+
+
+def _ends_mid_line(path: str) -> bool:
+    """文件存在、非空且最后一个字节不是换行"""
+    if not os.path.exists(path):
+        return False
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+class PrecomputeJob:
+    """LLM 解释预计算任务"""
+
+    def __init__(
+        self,
+        llm,
+        dictionary,
+        checkpoint_path: str = DEFAULT_CHECKPOINT,
+        concurrency: int = 4,
+        rate_per_sec: float = 2.0,
+        max_calls: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        progress: bool = True,
+    ):
+        """
+        Args:
+            llm: LLMService
+            dictionary: DictionaryService（选词、取参考释义）
+            checkpoint_path: 检查点文件
+            concurrency: 同时进行的 API 调用数
+            rate_per_sec: 每秒最多发起的调用数
+            max_calls: 最多 HTTP 请求次数（含 scheduler 的重试，None 表示不限）
+            max_tokens: 最多消耗的 token 数（None 表示不限）
+            progress: 是否打印进度
+        """
+        self.llm = llm
+        self.dictionary = dictionary
+        self.checkpoint_path = checkpoint_path
+        self.concurrency = concurrency
+        self.rate_limiter = TokenBucket(rate=rate_per_sec, capacity=max(concurrency, 1))
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.progress = progress
+
+        self._start_calls = llm.scheduler.attempts
+        self._start_retries = llm.scheduler.retried
+        self._start_tokens = llm.tokens_used
+        self.stats = {
+            "total": 0, "skipped": 0, "cached": 0, "generated": 0,
+            "failed": 0, "retries": 0, "budget_exhausted": False,
+        }
+
+    @property
+    def calls(self) -> int:
+        """本任务实际发出的 HTTP 请求次数（含重试）"""
+        return self.llm.scheduler.attempts - self._start_calls
+
+    @property
+    def tokens(self) -> int:
+        return self.llm.tokens_used - self._start_tokens
+
+    def _budget_left(self) -> bool:
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            return False
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            return False
+        return True
+
+    def _record(self, word: str, status: str):
+        """追加检查点记录（每行一次 flush，中断后最多丢失正在处理的单词）"""
+        self._checkpoint.write(json.dumps({"word": word, "status": status}) + "\n")
+        self._checkpoint.flush()
+
+    def _report(self, done: int, force: bool = False):
+        if not self.progress or (not force and done % 10):
+            return
+        print(
+            f"\r  {done}/{self.stats['total']} words, "
+            f"{self.stats['generated']} generated, {self.stats['cached']} cached, "
+            f"{self.stats['failed']} failed, {self.calls} calls, {self.tokens} tokens",
+            end="", flush=True,
+        )
+
+    async def _process(self, word: str, basic_definition: Optional[str]) -> str:
+        """
+        生成一个单词的解释，返回状态 cached / generated / failed / budget
+
+        可重试的错误已由 LLMScheduler 重试，这里不再重试
+        """
+        try:
+            if await self.llm.is_cached(word, basic_definition):
+                return "cached"
+            if not self._budget_left():
+                return "budget"
+            await self.rate_limiter.acquire()
+            await self.llm.explain_word(word, basic_definition)
+            return "generated"
+        except LLMBudgetError:
+            return "budget"
+        except (ValueError, LLMDeadlineError, BackpressureError, ExecutorTimeoutError) as e:
+            print(f"\nFailed to precompute {word}: {e}")
+            return "failed"
+
+    async def run(self, words: List[str]) -> Dict[str, object]:
+        """
+        处理单词列表（已在检查点中完成的跳过）
+
+        Returns:
+            dict: 统计信息
+        """
+        started = time.perf_counter()
+        finished = load_checkpoint(self.checkpoint_path)
+        todo = [w for w in words if finished.get(w) not in ("generated", "cached")]
+        self.stats["total"] = len(words)
+        self.stats["skipped"] = len(words) - len(todo)
+
+        # 参考释义与 /api/llm-explain 一致（本地词典的中文释义），保证命中同一缓存 key
+        basics: Dict[str, Optional[str]] = {}
+        for start in range(0, len(todo), 500):
+            chunk = todo[start:start + 500]
+            definitions = await self.dictionary.get_definitions(chunk)
+            for word, definition in zip(chunk, definitions):
+                basics[word] = (definition.chinese or None) if definition is not None else None
+
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        terminate = _ends_mid_line(self.checkpoint_path)
+        self._checkpoint = open(self.checkpoint_path, "a", encoding="utf-8")
+        if terminate:
+            # 上次中断时留下的半行单独成行（读取时忽略），避免与新记录粘连
+            self._checkpoint.write("\n")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for word in todo:
+            queue.put_nowait(word)
+        done = self.stats["skipped"]
+
+        async def worker():
+            nonlocal done
+            while not queue.empty():
+                word = queue.get_nowait()
+                status = await self._process(word, basics[word])
+                if status == "budget":
+                    self.stats["budget_exhausted"] = True
+                    # 清空队列，其余 worker 处理完手头的单词后退出
+                    while not queue.empty():
+                        queue.get_nowait()
+                    return
+                self.stats[status] += 1
+                self._record(word, status)
+                done += 1
+                self._report(done)
+
+        # 请求次数上限交给 scheduler，重试也计入，不会超出
+        scheduler = self.llm.scheduler
+        previous_limit = scheduler.max_attempts
+        if self.max_calls is not None:
+            scheduler.max_attempts = self._start_calls + self.max_calls
+        try:
+            await asyncio.gather(*[worker() for _ in range(self.concurrency)])
+        finally:
+            scheduler.max_attempts = previous_limit
+            self._checkpoint.close()
+            self._report(done, force=True)
+            if self.progress:
+                print()
+
+        self.stats.update({
+            "calls": self.calls,
+            "retries": self.llm.scheduler.retried - self._start_retries,
+            "tokens": self.tokens,
+            "seconds": round(time.perf_counter() - started, 2),
+        })
+        return self.stats
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute LLM explanations for common words")
+    parser.add_argument("--top", type=int, default=5000, help="按词频取前 N 个单词")
+    parser.add_argument("--words", help="单词列表文件（每行一个），指定时忽略 --top")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="检查点文件")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发调用数")
+    parser.add_argument("--rate", type=float, default=2.0, help="每秒最多调用数")
+    parser.add_argument("--max-calls", type=int, help="最多 HTTP 请求次数（含重试）")
+    parser.add_argument("--max-tokens", type=int, help="最多消耗的 token 数")
+    args = parser.parse_args(argv)
+
+    from .dictionary import get_dictionary_service
+    from .llm_service import LLMService
+
+    try:
+        llm = LLMService()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    dictionary = get_dictionary_service()
+
+    if args.words:
+        with open(args.words, "r", encoding="utf-8") as f:
+            words = [line.strip().lower() for line in f if line.strip()]
+    else:
+        words = select_words(dictionary, args.top)
+
+    print(f"🧠 Precomputing LLM explanations for {len(words)} words ({llm.model})")
+    job = PrecomputeJob(
+        llm, dictionary,
+        checkpoint_path=args.checkpoint,
+        concurrency=args.concurrency,
+        rate_per_sec=args.rate,
+        max_calls=args.max_calls,
+        max_tokens=args.max_tokens,
+    )
+    stats = asyncio.run(job.run(words))
+    print(
+        f"✅ {stats['generated']} generated, {stats['cached']} already cached, "
+        f"{stats['skipped']} skipped (checkpoint), {stats['failed']} failed, "
+        f"{stats['calls']} calls, {stats['tokens']} tokens, {stats['seconds']}s"
+    )
+    if stats["budget_exhausted"]:
+        print("⚠️  Budget exhausted, rerun to continue from the checkpoint")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+LLM 请求调度
+
+所有 chat.completions.create 调用都经过 LLMScheduler:
+- 全局并发上限
+- 每分钟 token 数限流（按预估 token 数从令牌桶扣除）
+- 单次请求的总时限（包含排队、重试），超时抛出 LLMDeadlineError
+- 429 / 超时 / 连接错误 / 5xx 按带随机抖动的指数退避重试
+  （响应带 Retry-After 时至少等待该时间）
+- 可选的 HTTP 请求次数上限（含重试），用尽后抛出 LLMBudgetError
+- 统计：请求数、实际 HTTP 请求次数、重试数、429 次数、超时次数、延迟分位数
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import openai
+
+from .concurrency import TokenBucket
+
+
+class LLMDeadlineError(TimeoutError):
+    """LLM 请求在时限内没有完成"""
+
+
+class LLMBudgetError(RuntimeError):
+    """HTTP 请求次数已达上限（max_attempts）"""
+
+
+# 可以重试的错误
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """从错误响应的 Retry-After 头读取等待秒数"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMScheduler:
+    """LLM 调用的并发、限流、时限与重试"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        tokens_per_minute: float = 0,
+        deadline: float = 30.0,
+        retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        max_attempts: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_concurrency: 同时进行的请求数
+            tokens_per_minute: 每分钟 token 上限（0 表示不限）
+            deadline: 单次请求（含排队、重试）的默认时限，秒
+            retries: 最大重试次数
+            base_delay: 退避基数，秒
+            max_delay: 单次退避上限，秒
+            max_attempts: HTTP 请求总次数上限（含重试，None 表示不限），
+                          可在运行中修改
+        """
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.deadline = deadline
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # 桶容量为 10 秒的配额，避免启动时一次性打满一分钟
+        self.token_limiter = TokenBucket(
+            rate=tokens_per_minute / 60,
+            capacity=max(tokens_per_minute / 6, 1.0),
+        )
+
+        # 统计信息
+        self.requests = 0
+        self.attempts = 0  # 实际发出的 HTTP 请求（含重试）
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.rate_limited = 0
+        self.deadline_exceeded = 0
+        self.active = 0
+        self._latencies: deque = deque(maxlen=500)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """带随机抖动的指数退避（full jitter）"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    async def call(
+        self,
+        request: Callable[[], Awaitable[Any]],
+        estimated_tokens: int = 0,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """
+        调度一次请求
+
+        Args:
+            request: 发起请求的协程工厂（每次重试重新调用）
+            estimated_tokens: 预估 token 数（用于限流）
+            deadline: 时限，秒（默认为构造时的 deadline）
+
+        Raises:
+            LLMDeadlineError: 超过时限
+            LLMBudgetError: HTTP 请求次数已达 max_attempts
+            其他错误：不可重试的错误，或重试次数用尽后的最后一个错误
+        """
+        deadline = self.deadline if deadline is None else deadline
+        self.requests += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                self._attempts(request, estimated_tokens), deadline
+            )
+        except asyncio.TimeoutError:
+            self.deadline_exceeded += 1
+            self.failed += 1
+            raise LLMDeadlineError(f"LLM request did not finish within {deadline}s")
+        except Exception:
+            self.failed += 1
+            raise
+        self.succeeded += 1
+        self._latencies.append(time.perf_counter() - started)
+        return result
+
+    async def _attempts(
+        self, request: Callable[[], Awaitable[Any]], estimated_tokens: int
+    ) -> Any:
+        attempt = 0
+        while True:
+            await self.token_limiter.acquire(estimated_tokens)
+            async with self._semaphore:
+                if self.max_attempts is not None and self.attempts >= self.max_attempts:
+                    raise LLMBudgetError(
+                        f"LLM request budget of {self.max_attempts} attempts exhausted"
+                    )
+                self.attempts += 1
+                self.active += 1
+                try:
+                    return await request()
+                except RETRYABLE_ERRORS as e:
+                    if isinstance(e, openai.RateLimitError):
+                        self.rate_limited += 1
+                    if attempt >= self.retries:
+                        raise
+                    error = e
+                finally:
+                    self.active -= 1
+
+            # 退避期间不占用并发名额
+            self.retried += 1
+            delay = self._backoff(attempt, error)
+            print(f"LLM request failed ({type(error).__name__}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _percentile(self, values, q: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> Dict[str, Any]:
+        """调度统计"""
+        latencies = list(self._latencies)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "tokens_per_minute": self.tokens_per_minute,
+            "deadline": self.deadline,
+            "active": self.active,
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "rate_limited": self.rate_limited,
+            "deadline_exceeded": self.deadline_exceeded,
+            "p50_ms": round(self._percentile(latencies, 0.5) * 1000, 1),
+            "p95_ms": round(self._percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(self._percentile(latencies, 0.99) * 1000, 1),
+            "token_limiter": self.token_limiter.stats(),
+        }
@@ -1,14 +1,70 @@
 import os
 import json
-from typing import Optional
+import hashlib
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 from openai import AsyncOpenAI
 from models.llm_response import LLMExplanation, LLMExample
+from .cache import LRUCache
+from .concurrency import SingleFlight
+from .json_stream import IncrementalJSONParser
+from .llm_scheduler import LLMScheduler, LLMBudgetError, LLMDeadlineError
+from .persistent_cache import PersistentCache, TieredCache
+from .word_index import UNRANKED
+
+
+# 修改 prompt 含义（而不只是措辞）时递增，旧缓存全部失效
+PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = (
+    "You are a professional English teacher and linguist. "
+    "Provide detailed, educational explanations of English words "
+    "in Chinese. Format your response as valid JSON."
+)
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "llm_cache.db"
+)
+
+
+# 模型分级（LLM_TIERING=true 时启用，默认关闭）：常用词（词频排名 <=
+# LLM_SIMPLE_RANK）走 fast 档，使用 OPENAI_FAST_MODEL（未设置时与 OPENAI_MODEL
+# 相同）和精简 prompt。关闭时所有单词走 full 档，缓存 key 与分级前一致
+TIER_FAST = "fast"
+TIER_FULL = "full"
+
+# 预估的输出 token 数（用于每分钟 token 限流）
+ESTIMATED_OUTPUT_TOKENS = {TIER_FAST: 500, TIER_FULL: 1000}
+
+
+def _short_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+async def _dictionary_rank(word: str) -> int:
+    """
+    从词典的 frq/bnc 列取词频排名（词典数据库不存在时为 UNRANKED）
+
+    Raises:
+        BackpressureError: 词典查询队列已满
+        ExecutorTimeoutError: 词典查询超时
+    """
+    from .dictionary import get_dictionary_service
+    try:
+        dictionary = get_dictionary_service()
+    except FileNotFoundError:
+        return UNRANKED
+    return await dictionary.get_rank(word)
 
 
 class LLMService:
     """LLM 增强词典服务 - 使用 OpenAI API"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[TieredCache] = None,
+        rank_of: Optional[Callable[[str], Awaitable[int]]] = None,
+    ):
         """
         初始化 OpenAI 客户端
 
@@ -16,6 +72,13 @@ class LLMService:
         - OPENAI_API_KEY: OpenAI API 密钥
         - OPENAI_BASE_URL: (可选) 自定义 API 基础 URL
         - OPENAI_MODEL: (可选) 使用的模型，默认 gpt-4o-mini
+        - OPENAI_FAST_MODEL: (可选) 常用词使用的模型，默认与 OPENAI_MODEL 相同
+
+        Args:
+            cache: 解释缓存，默认为进程内 LRU + SQLite 两级缓存
+                   （LLM_CACHE_ENABLED=false 时只使用内存缓存）
+            rank_of: 单词 -> 词频排名的协程函数，用于模型分级
+                     （默认查询词典的 frq/bnc 列）
         """
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -27,11 +90,126 @@ class LLMService:
         base_url = os.getenv("OPENAI_BASE_URL")
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
-        # 初始化客户端
+        self.fast_model = os.getenv("OPENAI_FAST_MODEL", self.model)
+
+        # 初始化客户端（重试由 scheduler 统一处理）
         if base_url:
-            self.client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+            self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
         else:
-            self.client = AsyncOpenAI(api_key=api_key)
+            self.client = AsyncOpenAI(api_key=api_key, max_retries=0)
+
+        self.scheduler = LLMScheduler(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "0")),
+            deadline=float(os.getenv("LLM_DEADLINE", "30")),
+            retries=int(os.getenv("LLM_RETRIES", "3")),
+        )
+
+        # 模型分级
+        self.tiering = os.getenv("LLM_TIERING", "false").lower() == "true"
+        self.simple_rank = int(os.getenv("LLM_SIMPLE_RANK", "3000"))
+        self.rank_of = rank_of if rank_of is not None else _dictionary_rank
+        self.tier_models = {TIER_FAST: self.fast_model, TIER_FULL: self.model}
+
+        self.cache = cache if cache is not None else self._default_cache()
+        # prompt 模板指纹：模板或 PROMPT_VERSION 变化后旧缓存不再命中
+        self.prompt_hashes = {
+            tier: _short_hash(
+                PROMPT_VERSION + SYSTEM_PROMPT
+                + self._build_prompt("{word}", None, trimmed=tier == TIER_FAST)
+            )
+            for tier in (TIER_FAST, TIER_FULL)
+        }
+        self.prompt_hash = self.prompt_hashes[TIER_FULL]
+
+        # 相同 key 的并发请求共享一次 API 调用
+        self._inflight = SingleFlight()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.api_calls = 0
+        self.api_errors = 0
+        self._api_time = 0.0
+        self.stream_calls = 0
+        self._first_field_time = 0.0
+        self.tokens_used = 0
+        self.tier_calls = {TIER_FAST: 0, TIER_FULL: 0}
+
+    @staticmethod
+    def _default_cache() -> TieredCache:
+        ttl = float(os.getenv("LLM_CACHE_TTL", str(90 * 24 * 3600)))
+        memory = LRUCache(maxsize=int(os.getenv("LLM_CACHE_SIZE", "2000")), ttl=ttl)
+
+        persistent = None
+        if os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true":
+            persistent = PersistentCache(
+                os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl=ttl,
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "200000")),
+            )
+        return TieredCache(memory, persistent)
+
+    async def choose_tier(self, word: str) -> str:
+        """
+        启用分级时，常用的单个单词走 fast 档，其余走 full 档
+
+        Raises:
+            BackpressureError / ExecutorTimeoutError: 词频查询失败
+        """
+        normalized = ' '.join(word.split()).lower()
+        if (
+            self.tiering
+            and ' ' not in normalized
+            and await self.rank_of(normalized) <= self.simple_rank
+        ):
+            return TIER_FAST
+        return TIER_FULL
+
+    def _cache_key(self, word: str, basic_definition: Optional[str], tier: str) -> str:
+        """缓存 key：(模型, prompt 指纹, 标准化单词, 参考释义指纹)"""
+        normalized = ' '.join(word.split()).lower()
+        definition_hash = _short_hash(basic_definition) if basic_definition else "-"
+        return (
+            f"{self.tier_models[tier]}|{self.prompt_hashes[tier]}|"
+            f"{normalized}|{definition_hash}"
+        )
+
+    def _estimate_tokens(self, messages: List[dict], tier: str) -> int:
+        """粗略预估 token 数：中英混合 prompt 约 2 个字符一个 token"""
+        prompt_chars = sum(len(message["content"]) for message in messages)
+        return prompt_chars // 2 + ESTIMATED_OUTPUT_TOKENS[tier]
+
+    def get_stats(self) -> dict:
+        """解释缓存与 API 调用统计"""
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model,
+            "fast_model": self.fast_model,
+            "tiering": self.tiering,
+            "simple_rank": self.simple_rank,
+            "tier_calls": dict(self.tier_calls),
+            "prompt_version": PROMPT_VERSION,
+            "prompt_hashes": dict(self.prompt_hashes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "api_calls": self.api_calls,
+            "api_errors": self.api_errors,
+            "tokens_used": self.tokens_used,
+            "avg_api_ms": (
+                round(self._api_time / self.api_calls * 1000, 1)
+                if self.api_calls else 0.0
+            ),
+            "stream_calls": self.stream_calls,
+            "avg_first_field_ms": (
+                round(self._first_field_time / self.stream_calls * 1000, 1)
+                if self.stream_calls else 0.0
+            ),
+            "scheduler": self.scheduler.stats(),
+            "coalescing": self._inflight.stats(),
+            "cache": self.cache.stats(),
+        }
 
     async def explain_word(
         self,
@@ -41,6 +219,10 @@ class LLMService:
         """
         使用 LLM 生成详细的单词解释
 
+        结果按 (模型, prompt 指纹, 单词, 参考释义) 缓存，命中时不调用 API；
+        未命中时相同 key 的并发请求共享一次 API 调用（发起请求的客户端断开
+        不影响其他等待者，所有等待者都断开才取消调用）。
+
         Args:
             word: 要解释的英文单词
             basic_definition: 基础释义（来自本地词典），可选
@@ -48,30 +230,62 @@ class LLMService:
         Returns:
             LLMExplanation: 详细的单词解释
         """
-        # 构建 prompt
-        prompt = self._build_prompt(word, basic_definition)
+        tier = await self.choose_tier(word)
+        key = self._cache_key(word, basic_definition, tier)
+        cached = await self.cache.aget_many([key])
+        if key in cached:
+            self.hits += 1
+            explanation = LLMExplanation.model_validate_json(cached[key])
+            return explanation.model_copy(update={"word": word})
+        self.misses += 1
+
+        explanation = await self._inflight.do(
+            key, lambda: self._generate_and_store(key, word, basic_definition, tier)
+        )
+        return explanation.model_copy(update={"word": word})
+
+    async def is_cached(self, word: str, basic_definition: Optional[str] = None) -> bool:
+        """解释是否已在缓存中"""
+        key = self._cache_key(word, basic_definition, await self.choose_tier(word))
+        return key in await self.cache.aget_many([key])
+
+    async def _generate_and_store(
+        self, key: str, word: str, basic_definition: Optional[str], tier: str
+    ) -> LLMExplanation:
+        """生成解释并写入缓存（在共享任务中执行）"""
+        explanation = await self._generate(word, basic_definition, tier)
+        await self.cache.aset_many([(key, explanation.model_dump_json())])
+        return explanation
+
+    async def _generate(
+        self, word: str, basic_definition: Optional[str], tier: str
+    ) -> LLMExplanation:
+        """
+        经 scheduler 调用 OpenAI API 生成解释
 
+        Raises:
+            LLMDeadlineError: 超过时限
+            LLMBudgetError: scheduler 的请求次数已用尽
+            ValueError: 调用或解析失败
+        """
+        messages = self._build_messages(word, basic_definition, tier)
+        started = time.perf_counter()
         try:
             # 调用 OpenAI API
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a professional English teacher and linguist. "
-                            "Provide detailed, educational explanations of English words "
-                            "in Chinese. Format your response as valid JSON."
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                response_format={"type": "json_object"}
+            self.api_calls += 1
+            self.tier_calls[tier] += 1
+            response = await self.scheduler.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.tier_models[tier],
+                    messages=messages,
+                    temperature=0.7,
+                    response_format={"type": "json_object"}
+                ),
+                estimated_tokens=self._estimate_tokens(messages, tier),
             )
+            usage = getattr(response, "usage", None)
+            if usage is not None and usage.total_tokens:
+                self.tokens_used += usage.total_tokens
 
             # 解析响应
             content = response.choices[0].message.content
@@ -83,39 +297,157 @@ class LLMService:
             # 转换为 LLMExplanation 模型
             return self._parse_response(word, data)
 
+        except LLMDeadlineError:
+            self.api_errors += 1
+            raise
+
+        except LLMBudgetError:
+            raise
+
         except Exception as e:
+            self.api_errors += 1
             print(f"Error calling OpenAI API: {e}")
             raise ValueError(f"Failed to generate explanation: {str(e)}")
 
-    def _build_prompt(self, word: str, basic_definition: Optional[str]) -> str:
-        """构建发送给 LLM 的 prompt"""
+        finally:
+            self._api_time += time.perf_counter() - started
+
+    async def stream_explanation(
+        self,
+        word: str,
+        basic_definition: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        流式生成单词解释
+
+        使用 stream=True 调用 API，增量解析返回的 JSON，每个字段完整后
+        立即产出 ("field", (字段名, 值))；全部结束后产出
+        ("done", LLMExplanation) 并写入缓存。缓存命中时直接依次产出所有字段。
+
+        Raises:
+            LLMDeadlineError: 超过时限（建立流之前）
+            ValueError: API 调用或解析失败
+        """
+        tier = await self.choose_tier(word)
+        key = self._cache_key(word, basic_definition, tier)
+        cached = await self.cache.aget_many([key])
+        if key in cached:
+            self.hits += 1
+            explanation = LLMExplanation.model_validate_json(cached[key])
+            explanation = explanation.model_copy(update={"word": word})
+            for name, value in explanation.model_dump(exclude={"word"}).items():
+                yield "field", (name, value)
+            yield "done", explanation
+            return
+        self.misses += 1
+
+        started = time.perf_counter()
+        first_field = None
+        parser = IncrementalJSONParser()
+        messages = self._build_messages(word, basic_definition, tier)
+        try:
+            self.api_calls += 1
+            self.stream_calls += 1
+            self.tier_calls[tier] += 1
+            # scheduler 负责排队、限流、重试，直到流建立
+            stream = await self.scheduler.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.tier_models[tier],
+                    messages=messages,
+                    temperature=0.7,
+                    response_format={"type": "json_object"},
+                    stream=True,
+                ),
+                estimated_tokens=self._estimate_tokens(messages, tier),
+            )
+            # 客户端断开时关闭上游连接，不再继续生成
+            async with stream:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    for field in parser.feed(delta):
+                        if first_field is None:
+                            first_field = time.perf_counter() - started
+                            self._first_field_time += first_field
+                        yield "field", field
+
+            if not parser.buffer:
+                raise ValueError("Empty response from OpenAI API")
+            explanation = self._parse_response(word, json.loads(parser.buffer))
+
+        except LLMDeadlineError:
+            self.api_errors += 1
+            raise
+
+        except LLMBudgetError:
+            raise
+
+        except Exception as e:
+            self.api_errors += 1
+            print(f"Error streaming from OpenAI API: {e}")
+            raise ValueError(f"Failed to generate explanation: {str(e)}")
+
+        finally:
+            self._api_time += time.perf_counter() - started
+
+        await self.cache.aset_many([(key, explanation.model_dump_json())])
+        yield "done", explanation
+
+    def _build_messages(
+        self, word: str, basic_definition: Optional[str], tier: str = TIER_FULL
+    ) -> List[dict]:
+        """构建 chat messages"""
+        return [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": self._build_prompt(
+                    word, basic_definition, trimmed=tier == TIER_FAST
+                )
+            }
+        ]
+
+    def _build_prompt(
+        self, word: str, basic_definition: Optional[str], trimmed: bool = False
+    ) -> str:
+        """
+        构建发送给 LLM 的 prompt
+
+        trimmed=True 时为常用词的精简版：去掉词源、记忆技巧、相关词，例句减为 2 个
+        """
+        optional_fields = "" if trimmed else """
+  "etymology": "词源（单词的来源和演变，可选）",
+  "memory_tips": "记忆技巧（帮助记忆的方法，可选）","""
+        example_count = 2 if trimmed else 3
+        examples = ",\n".join(
+            f"""    {{
+      "sentence": "英文例句{i}",
+      "translation": "中文翻译{i}"
+    }}"""
+            for i in range(1, example_count + 1)
+        )
+        related = "" if trimmed else """
+  "related_words": ["相关词1", "相关词2", "..."],"""
+
         prompt = f"""请详细解释英文单词 "{word}"，并以 JSON 格式返回以下信息：
 
 {{
   "basic_translation": "简明中文翻译（一句话）",
   "detailed_explanation": "详细解释（2-3句话，说明含义、用法场景）",
-  "pronunciation": "音标（如果知道的话，使用 IPA 格式）",
-  "etymology": "词源（单词的来源和演变，可选）",
-  "memory_tips": "记忆技巧（帮助记忆的方法，可选）",
+  "pronunciation": "音标（如果知道的话，使用 IPA 格式）",{optional_fields}
   "usage_notes": "用法说明（常见搭配、注意事项等）",
   "common_collocations": ["常见搭配1", "常见搭配2", "..."],
   "examples": [
-    {{
-      "sentence": "英文例句1",
-      "translation": "中文翻译1"
-    }},
-    {{
-      "sentence": "英文例句2",
-      "translation": "中文翻译2"
-    }},
-    {{
-      "sentence": "英文例句3",
-      "translation": "中文翻译3"
-    }}
+{examples}
   ],
   "synonyms": ["近义词1", "近义词2", "..."],
-  "antonyms": ["反义词1", "反义词2", "..."],
-  "related_words": ["相关词1", "相关词2", "..."],
+  "antonyms": ["反义词1", "反义词2", "..."],{related}
   "difficulty_level": "beginner/intermediate/advanced",
   "frequency": "common/uncommon/rare"
 }}
@@ -125,7 +457,16 @@ class LLMService:
         if basic_definition:
             prompt += f"\n参考释义：{basic_definition}\n"
 
-        prompt += """
+        if trimmed:
+            prompt += """
+要求：
+1. 所有解释和翻译使用简体中文
+2. 例句要实用、地道
+3. 提供 2 个例句
+4. 返回合法的 JSON 格式
+"""
+        else:
+            prompt += """
 要求：
 1. 所有解释和翻译使用简体中文
 2. 例句要实用、地道，覆盖不同用法
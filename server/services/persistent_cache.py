@@ -0,0 +1,327 @@
+"""
+持久化缓存
+
+- PersistentCache: 基于 SQLite（WAL 模式）的 key-value 缓存，支持 TTL、
+  条目数上限（超出时淘汰最早写入的条目）、统计和 JSONL 导入导出
+- TieredCache: 进程内 LRU（services.cache.LRUCache）+ PersistentCache
+  两级缓存，服务重启后无需从网络重新预热；异步接口的 SQLite 读写在
+  专用的有界线程池中执行，不与预热、建索引等任务争用默认线程池
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import LRUCache
+from .concurrency import BackpressureError, BoundedExecutor, ExecutorTimeoutError
+
+
+def read_dump(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    读取 PersistentCache.dump 导出的 JSONL，逐条返回 (key, value)
+
+    每行格式: {"key": "...", "value": "..."}，空行忽略
+
+    Raises:
+        ValueError: 某一行不是该格式
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+                key, value = item["key"], item["value"]
+            except (ValueError, TypeError, KeyError):
+                raise ValueError(f'{path}:{lineno}: expected {{"key": ..., "value": ...}}')
+            if not isinstance(key, str) or not isinstance(value, str):
+                raise ValueError(f"{path}:{lineno}: key and value must be strings")
+            yield key, value
+
+
+class PersistentCache:
+    """SQLite key-value 缓存（值为字符串）"""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = None,
+        max_entries: int = 500000,
+        evict_interval: int = 1000,
+    ):
+        """
+        Args:
+            path: SQLite 文件路径
+            ttl: 默认有效期，秒（None 表示永不过期）
+            max_entries: 条目数上限
+            evict_interval: 每写入多少条检查一次是否需要淘汰
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evict_interval = evict_interval
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)"
+        )
+        self._conn.commit()
+
+        self._writes_since_evict = 0
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中或已过期返回 None"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """批量读取，返回命中的 {key: value}"""
+        found: Dict[str, str] = {}
+        if not keys:
+            return found
+
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM cache WHERE key IN ({','.join('?' * len(chunk))}) "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    (*chunk, now),
+                ).fetchall()
+                found.update(rows)
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        """写入缓存"""
+        self.set_many([(key, value)], ttl)
+
+    def set_many(self, items: Iterable[Tuple[str, str]], ttl: Optional[float] = None):
+        """批量写入（一个事务）"""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        rows = [(key, value, now, expires_at) for key, value in items]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._writes_since_evict += len(rows)
+            if self._writes_since_evict >= self.evict_interval:
+                self._writes_since_evict = 0
+                self._evict()
+
+    def delete(self, key: str):
+        """删除缓存条目"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self):
+        """删除过期条目；超过上限时删除最早写入的条目（需持有锁）"""
+        cursor = self._conn.execute(
+            "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),),
+        )
+        removed = cursor.rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY created_at LIMIT ?)",
+                (overflow,),
+            )
+            removed += cursor.rowcount
+        self._conn.commit()
+        self.evictions += max(removed, 0)
+
+    def evict(self):
+        """立即执行一次淘汰"""
+        with self._lock:
+            self._evict()
+
+    def dump(self, path: str) -> int:
+        """导出所有未过期条目为 JSONL（格式见 read_dump），返回条目数"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM cache WHERE expires_at IS NULL OR expires_at > ?",
+                (time.time(),),
+            ).fetchall()
+        with open(path, "w", encoding="utf-8") as f:
+            for key, value in rows:
+                f.write(json.dumps({"key": key, "value": value}, ensure_ascii=False))
+                f.write("\n")
+        return len(rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, float]:
+        """缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+class TieredCache:
+    """进程内 LRU + SQLite 两级缓存"""
+
+    def __init__(
+        self,
+        memory: LRUCache,
+        persistent: Optional[PersistentCache],
+        io_workers: int = 1,
+        io_max_pending: int = 256,
+    ):
+        """
+        Args:
+            memory: 内存层
+            persistent: SQLite 层（None 表示只用内存）
+            io_workers: SQLite 读写线程数（PersistentCache 只有一个连接，
+                        多开线程只会在锁上排队）
+            io_max_pending: 排队 + 执行中的 SQLite 读写任务上限，
+                            超出时读按未命中处理、写只写内存
+        """
+        self.memory = memory
+        self.persistent = persistent
+        self.io_executor: Optional[BoundedExecutor] = None
+        if persistent is not None:
+            self.io_executor = BoundedExecutor(
+                name="cache-io", max_workers=io_workers, max_pending=io_max_pending
+            )
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """同步批量读取：先查内存，未命中再查 SQLite 并回填内存"""
+        found: Dict[str, str] = {}
+        misses: List[str] = []
+        for key in keys:
+            value = self.memory.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                misses.append(key)
+
+        if misses and self.persistent is not None:
+            stored = self.persistent.get_many(misses)
+            for key, value in stored.items():
+                self.memory.set(key, value)
+            found.update(stored)
+        return found
+
+    def set_many(self, items: List[Tuple[str, str]], ttl: Optional[float] = None):
+        """同步批量写入两级缓存"""
+        for key, value in items:
+            self.memory.set(key, value)
+        if self.persistent is not None:
+            self.persistent.set_many(items, ttl)
+
+    async def aget_many(self, keys: List[str]) -> Dict[str, str]:
+        """异步批量读取：内存层在事件循环中读取，SQLite 层在专用线程池中读取"""
+        found: Dict[str, str] = {}
+        misses: List[str] = []
+        for key in keys:
+            value = self.memory.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                misses.append(key)
+
+        if misses and self.persistent is not None:
+            try:
+                stored = await self.io_executor.run(self.persistent.get_many, misses)
+            except (BackpressureError, ExecutorTimeoutError) as e:
+                print(f"Persistent cache read skipped: {e}")
+                return found
+            for key, value in stored.items():
+                self.memory.set(key, value)
+            found.update(stored)
+        return found
+
+    async def aset_many(
+        self, items: List[Tuple[str, str]], ttl: Optional[float] = None
+    ):
+        """异步批量写入：SQLite 层在专用线程池中写入"""
+        for key, value in items:
+            self.memory.set(key, value)
+        if items and self.persistent is not None:
+            try:
+                await self.io_executor.run(self.persistent.set_many, items, ttl)
+            except (BackpressureError, ExecutorTimeoutError) as e:
+                print(f"Persistent cache write skipped: {e}")
+
+    def seed_from_dump(self, path: str, batch_size: int = 1000) -> int:
+        """
+        从 PersistentCache.dump 导出的 JSONL 预热两级缓存（同步执行）
+
+        Returns:
+            int: 导入的条目数
+
+        Raises:
+            ValueError: 文件格式不正确（出错行之前的批次已经写入）
+        """
+        count = 0
+        batch: List[Tuple[str, str]] = []
+        for item in read_dump(path):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                self.set_many(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.set_many(batch)
+            count += len(batch)
+        return count
+
+    def stats(self) -> Dict[str, object]:
+        """两级缓存统计"""
+        return {
+            "memory": self.memory.stats(),
+            "persistent": self.persistent.stats() if self.persistent is not None else None,
+            "io_executor": self.io_executor.stats() if self.io_executor is not None else None,
+        }
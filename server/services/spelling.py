@@ -0,0 +1,195 @@
+"""
+拼写纠错（"did you mean"）
+
+SymSpell 风格的删除索引：对每个词头生成最多 max_distance 次删除后的
+所有变体（只取前 prefix_length 个字符，控制索引体积），查询时对输入
+做同样的删除，命中同一变体的词头即为候选，再用编辑距离精确校验，
+按（编辑距离, 词频排名）排序。
+
+只收录有词频排名的常用词（默认前 50000 个），查询有固定的时间预算，
+超时返回已找到的候选。
+"""
+
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    受限 Damerau-Levenshtein 距离（OSA，支持相邻字符交换）
+
+    距离超过 max_distance 时提前返回 max_distance + 1
+    """
+    if a == b:
+        return 0
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > max_distance:
+        return max_distance + 1
+
+    prev_prev: Optional[List[int]] = None
+    prev = list(range(len_b + 1))
+    for i in range(1, len_a + 1):
+        current = [i] + [0] * len_b
+        row_min = i
+        ca = a[i - 1]
+        for j in range(1, len_b + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            value = min(prev[j] + 1, current[j - 1] + 1, prev[j - 1] + cost)
+            if (
+                prev_prev is not None and j > 1
+                and ca == b[j - 2] and a[i - 2] == b[j - 1]
+            ):
+                value = min(value, prev_prev[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, current
+
+    return prev[len_b] if prev[len_b] <= max_distance else max_distance + 1
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """生成最多 max_distance 次删除后的所有变体（包含原词）"""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                next_frontier.add(item[:i] + item[i + 1:])
+        next_frontier -= result
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+class SpellingIndex:
+    """SymSpell 删除索引"""
+
+    def __init__(
+        self,
+        words: Iterable[Tuple[str, int]],
+        max_distance: int = 2,
+        prefix_length: int = 7,
+    ):
+        """
+        Args:
+            words: (小写单词, 词频排名) 序列
+            max_distance: 最大编辑距离
+            prefix_length: 只对单词前 N 个字符建立删除索引
+        """
+        started = time.perf_counter()
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+
+        self.words: List[str] = []
+        self.ranks: List[int] = []
+        # 删除变体 -> 单词下标（只有一个时存 int，节省内存）
+        self._deletes: Dict[str, Union[int, List[int]]] = {}
+
+        for word, rank in words:
+            idx = len(self.words)
+            self.words.append(word)
+            self.ranks.append(rank)
+            for variant in _deletes(word[:prefix_length], max_distance):
+                existing = self._deletes.get(variant)
+                if existing is None:
+                    self._deletes[variant] = idx
+                elif isinstance(existing, int):
+                    self._deletes[variant] = [existing, idx]
+                else:
+                    existing.append(idx)
+
+        self.build_seconds = time.perf_counter() - started
+        self.approx_bytes = self._estimate_size()
+
+    def _estimate_size(self) -> int:
+        """粗略估算索引占用的内存（字典 + key + 下标列表 + 词表）"""
+        size = sys.getsizeof(self._deletes) + sys.getsizeof(self.words)
+        size += sys.getsizeof(self.ranks)
+        for key, value in self._deletes.items():
+            size += sys.getsizeof(key)
+            if isinstance(value, list):
+                size += sys.getsizeof(value)
+        for word in self.words:
+            size += sys.getsizeof(word)
+        return size
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def lookup(
+        self,
+        query: str,
+        limit: int = 5,
+        max_distance: Optional[int] = None,
+        budget_ms: float = 20.0,
+    ) -> List[str]:
+        """
+        查找拼写相近的单词
+
+        Args:
+            query: 查询词
+            limit: 返回数量
+            max_distance: 最大编辑距离（不超过构建时的值）
+            budget_ms: 时间预算（毫秒），超时返回已找到的候选
+
+        Returns:
+            List[str]: 按（编辑距离, 词频）排序的候选词
+        """
+        query = query.lower().strip()
+        if not query:
+            return []
+
+        max_distance = min(
+            self.max_distance if max_distance is None else max_distance,
+            self.max_distance,
+        )
+        deadline = time.perf_counter() + budget_ms / 1000
+
+        seen: Set[int] = set()
+        found: List[Tuple[int, int, str]] = []
+        checked = 0
+
+        # 按删除次数由少到多查找，距离近的候选先被发现
+        for variant in sorted(
+            _deletes(query[:self.prefix_length], max_distance),
+            key=len, reverse=True,
+        ):
+            hit = self._deletes.get(variant)
+            if hit is None:
+                continue
+            for idx in ([hit] if isinstance(hit, int) else hit):
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                word = self.words[idx]
+                distance = edit_distance(query, word, max_distance)
+                if distance <= max_distance and word != query:
+                    found.append((distance, self.ranks[idx], word))
+
+                checked += 1
+                if checked % 64 == 0 and time.perf_counter() > deadline:
+                    break
+            else:
+                continue
+            break
+
+        found.sort()
+        return [word for _, _, word in found[:limit]]
+
+    def stats(self) -> Dict[str, float]:
+        """索引统计（构建耗时、体积）"""
+        return {
+            "words": len(self.words),
+            "delete_keys": len(self._deletes),
+            "max_distance": self.max_distance,
+            "prefix_length": self.prefix_length,
+            "build_ms": round(self.build_seconds * 1000, 1),
+            "approx_mb": round(self.approx_bytes / 1024 / 1024, 1),
+        }
@@ -0,0 +1,152 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import quote
+
+from .concurrency import ExecutorTimeoutError
+
+
+class SQLitePool:
+    """
+    只读 SQLite 连接池
+
+    词典数据库在运行期间不会被修改，因此使用
+    `file:...?mode=ro&immutable=1` URI 打开，SQLite 可以跳过文件锁和
+    变更检测。连接在进程生命周期内复用，避免每次查询都重新打开文件、
+    解析 schema 以及丢失页缓存。
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        size: Optional[int] = None,
+        mmap_size: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        timeout: float = 5.0,
+    ):
+        """
+        Args:
+            db_path: 数据库文件路径
+            size: 连接池大小（默认读取 DICT_POOL_SIZE，否则为 4）
+            mmap_size: 每个连接的 mmap 大小，字节（默认 DICT_MMAP_SIZE，256MB）
+            cache_size: 每个连接的页缓存，KB（默认 DICT_CACHE_KB，16MB）
+            timeout: 等待空闲连接的超时时间，秒（超时抛出 ExecutorTimeoutError，
+                     API 层与查询线程池超时一样返回 503）
+        """
+        self.db_path = db_path
+        self.size = size or int(os.getenv("DICT_POOL_SIZE", "4"))
+        self.mmap_size = (
+            mmap_size if mmap_size is not None
+            else int(os.getenv("DICT_MMAP_SIZE", str(256 * 1024 * 1024)))
+        )
+        self.cache_size = (
+            cache_size if cache_size is not None
+            else int(os.getenv("DICT_CACHE_KB", str(16 * 1024)))
+        )
+        self.timeout = timeout
+
+        self._uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro&immutable=1"
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+        # 统计信息
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        """创建一个新的只读连接并设置 pragma"""
+        # check_same_thread=False: 连接会在不同的工作线程之间借还，
+        # 但同一时刻只会被一个线程持有
+        conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        # 负数表示以 KB 为单位
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_size)}")
+        conn.execute("PRAGMA query_only = 1")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise RuntimeError("SQLite pool is closed")
+
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._checkouts += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        # 池未满时直接新建连接
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+                self._checkouts += 1
+        if can_create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        # 池已满，等待其他线程归还
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise ExecutorTimeoutError(
+                f"No idle SQLite connection after {self.timeout}s "
+                f"(pool size {self.size})"
+            )
+        with self._lock:
+            self._checkouts += 1
+            self._waits += 1
+            self._wait_time += time.perf_counter() - start
+        return conn
+
+    def _release(self, conn: sqlite3.Connection):
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """借出一个连接，使用完毕后自动归还"""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """关闭所有空闲连接（借出中的连接在归还时关闭）"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def stats(self) -> Dict[str, float]:
+        """连接池统计"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "avg_wait_ms": (
+                    round(self._wait_time / self._waits * 1000, 3)
+                    if self._waits else 0.0
+                ),
+            }
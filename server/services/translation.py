@@ -1,15 +1,345 @@
+import asyncio
+import os
 import re
-from deep_translator import GoogleTranslator
-from typing import List
-from models.word import Meaning, Definition
+import time
+from typing import Dict, List, Optional, Tuple
+from models.word import Meaning, Definition, WordDefinition
+from .cache import LRUCache
+from .concurrency import (
+    BoundedExecutor, CircuitBreaker, CircuitOpenError, SingleFlight, TokenBucket,
+)
+from .persistent_cache import PersistentCache, TieredCache
+from .translation_providers import (
+    TranslationProvider, GoogleProvider, OfflineProvider, FakeProvider,
+)
+
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "translation_cache.db"
+)
+
+DEFAULT_PHRASE_TABLE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "phrase_table.tsv"
+)
+
+# translate_definition 的翻译状态
+STATUS_TRANSLATED = "translated"  # 全部翻译成功（或来自缓存）
+STATUS_DEGRADED = "degraded"  # 部分内容使用 ECDICT 自带中文或原文
+STATUS_MISSING = "missing"  # 没有任何在线翻译结果
+
+
+def chunk_texts(
+    texts: List[str], max_chars: int, delimiter: str = "\n"
+) -> List[List[str]]:
+    """按字符上限把文本分组，每组用 delimiter 拼接后不超过 max_chars"""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for text in texts:
+        extra = len(text) + (len(delimiter) if current else 0)
+        if current and size + extra > max_chars:
+            chunks.append(current)
+            current, size = [], 0
+            extra = len(text)
+        current.append(text)
+        size += extra
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ProviderLane:
+    """
+    单个翻译提供方的出站调度：并发上限 + 令牌桶限流 + 专用线程池 + 熔断，
+    并记录实测延迟（指数滑动平均）用于路由
+    """
+
+    def __init__(self, provider: TranslationProvider):
+        self.provider = provider
+        self.name = provider.name
+
+        self._semaphore = asyncio.Semaphore(provider.max_concurrency)
+        self.rate_limiter = TokenBucket(
+            rate=provider.rate_per_sec, capacity=provider.burst
+        )
+        self.executor = BoundedExecutor(
+            f"translation-{provider.name}",
+            max_workers=provider.max_concurrency,
+            max_pending=int(os.getenv("TRANSLATION_MAX_PENDING", "256")),
+            timeout=float(os.getenv("TRANSLATION_TIMEOUT", "10")),
+        )
+        # 提供方持续失败或变慢时熔断，路由时跳过
+        self.breaker = CircuitBreaker(
+            f"translation-{provider.name}",
+            failure_threshold=float(os.getenv("TRANSLATION_BREAKER_FAILURE_RATE", "0.5")),
+            slow_threshold=float(os.getenv("TRANSLATION_BREAKER_SLOW_RATE", "0.8")),
+            slow_call_seconds=float(os.getenv("TRANSLATION_BREAKER_SLOW_SECONDS", "2.0")),
+            reset_timeout=float(os.getenv("TRANSLATION_BREAKER_RESET", "30")),
+        )
+
+        self.latency = provider.latency_hint
+        self.requests = 0
+        self.texts = 0
+        self.answered = 0
+
+    async def run(self, func, *args):
+        """
+        经过熔断、并发上限和限流后，在专用线程池中执行一次请求
+
+        func 为协程函数时直接在事件循环中执行（时限与线程池相同）
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+        """
+        self.breaker.check()
+        started = None
+        try:
+            async with self._semaphore:
+                await self.rate_limiter.acquire()
+                started = time.perf_counter()
+                if asyncio.iscoroutinefunction(func):
+                    result = await asyncio.wait_for(func(*args), self.executor.timeout)
+                else:
+                    result = await self.executor.run(func, *args)
+        except BaseException:
+            # 包括被取消（例如调用方的时限）：已发出的请求记为失败，
+            # 还在排队的归还放行名额，保证半开状态的探测不会一直占用
+            if started is None:
+                self.breaker.release()
+            else:
+                self.breaker.record(False, time.perf_counter() - started)
+            raise
+        elapsed = time.perf_counter() - started
+        self.breaker.record(True, elapsed)
+        self.latency = 0.8 * self.latency + 0.2 * elapsed
+        self.requests += 1
+        return result
+
+    def stats(self) -> dict:
+        """提供方统计"""
+        return {
+            "hints": self.provider.hints(),
+            "latency_ms": round(self.latency * 1000, 2),
+            "requests": self.requests,
+            "texts": self.texts,
+            "answered": self.answered,
+            "estimated_cost": round(self.requests * self.provider.cost, 2),
+            "executor": self.executor.stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "breaker": self.breaker.stats(),
+        }
 
 
 class TranslationService:
-    """翻译服务 - 使用 deep-translator (Google Translate)"""
+    """翻译服务 - 离线词典优先，无法回答时使用 deep-translator (Google Translate)"""
+
+    def __init__(
+        self,
+        cache: Optional[TieredCache] = None,
+        providers: Optional[List[TranslationProvider]] = None,
+    ):
+        """
+        Args:
+            cache: 翻译缓存，默认为进程内 LRU + SQLite 两级缓存
+                   （TRANSLATION_CACHE_ENABLED=false 时只使用内存缓存）
+            providers: 翻译提供方，默认由 TRANSLATION_PROVIDERS 决定
+                       （测试时可传入 translation_providers.FakeProvider）
+        """
+        self.cache = cache if cache is not None else self._default_cache()
+        providers = providers if providers is not None else self._default_providers()
+        self.lanes = [ProviderLane(provider) for provider in providers]
+
+        # 相同 (text, src, dest) 的并发翻译共享一个请求
+        self._inflight = SingleFlight()
+
+        # translate_definition 的整体时限（秒），超时的部分走降级结果
+        self.deadline = float(os.getenv("TRANSLATION_DEADLINE", "3.0"))
+        self.deadline_exceeded = 0
+
+    @staticmethod
+    def _default_providers() -> List[TranslationProvider]:
+        """按 TRANSLATION_PROVIDERS（逗号分隔，默认 offline,google）创建提供方"""
+        providers: List[TranslationProvider] = []
+        for name in os.getenv("TRANSLATION_PROVIDERS", "offline,google").split(','):
+            name = name.strip().lower()
+            if name == 'google':
+                # deep-translator uses Google Translate but is more reliable
+                providers.append(GoogleProvider())
+            elif name == 'offline':
+                from .dictionary import get_dictionary_service
+                providers.append(OfflineProvider(
+                    get_dictionary_service(),
+                    os.getenv("TRANSLATION_PHRASE_TABLE", DEFAULT_PHRASE_TABLE),
+                ))
+            elif name == 'fake':
+                providers.append(FakeProvider())
+            elif name:
+                raise ValueError(f"Unknown translation provider: {name}")
+        return providers
+
+    @staticmethod
+    def _default_cache() -> TieredCache:
+        ttl = float(os.getenv("TRANSLATION_CACHE_TTL", str(30 * 24 * 3600)))
+        memory = LRUCache(
+            maxsize=int(os.getenv("TRANSLATION_CACHE_SIZE", "10000")), ttl=ttl
+        )
+
+        persistent = None
+        if os.getenv("TRANSLATION_CACHE_ENABLED", "true").lower() == "true":
+            persistent = PersistentCache(
+                os.getenv("TRANSLATION_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl=ttl,
+                max_entries=int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "500000")),
+            )
+        return TieredCache(memory, persistent)
+
+    @staticmethod
+    def _cache_key(text: str, src: str, dest: str) -> str:
+        """缓存 key：(源语言, 目标语言, 标准化文本)"""
+        return f"{src}|{dest}|{' '.join(text.split())}"
+
+    def seed_cache(self, path: str) -> int:
+        """
+        从 JSONL 导出文件预热翻译缓存（同步执行，建议在后台线程调用）
+
+        文件由 PersistentCache.dump 导出，每行 {"key": "...", "value": "..."}，
+        key 的格式见 _cache_key。读取失败时只打印错误，不抛出异常。
+
+        Returns:
+            int: 导入的条目数
+        """
+        try:
+            count = self.cache.seed_from_dump(path)
+        except (OSError, ValueError) as e:
+            print(f"Translation cache seeding from {path} failed: {e}")
+            return 0
+        print(f"Translation cache seeded with {count} entries from {path}")
+        return count
+
+    @staticmethod
+    def _translate_joined(
+        provider: TranslationProvider, texts: List[str], source: str, target: str
+    ) -> Optional[List[Optional[str]]]:
+        """
+        同步翻译一组文本：用提供方的分隔符拼接成一个请求，再拆回
+
+        拆分后数量对不上时（译文合并或拆分了行）返回 None，由调用方逐条重试。
+        """
+        delimiter = provider.batch_delimiter
+        # 文本内部的换行会与分隔符冲突，先折叠空白
+        texts = [' '.join(text.split()) for text in texts]
+
+        result = provider.translate(delimiter.join(texts), source, target)
+        if len(texts) == 1:
+            return [result.strip() if result else None]
+        parts = result.split(delimiter) if result else []
+        if len(parts) != len(texts):
+            print(
+                f"Batch translation split mismatch "
+                f"({len(parts)} != {len(texts)}), retrying one by one"
+            )
+            return None
+        return [part.strip() or None for part in parts]
+
+    async def _translate_group(
+        self, lane: ProviderLane, texts: List[str], source: str, target: str
+    ) -> List[Optional[str]]:
+        """在一个提供方上翻译一组文本（一个请求），失败或无法回答的条目为 None"""
+        provider = lane.provider
+        try:
+            if provider.batch_delimiter is None:
+                return await lane.run(provider.translate_batch, texts, source, target)
+            results = await lane.run(
+                self._translate_joined, provider, texts, source, target
+            )
+        except CircuitOpenError:
+            return [None] * len(texts)
+        except Exception as e:
+            print(f"Batch translation error ({lane.name}): {e}")
+            return [None] * len(texts)
+        if results is not None:
+            return results
+
+        async def single(text: str) -> Optional[str]:
+            try:
+                return (await lane.run(
+                    self._translate_joined, provider, [text], source, target
+                ))[0]
+            except Exception as e:
+                print(f"Error translating '{text}' ({lane.name}): {e}")
+                return None
+
+        return list(await asyncio.gather(*[single(text) for text in texts]))
+
+    async def _translate_on(
+        self, lane: ProviderLane, texts: List[str], source: str, target: str
+    ) -> List[Optional[str]]:
+        """按提供方的批量参数分组，各组并发发送"""
+        provider = lane.provider
+        if provider.batch_delimiter is None:
+            chunks = [texts[i:i + 500] for i in range(0, len(texts), 500)]
+        else:
+            chunks = chunk_texts(texts, provider.max_chars, provider.batch_delimiter)
+        translated = await asyncio.gather(*[
+            self._translate_group(lane, chunk, source, target) for chunk in chunks
+        ])
+        results = [result for chunk in translated for result in chunk]
+        lane.texts += len(texts)
+        lane.answered += sum(1 for result in results if result)
+        return results
+
+    def _route(self, source: str, target: str) -> List[ProviderLane]:
+        """支持该语言对且未熔断的提供方，按实测延迟、成本排序"""
+        lanes = [
+            lane for lane in self.lanes
+            if lane.provider.supports(source, target)
+            and lane.breaker.state != CircuitBreaker.OPEN
+        ]
+        return sorted(lanes, key=lambda lane: (lane.latency, lane.provider.cost))
+
+    async def _fetch(
+        self, pending: Dict[str, str], source: str, target: str
+    ) -> Dict[str, Optional[str]]:
+        """
+        翻译未命中缓存的文本 {key: text}，返回 {key: 译文或 None}
 
-    def __init__(self):
-        # deep-translator uses Google Translate but is more reliable
-        pass
+        已有相同请求在进行中的 key 直接等待其结果；其余 key 从最快的
+        提供方开始尝试，无法回答的交给下一个。可缓存的结果写入缓存。
+        """
+        owned, waiting = self._inflight.claim(pending.keys())
+        results: Dict[str, Optional[str]] = {}
+        try:
+            remaining = owned
+            for lane in self._route(source, target):
+                if not remaining:
+                    break
+                answers = await self._translate_on(
+                    lane, [pending[key] for key in remaining], source, target
+                )
+                answered = [
+                    (key, answer) for key, answer in zip(remaining, answers) if answer
+                ]
+                results.update(answered)
+                if lane.provider.cacheable:
+                    await self.cache.aset_many(answered)
+                remaining = [key for key in remaining if not results.get(key)]
+        finally:
+            # 无论成功、失败还是被取消，都要唤醒等待者
+            for key in owned:
+                self._inflight.resolve(key, results.get(key))
+
+        results.update(await self._inflight.wait(waiting))
+        return results
+
+    def get_stats(self) -> dict:
+        """翻译服务统计"""
+        return {
+            "cache": self.cache.stats(),
+            "providers": {lane.name: lane.stats() for lane in self.lanes},
+            "coalescing": self._inflight.stats(),
+            "deadline": self.deadline,
+            "deadline_exceeded": self.deadline_exceeded,
+        }
 
     def detect_language(self, text: str) -> str:
         """
@@ -48,22 +378,44 @@ class TranslationService:
         Returns:
             str: 翻译后的文本
         """
-        import asyncio
+        result = (await self._translate_texts([text], src, dest))[text]
+        # 降级：翻译失败返回原文（不写入缓存）
+        return result or text
+
+    async def _translate_texts(
+        self,
+        texts: List[str],
+        src: str,
+        dest: str,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Optional[str]]:
+        """
+        翻译一组文本，返回 {原文: 译文}，翻译失败或超时为 None
 
-        try:
-            # Convert language codes for deep-translator
-            source = 'auto' if src == 'auto' else self._convert_lang_code(src)
-            target = self._convert_lang_code(dest)
-
-            translator = GoogleTranslator(source=source, target=target)
-            # 在线程池中执行同步翻译，避免阻塞事件循环
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, translator.translate, text)
-            return result
-        except Exception as e:
-            print(f"Translation error: {e}")
-            # 降级：返回原文
-            return text
+        先查缓存，未命中的文本交给出站调度器。超过 deadline 秒时立即返回
+        已有结果，进行中的请求在后台继续完成并写入缓存。
+        """
+        source = self._convert_lang_code(src)
+        target = self._convert_lang_code(dest)
+
+        keys = {text: self._cache_key(text, src, dest) for text in texts}
+        cached = await self.cache.aget_many(list(dict.fromkeys(keys.values())))
+        pending = {key: text for text, key in keys.items() if key not in cached}
+
+        fetched: Dict[str, Optional[str]] = {}
+        if pending:
+            task = asyncio.ensure_future(self._fetch(pending, source, target))
+            try:
+                fetched = await asyncio.wait_for(asyncio.shield(task), deadline)
+            except asyncio.TimeoutError:
+                self.deadline_exceeded += 1
+                print(f"Translation deadline ({deadline}s) exceeded, using fallback")
+                # 后台任务的异常已在 _fetch 中处理，这里只避免未读取的警告
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        return {
+            text: cached.get(key) or fetched.get(key) for text, key in keys.items()
+        }
 
     def _convert_lang_code(self, code: str) -> str:
         """
@@ -88,7 +440,10 @@ class TranslationService:
         self, texts: List[str], src: str = 'en', dest: str = 'zh-CN'
     ) -> List[str]:
         """
-        批量翻译（并发执行以提升性能）
+        批量翻译
+
+        相同文本只翻译一次；未命中缓存的文本按提供方的字符上限分组，
+        每组合并为一个请求，由各提供方的出站调度控制并发和速率。
 
         Args:
             texts: 待翻译文本列表
@@ -98,32 +453,13 @@ class TranslationService:
         Returns:
             List[str]: 翻译后的文本列表
         """
-        import asyncio
-
         if not texts:
             return []
 
         try:
-            source = self._convert_lang_code(src)
-            target = self._convert_lang_code(dest)
-
-            # 并发翻译所有文本
-            async def translate_single(text: str) -> str:
-                try:
-                    translator = GoogleTranslator(source=source, target=target)
-                    # 在线程池中执行同步翻译，避免阻塞
-                    loop = asyncio.get_event_loop()
-                    translated = await loop.run_in_executor(
-                        None, translator.translate, text
-                    )
-                    return translated
-                except Exception as e:
-                    print(f"Error translating '{text}': {e}")
-                    return text  # 保留原文
-
-            # 并发执行所有翻译
-            results = await asyncio.gather(*[translate_single(text) for text in texts])
-            return list(results)
+            results = await self._translate_texts(texts, src, dest)
+            # 翻译失败的保留原文
+            return [results[text] or text for text in texts]
 
         except Exception as e:
             print(f"Batch translation error: {e}")
@@ -190,3 +526,94 @@ class TranslationService:
         except Exception as e:
             print(f"Meaning translation error: {e}")
             return meaning  # 返回原始释义
+
+    async def translate_definition(
+        self,
+        definition: WordDefinition,
+        dest: str = 'zh-CN',
+        deadline: Optional[float] = None,
+    ) -> WordDefinition:
+        """
+        翻译完整词条：词头 + 所有词性下的释义和例句
+
+        所有文本去重后只走一次批量翻译（未命中缓存的部分合并为
+        尽量少的请求），再映射回原结构。已经是目标语言的文本
+        （如 ECDICT 的中文释义）不发送翻译请求。
+
+        降级：超过时限、熔断打开或翻译失败的条目使用 ECDICT 自带的中文
+        （词头用 chinese 字段，释义用已有的中文释义），没有时为 None，
+        translation_status 标明结果是否完整。
+
+        Args:
+            definition: 词典词条
+            dest: 目标语言
+            deadline: 时限（秒），默认为 TRANSLATION_DEADLINE
+
+        Returns:
+            WordDefinition: chinese 为词头译文、释义和例句带翻译的词条
+        """
+        texts = [definition.word]
+        for meaning in definition.meanings:
+            for item in meaning.definitions:
+                texts.append(item.definition)
+                if item.example:
+                    texts.append(item.example)
+
+        translations: Dict[str, Optional[str]] = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            if dest == 'zh-CN' and self.detect_language(text) == dest:
+                translations[text] = text
+            else:
+                pending.append(text)
+
+        if pending:
+            translations.update(await self._translate_texts(
+                pending, 'en', dest,
+                deadline=self.deadline if deadline is None else deadline,
+            ))
+
+        def local_gloss(text: Optional[str]) -> Optional[str]:
+            # ECDICT 自带的中文（仅当确实是中文时）
+            if text and dest == 'zh-CN' and self.detect_language(text) == dest:
+                return text
+            return None
+
+        meanings = [
+            Meaning(
+                part_of_speech=meaning.part_of_speech,
+                definitions=[
+                    Definition(
+                        definition=item.definition,
+                        definition_chinese=(
+                            translations[item.definition]
+                            or local_gloss(item.definition_chinese)
+                        ),
+                        example=item.example,
+                        example_chinese=(
+                            translations[item.example] if item.example else None
+                        ),
+                    )
+                    for item in meaning.definitions
+                ],
+            )
+            for meaning in definition.meanings
+        ]
+
+        translated = sum(1 for text in pending if translations[text])
+        if translated == len(pending):
+            status = STATUS_TRANSLATED
+        elif translated:
+            status = STATUS_DEGRADED
+        else:
+            status = STATUS_MISSING
+
+        return WordDefinition(
+            word=definition.word,
+            phonetic=definition.phonetic,
+            chinese=translations[definition.word] or local_gloss(definition.chinese),
+            meanings=meanings,
+            lemma=definition.lemma,
+            lemma_entry=definition.lemma_entry,
+            translation_status=status,
+        )
@@ -0,0 +1,269 @@
+"""
+翻译服务提供方
+
+TranslationService 按预估延迟从低到高依次尝试各提供方，前一个无法回答
+（返回 None）或熔断中的文本交给下一个。每个提供方通过类属性声明调度参数：
+
+- batch_delimiter: 非 None 时多条文本用该分隔符拼接为一个请求，按
+  max_chars 分组；为 None 时直接调用 translate_batch
+- max_chars: 单个请求的字符上限
+- max_concurrency / rate_per_sec / burst: 并发上限与令牌桶限流（0 表示不限流）
+- cost: 单次请求的相对成本（路由时作为延迟相同时的次序依据，并计入统计）
+- latency_hint: 初始预估延迟（秒），之后使用实测延迟
+- cacheable: 结果是否写入翻译缓存（本地提供方随时可以重新计算，不写入）
+
+translate_batch 也可以是协程函数（例如调用词典服务异步接口的离线提供方），
+此时直接在事件循环中执行，不占用提供方的线程池。
+
+实现:
+- GoogleProvider: deep-translator (Google Translate)
+- OfflineProvider: 离线翻译，基于短语表 + ECDICT 本地词典（单个单词）
+- FakeProvider: 本地假实现，可配置延迟和失败，用于离线测试熔断和降级
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from deep_translator import GoogleTranslator
+
+
+_CJK_RE = re.compile(r'[一-龥]')
+
+# 可以直接查词典的英文：单个单词（词组和短句交给短语表或在线翻译，
+# 避免释义里的短语被当成词头，得到单词释义而不是翻译）
+_LOOKUP_RE = re.compile(r"[a-z][a-z'\-]*")
+
+
+class TranslationProvider:
+    """翻译提供方基类"""
+
+    name = "base"
+    batch_delimiter: Optional[str] = None
+    max_chars = 4500
+    max_concurrency = 4
+    rate_per_sec = 0.0
+    burst = 1.0
+    cost = 0.0
+    latency_hint = 0.1
+    cacheable = True
+
+    def supports(self, source: str, target: str) -> bool:
+        """是否支持该语言对"""
+        return True
+
+    def translate(self, text: str, source: str, target: str) -> Optional[str]:
+        """翻译单条文本，无法回答时返回 None"""
+        raise NotImplementedError
+
+    def translate_batch(
+        self, texts: List[str], source: str, target: str
+    ) -> List[Optional[str]]:
+        """批量翻译（batch_delimiter 为 None 时使用），默认逐条调用 translate"""
+        return [self.translate(text, source, target) for text in texts]
+
+    def hints(self) -> Dict[str, object]:
+        """调度参数（用于统计）"""
+        return {
+            "batch_delimiter": self.batch_delimiter,
+            "max_chars": self.max_chars,
+            "max_concurrency": self.max_concurrency,
+            "rate_per_sec": self.rate_per_sec,
+            "cost": self.cost,
+            "cacheable": self.cacheable,
+        }
+
+
+class GoogleProvider(TranslationProvider):
+    """Google Translate（通过 deep-translator）"""
+
+    name = "google"
+    # Google 会保留换行；单次请求最多 5000 字符，留出余量
+    batch_delimiter = "\n"
+    latency_hint = 0.5
+    cost = 1.0
+
+    def __init__(self):
+        self.max_chars = int(os.getenv("TRANSLATION_MAX_CHUNK_CHARS", "4500"))
+        self.max_concurrency = int(os.getenv("TRANSLATION_MAX_CONCURRENCY", "4"))
+        self.rate_per_sec = float(os.getenv("TRANSLATION_RATE_PER_SEC", "5"))
+        self.burst = float(os.getenv("TRANSLATION_BURST", "10"))
+        # GoogleTranslator 在请求间修改自身参数，不能跨线程共享，按线程复用
+        self._local = threading.local()
+
+    def _get_translator(self, source: str, target: str) -> GoogleTranslator:
+        """当前线程复用的 GoogleTranslator（每个语言对一个）"""
+        translators = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        translator = translators.get((source, target))
+        if translator is None:
+            translator = translators[(source, target)] = GoogleTranslator(
+                source=source, target=target
+            )
+        return translator
+
+    def translate(self, text: str, source: str, target: str) -> Optional[str]:
+        return self._get_translator(source, target).translate(text)
+
+
+class OfflineProvider(TranslationProvider):
+    """
+    离线翻译：短语表 + ECDICT
+
+    - 英 -> 中：短语表，或单个单词直接取词典的中文释义
+    - 中 -> 英：短语表，或预编译词典的中文反查（取前几个单词）
+    句子等无法回答的文本返回 None，由下一个提供方处理。
+
+    通过词典服务的异步接口查询，受词典查询线程池的排队上限和超时约束。
+    """
+
+    name = "offline"
+    max_chars = 100000
+    max_concurrency = 2
+    latency_hint = 0.001
+    cacheable = False
+
+    def __init__(self, dictionary, phrase_table: Optional[str] = None):
+        """
+        Args:
+            dictionary: DictionaryService
+            phrase_table: 短语表路径（TSV，每行 "原文<TAB>译文"，
+                          原文含中文时为中译英，否则为英译中）
+        """
+        self.dictionary = dictionary
+        self.phrases: Dict[Tuple[str, str], str] = {}
+        if phrase_table and os.path.exists(phrase_table):
+            self.load_phrase_table(phrase_table)
+
+    @staticmethod
+    def _direction(text: str, source: str) -> str:
+        if source == 'auto':
+            return 'zh-CN' if _CJK_RE.search(text) else 'en'
+        return source
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return ' '.join(text.split()).lower()
+
+    def load_phrase_table(self, path: str) -> int:
+        """载入短语表，返回条目数"""
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                original, sep, translation = line.rstrip('\n').partition('\t')
+                if not sep or not original.strip() or not translation.strip():
+                    continue
+                direction = 'zh-CN' if _CJK_RE.search(original) else 'en'
+                self.phrases[(direction, self._normalize(original))] = translation.strip()
+                count += 1
+        print(f"Offline phrase table loaded: {count} entries from {path}")
+        return count
+
+    def supports(self, source: str, target: str) -> bool:
+        return (source, target) in (
+            ('en', 'zh-CN'), ('auto', 'zh-CN'), ('zh-CN', 'en'), ('auto', 'en'),
+        )
+
+    async def translate(self, text: str, source: str, target: str) -> Optional[str]:
+        return (await self.translate_batch([text], source, target))[0]
+
+    async def translate_batch(
+        self, texts: List[str], source: str, target: str
+    ) -> List[Optional[str]]:
+        """
+        Raises:
+            BackpressureError: 词典查询队列已满
+            ExecutorTimeoutError: 词典查询超时
+        """
+        results: List[Optional[str]] = [None] * len(texts)
+        lookups: Dict[str, List[int]] = {}
+        reverse: Dict[str, List[int]] = {}
+
+        for i, text in enumerate(texts):
+            direction = self._direction(text, source)
+            key = self._normalize(text)
+            phrase = self.phrases.get((direction, key))
+            if phrase is not None:
+                results[i] = phrase
+            elif direction == 'en' and target == 'zh-CN' and _LOOKUP_RE.fullmatch(key):
+                lookups.setdefault(key, []).append(i)
+            elif direction == 'zh-CN' and target == 'en':
+                reverse.setdefault(key, []).append(i)
+
+        # 英译中的单词一次批量查询
+        if lookups:
+            definitions = await self.dictionary.get_definitions(list(lookups))
+            for indices, entry in zip(lookups.values(), definitions):
+                if entry is not None and entry.chinese:
+                    for i in indices:
+                        results[i] = entry.chinese
+
+        if reverse:
+            # 翻译只用精确匹配的释义，包含查询词的释义不是它的译文
+            found = await asyncio.gather(*[
+                self.dictionary.reverse_lookup(key, 3, partial=False) for key in reverse
+            ])
+            for indices, words in zip(reverse.values(), found):
+                for i in indices:
+                    results[i] = ', '.join(words) if words else None
+        return results
+
+
+class FakeProvider(TranslationProvider):
+    """
+    本地假翻译
+
+    默认返回 "[target] text"（多行文本逐行处理，与 Google 保留换行的行为一致），
+    可以指定固定译文、人为延迟和失败。
+    """
+
+    name = "fake"
+    batch_delimiter = "\n"
+    latency_hint = 0.01
+
+    def __init__(
+        self,
+        translations: Optional[Dict[str, str]] = None,
+        latency: float = 0.0,
+        fail: bool = False,
+        translate_line: Optional[Callable[[str, str], str]] = None,
+        name: Optional[str] = None,
+    ):
+        """
+        Args:
+            translations: 固定译文 {原文: 译文}
+            latency: 每次调用的延迟（秒）
+            fail: True 时每次调用都抛出异常
+            translate_line: 自定义逐行翻译函数 (line, target) -> str
+            name: 提供方名称（同时使用多个 FakeProvider 时区分）
+        """
+        self.translations = translations or {}
+        self.latency = latency
+        self.fail = fail
+        self.translate_line = translate_line
+        if name is not None:
+            self.name = name
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def translate(self, text: str, source: str, target: str) -> Optional[str]:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("fake provider failure")
+
+        lines = []
+        for line in text.split("\n"):
+            if line in self.translations:
+                lines.append(self.translations[line])
+            elif self.translate_line is not None:
+                lines.append(self.translate_line(line, target))
+            else:
+                lines.append(f"[{target}] {line}")
+        return "\n".join(lines)
@@ -0,0 +1,136 @@
+"""
+内存前缀索引（自动补全）
+
+启动时从 ECDICT 载入全部词头，按小写排序后存入数组，前缀查询用
+bisect 定位区间。按词频排序时：
+- 短前缀（<= TOP_PREFIX_LEN 个字符）的 Top-K 结果在构建时预先算好
+- 更长的前缀区间很小，直接在区间内取 Top-K
+"""
+
+import heapq
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# ECDICT 的 frq/bnc 是词频排名（越小越常用），0/NULL 表示未知
+UNRANKED = 2 ** 31 - 1
+
+# 预计算 Top-K 的前缀长度和每个前缀保存的结果数
+TOP_PREFIX_LEN = 3
+TOP_K = 20
+
+
+def frequency_rank(frq: Optional[int], bnc: Optional[int]) -> int:
+    """合并 ECDICT 的 frq（当代语料库）和 bnc（英国国家语料库）排名"""
+    ranks = [r for r in (frq, bnc) if r and r > 0]
+    return min(ranks) if ranks else UNRANKED
+
+
+class PrefixIndex:
+    """排序数组 + bisect 实现的前缀索引"""
+
+    def __init__(self, rows: Iterable[Tuple[str, Optional[int], Optional[int]]]):
+        """
+        Args:
+            rows: (word, frq, bnc) 序列
+        """
+        started = time.perf_counter()
+
+        entries = []
+        for word, frq, bnc in rows:
+            if word:
+                entries.append((word.lower(), word, frequency_rank(frq, bnc)))
+        entries.sort()
+
+        self.keys: List[str] = []
+        self.ranks = array('i')
+        # 只保存与小写 key 不同的原始拼写，节省内存
+        self._display: Dict[int, str] = {}
+        last_key = None
+        for key, word, rank in entries:
+            if key == last_key:
+                continue
+            last_key = key
+            if word != key:
+                self._display[len(self.keys)] = word
+            self.keys.append(key)
+            self.ranks.append(rank)
+
+        self._top: Dict[str, List[int]] = self._build_top()
+        self.build_seconds = time.perf_counter() - started
+
+    def _build_top(self) -> Dict[str, List[int]]:
+        """为短前缀预计算按词频排序的 Top-K"""
+        top: Dict[str, List[int]] = {}
+        order = sorted(range(len(self.keys)), key=lambda i: (self.ranks[i], i))
+        for idx in order:
+            key = self.keys[idx]
+            for length in range(1, min(TOP_PREFIX_LEN, len(key)) + 1):
+                bucket = top.setdefault(key[:length], [])
+                if len(bucket) < TOP_K:
+                    bucket.append(idx)
+        return top
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def word_at(self, idx: int) -> str:
+        """返回原始拼写"""
+        return self._display.get(idx, self.keys[idx])
+
+    def rank_of(self, word: str) -> int:
+        """单词的词频排名，不存在时返回 UNRANKED"""
+        key = word.lower()
+        idx = bisect_left(self.keys, key)
+        if idx < len(self.keys) and self.keys[idx] == key:
+            return self.ranks[idx]
+        return UNRANKED
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + '\U0010ffff', lo)
+        return lo, hi
+
+    def suggest(self, prefix: str, limit: int = 10, ranked: bool = False) -> List[str]:
+        """
+        前缀查询
+
+        Args:
+            prefix: 前缀（大小写不敏感）
+            limit: 返回数量
+            ranked: True 按词频排序，False 按字母顺序
+
+        Returns:
+            List[str]: 单词列表
+        """
+        prefix = prefix.lower()
+        if not prefix or limit <= 0:
+            return []
+
+        if ranked:
+            if len(prefix) <= TOP_PREFIX_LEN and limit <= TOP_K:
+                indices = self._top.get(prefix, [])[:limit]
+            else:
+                lo, hi = self._range(prefix)
+                indices = heapq.nsmallest(
+                    limit, range(lo, hi), key=lambda i: (self.ranks[i], i)
+                )
+        else:
+            lo = bisect_left(self.keys, prefix)
+            indices = []
+            for idx in range(lo, min(lo + limit, len(self.keys))):
+                if not self.keys[idx].startswith(prefix):
+                    break
+                indices.append(idx)
+
+        return [self.word_at(i) for i in indices]
+
+    def stats(self) -> Dict[str, float]:
+        """索引统计"""
+        return {
+            "words": len(self.keys),
+            "top_prefixes": len(self._top),
+            "build_ms": round(self.build_seconds * 1000, 1),
+        }
@@ -0,0 +1,318 @@
+"""
+测试收藏存储（SQLite 后端、JSON 导入、内存索引 + 写回日志的崩溃恢复、
+按用户分页与增量同步、批量添加 / 检查 / 导出、附带释义）
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from models.favorite import DEFAULT_USER, Favorite, FavoriteCreate
+from models.word import WordDefinition
+from services.favorites import FavoritesService
+from services.favorites_store import (
+    SQLiteFavoritesStore, WriteBehindFavoritesStore, migrate_json,
+)
+
+
+def make_favorite(i: int, word: str) -> Favorite:
+    return Favorite(
+        id=f"id-{i}",
+        word=word,
+        chinese=f"释义{i}",
+        created_at=datetime(2024, 1, 1) + timedelta(minutes=i),
+        version=i + 1,
+    )
+
+
+def test_sqlite_store(tmp):
+    """SQLite：不区分大小写去重（含非 ASCII 字母），最新的在前，按 ID 删除"""
+    print("=" * 60)
+    print("测试1: SQLite 存储")
+    print("=" * 60)
+
+    service = FavoritesService(SQLiteFavoritesStore(os.path.join(tmp, "t1.db")))
+    hello = service.add(FavoriteCreate(word="Hello", chinese="你好"))
+    again = service.add(FavoriteCreate(word="HELLO"))
+    service.add(FavoriteCreate(word="world"))
+    eclair = service.add(FavoriteCreate(word="Éclair"))
+    eclair_again = service.add(FavoriteCreate(word="éCLAIR"))
+
+    words = [fav.word for fav in service.get_all()]
+    print(f"列表: {words}, 重复添加返回: {again.id == hello.id}")
+    ok = (
+        words == ["Éclair", "world", "Hello"]
+        and eclair_again.id == eclair.id
+        and service.check("ÉCLAIR").id == eclair.id
+        and again.id == hello.id
+        and service.check("hello").id == hello.id
+        and service.remove(hello.id)
+        and not service.remove(hello.id)
+        and service.check("hello") is None
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+def test_migrate_json(tmp):
+    """JSON 文件一次性导入 SQLite，导入后原文件改名"""
+    print("=" * 60)
+    print("测试2: 从 JSON 导入")
+    print("=" * 60)
+
+    json_path = os.path.join(tmp, "favorites.json")
+    favorites = [make_favorite(i, f"word{i}") for i in range(3)]
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({"favorites": [fav.model_dump(mode="json") for fav in favorites]}, f)
+
+    store = SQLiteFavoritesStore(os.path.join(tmp, "t2.db"))
+    migrated = migrate_json(json_path, store)
+    again = migrate_json(json_path, store)
+
+    print(f"导入: {migrated}, 再次导入: {again}, 列表: {[f.word for f in store.list(DEFAULT_USER)]}")
+
+    # 再次出现 JSON 文件时不覆盖已有备份；多个 worker 同时导入只有一个执行
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({"favorites": [make_favorite(9, "word9").model_dump(mode="json")]}, f)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(migrate_json(json_path, store)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(json_path + ".migrated", encoding="utf-8") as f:
+        backup = json.load(f)
+    print(f"并发导入: {sorted(results)}, 备份条数: {len(backup['favorites'])}")
+
+    ok = (
+        migrated == 3
+        and again == 0
+        and [fav.word for fav in store.list(DEFAULT_USER)] == ["word9", "word2", "word1", "word0"]
+        and sorted(results) == [0, 0, 0, 1]
+        and len(backup["favorites"]) == 3
+        and os.path.exists(json_path + ".migrated.1")
+        and not os.path.exists(json_path)
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+def test_write_behind_recovery(tmp):
+    """写回日志：未合并的操作在重启时重放，末尾的半行被忽略"""
+    print("=" * 60)
+    print("测试3: 写回日志崩溃恢复")
+    print("=" * 60)
+
+    db_path = os.path.join(tmp, "t3.db")
+    journal_path = os.path.join(tmp, "t3.journal")
+    store = WriteBehindFavoritesStore(
+        SQLiteFavoritesStore(db_path), journal_path, compact_every=10 ** 6
+    )
+    for i in range(5):
+        store.insert(make_favorite(i, f"word{i}"))
+    store.delete(DEFAULT_USER, "id-1", 6)
+    store.flush()
+
+    # 模拟崩溃：后端存储尚未合并，日志末尾留下半行；进程退出时文件锁随之释放
+    store._lock_file.close()
+    backing_count = SQLiteFavoritesStore(db_path).count(DEFAULT_USER)
+    with open(journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "favorite": {"id": "id-9"')
+
+    recovered = WriteBehindFavoritesStore(SQLiteFavoritesStore(db_path), journal_path)
+    words = [fav.word for fav in recovered.list(DEFAULT_USER)]
+    print(f"崩溃前后端条数: {backing_count}, 重放: {recovered.recovered}, 恢复后: {words}")
+    ok = (
+        backing_count == 0
+        and recovered.recovered == 6
+        and words == ["word4", "word3", "word2", "word0"]
+        and recovered.get_by_word(DEFAULT_USER, "WORD2").id == "id-2"
+        and [t.id for t in recovered.changes(DEFAULT_USER, 0, 10)[1]] == ["id-1"]
+    )
+
+    recovered.insert(make_favorite(7, "word7"))
+    recovered.close()
+    final = SQLiteFavoritesStore(db_path)
+    print(f"关闭后后端条数: {final.count(DEFAULT_USER)}, 日志大小: {os.path.getsize(journal_path)}")
+    ok = ok and final.count(DEFAULT_USER) == 5 and os.path.getsize(journal_path) == 0
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+def test_pagination_and_sync(tmp):
+    """按用户分区、游标分页、增量同步（SQLite 与内存索引结果一致）"""
+    print("=" * 60)
+    print("测试4: 分页与增量同步")
+    print("=" * 60)
+
+    ok = True
+    for name, store in (
+        ("sqlite", SQLiteFavoritesStore(os.path.join(tmp, "t4.db"))),
+        ("memory", WriteBehindFavoritesStore(
+            SQLiteFavoritesStore(os.path.join(tmp, "t4m.db")),
+            os.path.join(tmp, "t4m.journal"),
+        )),
+    ):
+        service = FavoritesService(store)
+        for i in range(25):
+            service.add(FavoriteCreate(word=f"word{i}"), "alice")
+        service.add(FavoriteCreate(word="word0"), "bob")
+
+        # 分页拉取完整列表
+        pages, cursor, words = 0, None, []
+        while True:
+            page, cursor = service.get_page("alice", 10, cursor)
+            pages += 1
+            words += [fav.word for fav in page]
+            if cursor is None:
+                break
+        since = service.version("alice")
+
+        # 之后的变更
+        removed = service.check("word3", "alice")
+        service.remove(removed.id, "alice")
+        service.add(FavoriteCreate(word="late"), "alice")
+        service.remove(service.check("word0", "bob").id, "bob")
+
+        first = service.changes("alice", since, limit=1)
+        second = service.changes("alice", first.version, limit=10)
+        idle = service.changes("alice", second.version)
+
+        print(
+            f"{name}: {pages} 页 / {len(words)} 条, "
+            f"增量: 删除 {[t.word for t in first.removed]} 添加 {[f.word for f in second.added]}, "
+            f"bob: {service.get_all('bob')}"
+        )
+        ok = ok and (
+            pages == 3
+            and words == [f"word{i}" for i in range(24, -1, -1)]
+            and first.has_more and [t.id for t in first.removed] == [removed.id]
+            and not second.has_more and [f.word for f in second.added] == ["late"]
+            and not idle.added and not idle.removed and idle.version == second.version
+            and service.changes("alice", 1).full_resync
+            and service.get_all("bob") == []
+        )
+        store.close()
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+def test_bulk(tmp):
+    """批量添加去重、批量检查、分批导出（SQLite 与内存索引结果一致）"""
+    print("=" * 60)
+    print("测试5: 批量添加、检查与导出")
+    print("=" * 60)
+
+    ok = True
+    for name, store in (
+        ("sqlite", SQLiteFavoritesStore(os.path.join(tmp, "t5.db"))),
+        ("memory", WriteBehindFavoritesStore(
+            SQLiteFavoritesStore(os.path.join(tmp, "t5m.db")),
+            os.path.join(tmp, "t5m.journal"),
+        )),
+    ):
+        service = FavoritesService(store)
+        apple = service.add(FavoriteCreate(word="Apple"))
+        creates = [FavoriteCreate(word=w) for w in ["apple", "pear", "PEAR", "fig"]]
+        creates += [FavoriteCreate(word=f"word{i}") for i in range(20)]
+        favorites, added = service.add_many(creates)
+        again, added_again = service.add_many(creates)
+
+        checked = service.check_many(["APPLE", "kiwi", "Fig"])
+        exported = [fav.word for fav in service.export(batch_size=7)]
+        print(
+            f"{name}: 添加 {added} / 再次添加 {added_again}, "
+            f"检查: {[fav.word if fav else None for fav in checked]}, 导出 {len(exported)} 条"
+        )
+        ok = ok and (
+            added == 22 and added_again == 0
+            and [fav.word for fav in favorites][:3] == ["Apple", "pear", "fig"]
+            and favorites[0].id == apple.id
+            and [fav.id for fav in again] == [fav.id for fav in favorites]
+            and checked[0].id == apple.id and checked[1] is None and checked[2].word == "fig"
+            and exported == [fav.word for fav in service.get_all()]
+            and exported[0] == "word19" and exported[-1] == "Apple"
+        )
+        store.close()
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+class CountingDictionary:
+    """记录 get_definitions 调用次数的词典（只认识 known 中的单词）"""
+
+    def __init__(self, known):
+        self.known = set(known)
+        self.calls = []
+
+    async def get_definitions(self, words):
+        self.calls.append(list(words))
+        return [
+            WordDefinition(word=word.lower(), chinese=f"{word} 的释义", meanings=[])
+            if word.lower() in self.known else None
+            for word in words
+        ]
+
+
+def test_expand(tmp):
+    """附带释义：每页 / 每批只查询一次词典"""
+    print("=" * 60)
+    print("测试6: 附带词典释义")
+    print("=" * 60)
+
+    service = FavoritesService(SQLiteFavoritesStore(os.path.join(tmp, "t6.db")))
+    service.add_many([FavoriteCreate(word=f"word{i}") for i in range(25)])
+    dictionary = CountingDictionary(f"word{i}" for i in range(0, 25, 2))
+
+    page, _ = service.get_page(limit=10)
+    expanded = asyncio.run(service.expand(page, dictionary))
+    page_calls = len(dictionary.calls)
+
+    async def collect():
+        return [batch async for batch in service.export_expanded(dictionary, batch_size=10)]
+
+    batches = asyncio.run(collect())
+    words = [fav.word for batch in batches for fav in batch]
+    print(
+        f"一页 {len(expanded)} 条查询 {page_calls} 次, "
+        f"导出 {len(words)} 条 {len(batches)} 批查询 {len(dictionary.calls) - page_calls} 次"
+    )
+    ok = (
+        page_calls == 1
+        and [fav.word for fav in expanded] == [fav.word for fav in page]
+        and expanded[0].definition.chinese == "word24 的释义"
+        and expanded[1].definition is None
+        and expanded[0].id == page[0].id
+        and words == [fav.word for fav in service.get_all()]
+        and [len(batch) for batch in batches] == [10, 10, 5]
+        and len(dictionary.calls) - page_calls == 3
+    )
+    service.close()
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            test_sqlite_store(tmp),
+            test_migrate_json(tmp),
+            test_write_behind_recovery(tmp),
+            test_pagination_and_sync(tmp),
+            test_bulk(tmp),
+            test_expand(tmp),
+        ]
+    print(f"\n通过 {sum(results)}/{len(results)}")
+
+
+if __name__ == "__main__":
+    main()
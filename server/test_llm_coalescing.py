@@ -0,0 +1,168 @@
+"""
+测试 LLM 解释的并发合并（使用模拟的 OpenAI 客户端，无需网络和 API key）
+
+覆盖：并发请求只调用一次上游、第一个等待者断开不影响其他等待者、
+所有等待者断开后取消上游调用
+"""
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ["OPENAI_API_KEY"] = "test"
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from services.cache import LRUCache
+from services.llm_service import LLMService
+from services.persistent_cache import TieredCache
+
+
+EXPLANATION = {
+    "basic_translation": "苹果",
+    "detailed_explanation": "一种水果。",
+    "examples": [{"sentence": "An apple a day.", "translation": "一天一个苹果。"}],
+}
+
+
+class GatedCompletions:
+    """模拟 client.chat.completions：请求挂起直到 release()，记录调用和取消"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = 0
+        self._gate = asyncio.Event()
+
+    def release(self):
+        self._gate.set()
+
+    async def create(self, model, messages, **kwargs):
+        self.calls += 1
+        try:
+            await self._gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(EXPLANATION)))],
+            usage=SimpleNamespace(total_tokens=100),
+        )
+
+
+def make_service():
+    completions = GatedCompletions()
+    service = LLMService(cache=TieredCache(LRUCache(maxsize=1000), None))
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return service, completions
+
+
+async def wait_for_upstream(completions: GatedCompletions, calls: int = 1):
+    """等到上游收到请求（所有等待者都已进入合并）"""
+    while completions.calls < calls:
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.01)
+
+
+async def test_coalesce():
+    """N 个并发请求只调用一次上游"""
+    print("=" * 60)
+    print("测试1: 并发请求合并")
+    print("=" * 60)
+
+    service, completions = make_service()
+    tasks = [asyncio.ensure_future(service.explain_word("apple")) for _ in range(20)]
+    await wait_for_upstream(completions)
+    completions.release()
+    results = await asyncio.gather(*tasks)
+
+    stats = service.get_stats()["coalescing"]
+    print(f"请求: 20, 上游调用: {completions.calls}, 合并统计: {stats}")
+    ok = (
+        completions.calls == 1
+        and all(r.basic_translation == "苹果" for r in results)
+        and stats["started"] == 1
+        and stats["coalesced"] == 19
+        and stats["inflight"] == 0
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_cancel_first():
+    """发起请求的调用方断开，其他等待者照常拿到结果"""
+    print("=" * 60)
+    print("测试2: 第一个等待者断开")
+    print("=" * 60)
+
+    service, completions = make_service()
+    tasks = [asyncio.ensure_future(service.explain_word("apple")) for _ in range(5)]
+    await wait_for_upstream(completions)
+    tasks[0].cancel()
+    await asyncio.sleep(0.01)
+    completions.release()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    others = results[1:]
+    print(
+        f"第一个: {type(results[0]).__name__}, "
+        f"其余: {[r.basic_translation for r in others if not isinstance(r, BaseException)]}, "
+        f"上游调用: {completions.calls}, 上游取消: {completions.cancelled}"
+    )
+    ok = (
+        isinstance(results[0], asyncio.CancelledError)
+        and all(not isinstance(r, BaseException) and r.basic_translation == "苹果" for r in others)
+        and completions.calls == 1
+        and completions.cancelled == 0
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_cancel_all():
+    """所有等待者断开后取消上游调用，之后的请求重新发起"""
+    print("=" * 60)
+    print("测试3: 所有等待者断开")
+    print("=" * 60)
+
+    service, completions = make_service()
+    tasks = [asyncio.ensure_future(service.explain_word("apple")) for _ in range(3)]
+    await wait_for_upstream(completions)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0.01)
+    cancelled = completions.cancelled
+    stats = service.get_stats()["coalescing"]
+
+    # 新的请求不会挂在已取消的任务上
+    retry = asyncio.ensure_future(service.explain_word("apple"))
+    await wait_for_upstream(completions, calls=2)
+    completions.release()
+    explanation = await retry
+
+    print(f"上游取消: {cancelled}, 合并统计: {stats}, 重新请求: {explanation.basic_translation}")
+    ok = (
+        cancelled == 1
+        and stats["abandoned"] == 1
+        and stats["inflight"] == 0
+        and completions.calls == 2
+        and explanation.basic_translation == "苹果"
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def main():
+    results = [
+        await test_coalesce(),
+        await test_cancel_first(),
+        await test_cancel_all(),
+    ]
+    print(f"\n通过 {sum(results)}/{len(results)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,210 @@
+"""
+测试 LLM 解释预计算（使用模拟的 OpenAI 客户端，无需网络和 API key）
+
+覆盖：中断后从检查点续跑、请求次数预算、失败单词在下次运行时重试
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ["OPENAI_API_KEY"] = "test"
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from services.cache import LRUCache
+from services.llm_precompute import PrecomputeJob, load_checkpoint
+from services.llm_service import LLMService
+from services.persistent_cache import TieredCache
+
+
+EXPLANATION = {
+    "basic_translation": "测试",
+    "detailed_explanation": "模拟的解释。",
+    "examples": [{"sentence": "A test.", "translation": "一个测试。"}],
+}
+
+WORDS = [f"word{i}" for i in range(10)]
+
+
+def rate_limit_error() -> openai.RateLimitError:
+    request = httpx.Request("POST", "http://mock/v1/chat/completions")
+    return openai.RateLimitError(
+        "rate limited", response=httpx.Response(429, request=request), body=None
+    )
+
+
+class FakeCompletions:
+    """模拟 client.chat.completions：记录调用，按单词返回结果或错误"""
+
+    def __init__(self, fail=(), rate_limit_once=(), block_after=None):
+        """
+        Args:
+            fail: 返回无效 JSON 的单词（不可重试，记为 failed）
+            rate_limit_once: 第一次请求返回 429 的单词
+            block_after: 第几次请求之后一直挂起（模拟进程被中断）
+        """
+        self.fail = set(fail)
+        self.rate_limited = set(rate_limit_once)
+        self.block_after = block_after
+        self.calls = []
+
+    async def create(self, model, messages, **kwargs):
+        word = messages[-1]["content"].split('"')[1]
+        self.calls.append(word)
+        if self.block_after is not None and len(self.calls) > self.block_after:
+            await asyncio.Event().wait()
+        if word in self.rate_limited:
+            self.rate_limited.discard(word)
+            raise rate_limit_error()
+        content = "not json" if word in self.fail else json.dumps(EXPLANATION)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(total_tokens=100),
+        )
+
+
+class FakeDictionary:
+    """没有参考释义的词典"""
+
+    async def get_definitions(self, words):
+        return [None] * len(words)
+
+
+def make_service(completions: FakeCompletions) -> LLMService:
+    service = LLMService(cache=TieredCache(LRUCache(maxsize=1000), None))
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    service.scheduler.base_delay = 0.01
+    return service
+
+
+def make_job(service: LLMService, checkpoint: str, **kwargs) -> PrecomputeJob:
+    return PrecomputeJob(
+        service, FakeDictionary(), checkpoint_path=checkpoint,
+        rate_per_sec=1000, progress=False, **kwargs
+    )
+
+
+async def test_resume(tmp):
+    """中断后重新运行：检查点中已完成的单词不再请求"""
+    print("=" * 60)
+    print("测试1: 中断后续跑")
+    print("=" * 60)
+
+    checkpoint = os.path.join(tmp, "resume.jsonl")
+    first = FakeCompletions(block_after=4)
+    task = asyncio.ensure_future(make_job(make_service(first), checkpoint, concurrency=1).run(WORDS))
+    while len(load_checkpoint(checkpoint)) < 4:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    # 中断时写到一半的行
+    with open(checkpoint, "a", encoding="utf-8") as f:
+        f.write('{"word": "wor')
+
+    # 新进程：内存缓存为空，只能靠检查点跳过
+    second = FakeCompletions()
+    stats = await make_job(make_service(second), checkpoint, concurrency=2).run(WORDS)
+    done = load_checkpoint(checkpoint)
+
+    print(f"中断前完成: 4, 续跑: {stats['skipped']} 跳过 / {stats['generated']} 生成, 请求: {sorted(second.calls)}")
+    ok = (
+        stats["skipped"] == 4
+        and stats["generated"] == 6
+        and sorted(second.calls) == WORDS[4:]
+        and all(done.get(word) == "generated" for word in WORDS)
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_budget(tmp):
+    """请求次数预算：重试也计入，用尽后停止，下次运行接着处理"""
+    print("=" * 60)
+    print("测试2: 请求次数预算")
+    print("=" * 60)
+
+    checkpoint = os.path.join(tmp, "budget.jsonl")
+    # word0 第一次 429，重试成功：共 2 次请求
+    completions = FakeCompletions(rate_limit_once=["word0"])
+    service = make_service(completions)
+    stats = await make_job(service, checkpoint, concurrency=1, max_calls=3).run(WORDS)
+    recorded = load_checkpoint(checkpoint)
+
+    rerun = await make_job(service, checkpoint, concurrency=2, max_calls=100).run(WORDS)
+
+    print(
+        f"预算 3: {stats['calls']} 次请求 / {stats['retries']} 次重试 / "
+        f"{stats['generated']} 生成, 停止: {stats['budget_exhausted']}, "
+        f"续跑生成: {rerun['generated']}, scheduler 上限恢复: {service.scheduler.max_attempts}"
+    )
+    ok = (
+        stats["calls"] == 3
+        and stats["retries"] == 1
+        and stats["generated"] == 2
+        and stats["budget_exhausted"]
+        and len(completions.calls) - rerun["calls"] == 3
+        and sorted(recorded) == ["word0", "word1"]
+        and rerun["skipped"] == 2
+        and rerun["generated"] == 8
+        and not rerun["budget_exhausted"]
+        and service.scheduler.max_attempts is None
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_retry_failed(tmp):
+    """失败的单词记入检查点，下次运行时重新请求"""
+    print("=" * 60)
+    print("测试3: 重试失败的单词")
+    print("=" * 60)
+
+    checkpoint = os.path.join(tmp, "failed.jsonl")
+    words = WORDS[:5]
+    first = FakeCompletions(fail=["word2"])
+    stats = await make_job(make_service(first), checkpoint).run(words)
+    status = load_checkpoint(checkpoint).get("word2")
+
+    second = FakeCompletions()
+    rerun = await make_job(make_service(second), checkpoint).run(words)
+
+    print(
+        f"第一次: {stats['generated']} 生成 / {stats['failed']} 失败 (word2: {status}), "
+        f"第二次请求: {second.calls}, 状态: {load_checkpoint(checkpoint).get('word2')}"
+    )
+    ok = (
+        stats["generated"] == 4
+        and stats["failed"] == 1
+        and status == "failed"
+        and second.calls == ["word2"]
+        and rerun["skipped"] == 4
+        and rerun["generated"] == 1
+        and load_checkpoint(checkpoint).get("word2") == "generated"
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            await test_resume(tmp),
+            await test_budget(tmp),
+            await test_retry_failed(tmp),
+        ]
+    print(f"\n通过 {sum(results)}/{len(results)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+"""
+测试 LLM 请求调度（模拟的请求函数，无需网络和 API key）
+
+覆盖：429 重试（带 / 不带 Retry-After）、重试次数用尽、请求次数上限、
+token 限流、总时限
+"""
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import openai
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from services.llm_scheduler import LLMBudgetError, LLMDeadlineError, LLMScheduler
+
+
+def rate_limit_error(retry_after=None) -> openai.RateLimitError:
+    headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+    request = httpx.Request("POST", "http://mock/v1/chat/completions")
+    return openai.RateLimitError(
+        "rate limited", response=httpx.Response(429, headers=headers, request=request), body=None
+    )
+
+
+class FlakyRequest:
+    """前 failures 次抛出 429，之后返回 "ok"（failures=None 表示一直失败）"""
+
+    def __init__(self, failures=None, retry_after=None, delay=0.0):
+        self.failures = failures
+        self.retry_after = retry_after
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.failures is None or self.calls <= self.failures:
+            raise rate_limit_error(self.retry_after)
+        return "ok"
+
+
+async def test_retry_after():
+    """429 带 Retry-After：至少等待该时间后重试成功"""
+    print("=" * 60)
+    print("测试1: 429 + Retry-After")
+    print("=" * 60)
+
+    scheduler = LLMScheduler(base_delay=0.001, max_delay=1.0)
+    request = FlakyRequest(failures=1, retry_after=0.2)
+    started = time.perf_counter()
+    result = await scheduler.call(request)
+    elapsed = time.perf_counter() - started
+
+    stats = scheduler.stats()
+    print(f"结果: {result}, 耗时: {elapsed * 1000:.0f}ms, 请求: {stats['attempts']}, 重试: {stats['retried']}, 429: {stats['rate_limited']}")
+    ok = (
+        result == "ok"
+        and elapsed >= 0.2
+        and request.calls == 2
+        and stats["attempts"] == 2
+        and stats["retried"] == 1
+        and stats["rate_limited"] == 1
+        and stats["succeeded"] == 1
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_jittered_retry():
+    """429 不带 Retry-After：退避时间随机分布在 [0, base_delay * 2^n] 内"""
+    print("=" * 60)
+    print("测试2: 429 + 随机抖动退避")
+    print("=" * 60)
+
+    scheduler = LLMScheduler(base_delay=0.05, max_delay=1.0)
+    request = FlakyRequest(failures=2)
+    started = time.perf_counter()
+    result = await scheduler.call(request)
+    elapsed = time.perf_counter() - started
+
+    error = rate_limit_error()
+    delays = [scheduler._backoff(2, error) for _ in range(200)]
+    capped = [scheduler._backoff(10, error) for _ in range(200)]
+
+    print(
+        f"结果: {result}, 请求: {request.calls}, 耗时: {elapsed * 1000:.0f}ms, "
+        f"第 3 次退避: {min(delays):.3f}-{max(delays):.3f}s, 上限: {max(capped):.3f}s"
+    )
+    ok = (
+        result == "ok"
+        and request.calls == 3
+        and elapsed < 0.05 + 0.1 + 0.1
+        and all(0 <= d <= 0.2 for d in delays)
+        and len(set(delays)) > 100
+        and all(d <= 1.0 for d in capped)
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_retries_exhausted():
+    """一直 429：重试次数用尽后抛出最后一个错误"""
+    print("=" * 60)
+    print("测试3: 重试次数用尽")
+    print("=" * 60)
+
+    scheduler = LLMScheduler(retries=2, base_delay=0.001)
+    request = FlakyRequest()
+    try:
+        await scheduler.call(request)
+        error = None
+    except openai.RateLimitError as e:
+        error = e
+
+    print(f"错误: {type(error).__name__}, 请求: {request.calls}, 失败: {scheduler.failed}")
+    ok = error is not None and request.calls == 3 and scheduler.failed == 1
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_max_attempts():
+    """请求次数上限：重试也计入，用尽后抛出 LLMBudgetError 且不再发请求"""
+    print("=" * 60)
+    print("测试4: 请求次数上限")
+    print("=" * 60)
+
+    scheduler = LLMScheduler(retries=5, base_delay=0.001, max_attempts=2)
+    request = FlakyRequest()
+    errors = []
+    for _ in range(2):
+        try:
+            await scheduler.call(request)
+        except LLMBudgetError as e:
+            errors.append(e)
+
+    print(f"预算错误: {len(errors)}, 请求: {request.calls}, attempts: {scheduler.attempts}")
+    ok = len(errors) == 2 and request.calls == 2 and scheduler.attempts == 2
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_token_limit():
+    """token 限流：桶内 token 用完后按速率等待"""
+    print("=" * 60)
+    print("测试5: token 限流")
+    print("=" * 60)
+
+    # 每秒 1000 token，桶容量 10 秒的配额（10000）
+    scheduler = LLMScheduler(tokens_per_minute=60000)
+    request = FlakyRequest(failures=0)
+    started = time.perf_counter()
+    await scheduler.call(request, estimated_tokens=10000)
+    first = time.perf_counter() - started
+    await scheduler.call(request, estimated_tokens=300)
+    second = time.perf_counter() - started
+
+    limiter = scheduler.stats()["token_limiter"]
+    print(f"第一次: {first * 1000:.0f}ms, 第二次: {second * 1000:.0f}ms, 限流: {limiter}")
+    ok = first < 0.05 and 0.25 <= second < 0.6 and request.calls == 2
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_deadline():
+    """超过总时限：抛出 LLMDeadlineError，不等待请求结束"""
+    print("=" * 60)
+    print("测试6: 总时限")
+    print("=" * 60)
+
+    scheduler = LLMScheduler(deadline=0.1)
+    request = FlakyRequest(failures=0, delay=1.0)
+    started = time.perf_counter()
+    try:
+        await scheduler.call(request)
+        error = None
+    except LLMDeadlineError as e:
+        error = e
+    elapsed = time.perf_counter() - started
+
+    stats = scheduler.stats()
+    print(f"错误: {error}, 耗时: {elapsed * 1000:.0f}ms, 超时统计: {stats['deadline_exceeded']}, 进行中: {stats['active']}")
+    ok = (
+        error is not None
+        and elapsed < 0.5
+        and stats["deadline_exceeded"] == 1
+        and stats["failed"] == 1
+        and stats["active"] == 0
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def main():
+    results = [
+        await test_retry_after(),
+        await test_jittered_retry(),
+        await test_retries_exhausted(),
+        await test_max_attempts(),
+        await test_token_limit(),
+        await test_deadline(),
+    ]
+    print(f"\n通过 {sum(results)}/{len(results)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
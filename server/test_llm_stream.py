@@ -0,0 +1,176 @@
+"""
+测试 LLM 流式解释（使用本地模拟的 OpenAI 流式接口，无需网络和 API key）
+"""
+import asyncio
+import json
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from services.json_stream import IncrementalJSONParser
+
+
+EXPLANATION = {
+    "basic_translation": "意外发现珍奇事物的本领",
+    "detailed_explanation": "指偶然发现有价值或令人愉快的事物。",
+    "pronunciation": "/ˌserənˈdɪpəti/",
+    "examples": [
+        {"sentence": "Finding this café was pure serendipity.", "translation": "发现这家咖啡馆纯属意外之喜。"},
+        {"sentence": "Many discoveries happen by serendipity.", "translation": "许多发现都出于偶然。"},
+    ],
+    "synonyms": ["chance", "fortune"],
+    "difficulty_level": "advanced",
+}
+
+CHUNK_SIZE = 8  # 每个流式片段的字符数
+CHUNK_DELAY = 0.01  # 片段间隔（秒）
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """模拟 /v1/chat/completions（stream=True 时按 SSE 分片返回）"""
+
+    requests = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        MockOpenAIHandler.requests += 1
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        content = json.dumps(EXPLANATION, ensure_ascii=False)
+
+        if not body.get("stream"):
+            payload = json.dumps({
+                "id": "mock", "object": "chat.completion", "created": 0,
+                "model": body["model"],
+                "choices": [{
+                    "index": 0, "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }],
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for start in range(0, len(content), CHUNK_SIZE):
+            chunk = {
+                "id": "mock", "object": "chat.completion.chunk", "created": 0,
+                "model": body["model"],
+                "choices": [{
+                    "index": 0, "finish_reason": None,
+                    "delta": {"content": content[start:start + CHUNK_SIZE]},
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(CHUNK_DELAY)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start_mock_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_parser():
+    """增量解析：逐字符喂入，字段按顺序完整产出"""
+    print("=" * 60)
+    print("测试1: 增量 JSON 解析")
+    print("=" * 60)
+
+    text = json.dumps(EXPLANATION, ensure_ascii=False, indent=2)
+    parser = IncrementalJSONParser()
+    fields = []
+    for ch in text:
+        fields.extend(parser.feed(ch))
+
+    print(f"字段: {[name for name, _ in fields]}")
+    ok = dict(fields) == EXPLANATION and [n for n, _ in fields] == list(EXPLANATION)
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_stream(service):
+    """流式解释：第一个字段远早于完整结果到达"""
+    print("=" * 60)
+    print("测试2: 流式解释")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    first_field_at = None
+    fields = []
+    explanation = None
+    async for kind, payload in service.stream_explanation("serendipity"):
+        if kind == "field":
+            if first_field_at is None:
+                first_field_at = time.perf_counter() - started
+            fields.append(payload[0])
+        else:
+            explanation = payload
+    total = time.perf_counter() - started
+
+    print(f"首个字段: {fields[0]} @ {first_field_at * 1000:.0f}ms, 完成 @ {total * 1000:.0f}ms")
+    ok = (
+        fields[0] == "basic_translation"
+        and first_field_at < total / 2
+        and explanation is not None
+        and explanation.basic_translation == EXPLANATION["basic_translation"]
+        and len(explanation.examples) == 2
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_cached(service):
+    """再次请求命中缓存，不访问上游"""
+    print("=" * 60)
+    print("测试3: 缓存命中")
+    print("=" * 60)
+
+    before = MockOpenAIHandler.requests
+    events = [kind async for kind, _ in service.stream_explanation("serendipity")]
+    explanation = await service.explain_word("serendipity")
+
+    print(f"上游请求: {before} -> {MockOpenAIHandler.requests}, 事件数: {len(events)}")
+    ok = (
+        MockOpenAIHandler.requests == before
+        and events[-1] == "done"
+        and explanation.synonyms == EXPLANATION["synonyms"]
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def main():
+    server = start_mock_server()
+    os.environ["OPENAI_API_KEY"] = "test"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+
+    from services.llm_service import LLMService
+    service = LLMService()
+
+    results = [
+        test_parser(),
+        await test_stream(service),
+        await test_cached(service),
+    ]
+    server.shutdown()
+    print(f"\n通过 {sum(results)}/{len(results)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
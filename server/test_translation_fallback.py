@@ -0,0 +1,221 @@
+"""
+测试翻译熔断、降级与提供方路由（使用本地 FakeProvider，无需网络）
+"""
+import asyncio
+import sys
+import os
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from models.word import WordDefinition, Meaning, Definition
+from services.cache import LRUCache
+from services.persistent_cache import TieredCache
+from services.translation import (
+    TranslationService, STATUS_TRANSLATED, STATUS_DEGRADED, STATUS_MISSING,
+)
+from services.translation_providers import FakeProvider
+
+
+def make_service(*providers: FakeProvider) -> TranslationService:
+    """只使用内存缓存的翻译服务"""
+    return TranslationService(
+        cache=TieredCache(LRUCache(maxsize=1000), None), providers=list(providers)
+    )
+
+
+def make_definition() -> WordDefinition:
+    """英文释义 + ECDICT 中文的词条"""
+    return WordDefinition(
+        word="run",
+        chinese="跑",
+        meanings=[
+            Meaning(part_of_speech="verb", definitions=[
+                Definition(definition="move fast on foot", example="He runs daily."),
+                Definition(definition="经营", definition_chinese="经营"),
+            ]),
+        ],
+    )
+
+
+async def test_normal():
+    """正常翻译：一次请求，状态为 translated"""
+    print("=" * 60)
+    print("测试1: 正常翻译")
+    print("=" * 60)
+
+    provider = FakeProvider()
+    service = make_service(provider)
+    result = await service.translate_definition(make_definition())
+
+    print(f"状态: {result.translation_status}, 请求次数: {provider.calls}")
+    print(f"词头: {result.chinese}")
+    ok = (
+        result.translation_status == STATUS_TRANSLATED
+        and provider.calls == 1
+        and result.chinese == "[zh-CN] run"
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_deadline():
+    """提供方很慢：超过时限立即返回 ECDICT 中文，后台请求完成后写入缓存"""
+    print("=" * 60)
+    print("测试2: 超过时限降级")
+    print("=" * 60)
+
+    provider = FakeProvider(latency=0.5)
+    service = make_service(provider)
+
+    started = time.perf_counter()
+    result = await service.translate_definition(make_definition(), deadline=0.1)
+    elapsed = time.perf_counter() - started
+
+    print(f"耗时: {elapsed:.2f}s, 状态: {result.translation_status}")
+    print(f"词头: {result.chinese}")
+    ok = (
+        elapsed < 0.3
+        and result.translation_status == STATUS_MISSING
+        and result.chinese == "跑"
+        and result.meanings[0].definitions[1].definition_chinese == "经营"
+    )
+
+    # 等后台请求完成，再次查询应命中缓存
+    await asyncio.sleep(0.6)
+    result = await service.translate_definition(make_definition(), deadline=0.1)
+    print(f"再次查询状态: {result.translation_status}")
+    ok = ok and result.translation_status == STATUS_TRANSLATED
+
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_breaker():
+    """提供方持续失败：熔断打开后不再发送请求"""
+    print("=" * 60)
+    print("测试3: 熔断")
+    print("=" * 60)
+
+    provider = FakeProvider(fail=True)
+    service = make_service(provider)
+
+    for i in range(10):
+        await service.translate(f"word{i}", src='en', dest='zh-CN')
+    calls = provider.calls
+    state = service.lanes[0].breaker.state
+
+    result = await service.translate_definition(make_definition())
+    print(f"熔断状态: {state}, 请求次数: {calls} -> {provider.calls}")
+    print(f"状态: {result.translation_status}")
+    ok = (
+        state == "open"
+        and provider.calls == calls
+        and result.translation_status == STATUS_MISSING
+    )
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_cancelled_probe():
+    """半开状态的探测被取消（调用方时限）：记为失败，之后还能再次探测"""
+    print("=" * 60)
+    print("测试6: 探测调用被取消")
+    print("=" * 60)
+
+    provider = FakeProvider(fail=True)
+    service = make_service(provider)
+    lane = service.lanes[0]
+    lane.breaker.reset_timeout = 0.05
+    for i in range(10):
+        await service.translate(f"word{i}", src='en', dest='zh-CN')
+
+    # 探测请求很慢，被调用方的时限取消
+    await asyncio.sleep(0.06)
+    provider.fail, provider.latency = False, 0.3
+    try:
+        await asyncio.wait_for(lane.run(provider.translate, "run", "en", "zh-CN"), 0.05)
+    except asyncio.TimeoutError:
+        pass
+    after_cancel = lane.breaker.state
+
+    # 重置超时后再次探测成功，熔断关闭
+    await asyncio.sleep(0.3)
+    provider.latency = 0.0
+    result = await lane.run(provider.translate, "run", "en", "zh-CN")
+    print(f"取消后: {after_cancel}, 再次探测: {result}, 状态: {lane.breaker.state}")
+    ok = after_cancel == "open" and result == "[zh-CN] run" and lane.breaker.state == "closed"
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_partial():
+    """部分条目已在缓存中：状态为 degraded"""
+    print("=" * 60)
+    print("测试4: 部分降级")
+    print("=" * 60)
+
+    service = make_service(FakeProvider(fail=True))
+    await service.cache.aset_many([
+        (service._cache_key("run", "en", "zh-CN"), "跑步"),
+    ])
+    result = await service.translate_definition(make_definition())
+
+    print(f"状态: {result.translation_status}, 词头: {result.chinese}")
+    ok = result.translation_status == STATUS_DEGRADED and result.chinese == "跑步"
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def test_routing():
+    """快的提供方优先，无法回答的文本交给下一个；熔断的提供方被跳过"""
+    print("=" * 60)
+    print("测试5: 提供方路由")
+    print("=" * 60)
+
+    local = FakeProvider(
+        name="local", translations={"run": "跑"},
+        translate_line=lambda line, target: "",
+    )
+    remote = FakeProvider(name="remote", latency=0.05)
+    remote.latency_hint = 0.5
+    service = make_service(remote, local)
+
+    result = await service.translate_definition(make_definition())
+    print(f"词头: {result.chinese}, 请求次数 local={local.calls} remote={remote.calls}")
+    print(f"释义: {result.meanings[0].definitions[0].definition_chinese}")
+    ok = (
+        result.chinese == "跑"
+        and result.meanings[0].definitions[0].definition_chinese
+        == "[zh-CN] move fast on foot"
+        and local.calls == 1 and remote.calls == 1
+    )
+
+    # remote 熔断后只剩 local
+    remote.fail = True
+    for i in range(10):
+        await service.translate(f"sentence {i}", src='en', dest='zh-CN')
+    calls = remote.calls
+    await service.translate("another sentence", src='en', dest='zh-CN')
+    print(f"remote 熔断后请求次数: {calls} -> {remote.calls}")
+    ok = ok and remote.calls == calls
+
+    print("✅ 通过" if ok else "❌ 失败")
+    return ok
+
+
+async def main():
+    results = [
+        await test_normal(),
+        await test_deadline(),
+        await test_breaker(),
+        await test_partial(),
+        await test_routing(),
+        await test_cancelled_probe(),
+    ]
+    print(f"\n通过 {sum(results)}/{len(results)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())